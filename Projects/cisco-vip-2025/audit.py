@@ -0,0 +1,170 @@
+import numpy as np
+
+from prefix_index import format_prefix
+from records import InterfaceRecord, int_to_quad, quad_to_int
+
+# Addressing audit over every parsed interface and static route:
+#
+#   duplicate_addresses    the same IP configured on more than one interface
+#   overlapping_prefixes   interface subnets that contain one another with different masks
+#                          (link discovery merges peers among these, see _segment_component)
+#   unreachable_next_hops  static routes whose next hop no interface owns, or only a shut one
+#   shutdown_with_ip       shut interfaces that still carry an address
+#
+# Everything runs on sorted NumPy integer arrays, so the audit is O(n log n) in the number of
+# addresses: duplicates are equal neighbors after a sort, overlaps come from one sweep over the
+# prefixes sorted by start address (CIDR blocks are either nested or disjoint, so a block overlaps
+# an earlier one exactly when it starts before the furthest end seen so far), and next hops are
+# looked up with a binary search.
+
+def _interface_address(intf):
+    """(ip int, prefix length) of an interface, or None when it has no valid address."""
+    if isinstance(intf, InterfaceRecord):
+        ip = intf.ip_int
+        network = intf.network_int
+        return None if ip is None else (ip, network[1] if network else -1)
+    try:
+        ip = quad_to_int(intf['ip_address']) if intf['ip_address'] else None
+    except ValueError:
+        return None
+    if ip is None:
+        return None
+    network = intf.get('network')
+    return ip, int(network.rsplit('/', 1)[1]) if network else -1
+
+def collect(devices):
+    """
+    Flattens devices into arrays: interface ips, prefix lengths (-1 if unknown) and shutdown flags,
+    with the matching (hostname, interface name) in `owners`; plus route next hops with their
+    (hostname, route) in `routes`.
+    """
+    ips, lengths, shutdown, owners = [], [], [], []
+    next_hops, routes = [], []
+    for hostname, device_parser in devices.items():
+        for intf in device_parser.interfaces:
+            address = _interface_address(intf)
+            if address is not None:
+                ips.append(address[0])
+                lengths.append(address[1])
+                shutdown.append(bool(intf['shutdown']))
+                owners.append((hostname, intf['name']))
+        for route in device_parser.static_routes:
+            try:
+                next_hops.append(quad_to_int(route['next_hop']))
+            except ValueError:
+                continue # Exit-interface routes have no next-hop address
+            routes.append((hostname, route))
+    return {'ips': np.array(ips, dtype=np.int64), 'lengths': np.array(lengths, dtype=np.int64),
+            'shutdown': np.array(shutdown, dtype=bool), 'owners': owners,
+            'next_hops': np.array(next_hops, dtype=np.int64), 'routes': routes}
+
+def _owner(collected, i):
+    hostname, name = collected['owners'][i]
+    return {'device': hostname, 'interface': name, 'shutdown': bool(collected['shutdown'][i])}
+
+def find_duplicates(collected):
+    """[{'ip', 'owners': [...]}, ...] for every address configured on two or more interfaces."""
+    ips = collected['ips']
+    order = np.argsort(ips, kind='stable')
+    sorted_ips = ips[order]
+    repeated = sorted_ips[1:] == sorted_ips[:-1]
+    if not repeated.any():
+        return []
+    # Runs of equal addresses: a run starts where an address differs from the one before it
+    starts = np.flatnonzero(np.concatenate(([True], ~repeated)))
+    ends = np.append(starts[1:], len(sorted_ips))
+    duplicates = []
+    shared = ends - starts > 1
+    for start, end in zip(starts[shared].tolist(), ends[shared].tolist()):
+        duplicates.append({'ip': int_to_quad(int(sorted_ips[start])),
+                           'owners': [_owner(collected, i) for i in order[start:end].tolist()]})
+    return duplicates
+
+def find_overlaps(collected):
+    """
+    [{'prefix', 'inside', 'prefix_owners', 'inside_owners'}, ...]: every interface subnet that
+    sits inside a different (wider) interface subnet, paired with the widest one containing it.
+    """
+    known = collected['lengths'] >= 0
+    if not known.any():
+        return []
+    lengths = collected['lengths'][known]
+    networks = collected['ips'][known] & _masks(lengths)
+    # One entry per distinct prefix, sorted by start address, wider first on equal starts
+    keys, inverse = np.unique(networks << 6 | lengths, return_inverse=True)
+    starts = keys >> 6
+    ends = starts + (np.int64(1) << (32 - (keys & 63))) - 1
+    furthest = np.maximum.accumulate(ends)
+    overlapping = np.flatnonzero(starts[1:] <= furthest[:-1]) + 1
+    if not len(overlapping):
+        return []
+    # Which earlier prefix reached the furthest end: the widest block containing this one
+    index = np.arange(len(keys))
+    reaches = np.concatenate(([True], ends[1:] > furthest[:-1]))
+    holder = np.maximum.accumulate(np.where(reaches, index, 0))
+    # Interfaces on the prefixes being reported
+    reported = np.union1d(overlapping, holder[overlapping - 1])
+    members = {prefix_id: [] for prefix_id in reported.tolist()}
+    owner_index = np.flatnonzero(known)
+    inverse = inverse.ravel()
+    for position in np.flatnonzero(np.isin(inverse, reported)).tolist():
+        members[int(inverse[position])].append(_owner(collected, int(owner_index[position])))
+    overlaps = []
+    for prefix_id in overlapping.tolist():
+        outer = int(holder[prefix_id - 1])
+        overlaps.append({'prefix': format_prefix(int(starts[outer]), int(keys[outer] & 63)),
+                         'inside': format_prefix(int(starts[prefix_id]), int(keys[prefix_id] & 63)),
+                         'prefix_owners': members[outer], 'inside_owners': members[prefix_id]})
+    return overlaps
+
+def _masks(lengths):
+    return (np.int64(0xFFFFFFFF) << (32 - lengths)) & 0xFFFFFFFF
+
+def find_unreachable_next_hops(collected):
+    """
+    [{'device', 'route', 'reason'}, ...] for static routes whose next hop is no interface's
+    address ('unowned'), or only the address of shut interfaces ('owner_shutdown').
+    """
+    next_hops = collected['next_hops']
+    if not len(next_hops):
+        return []
+    up = np.unique(collected['ips'][~collected['shutdown']])
+    down = np.unique(collected['ips'][collected['shutdown']])
+    owned = _contains(up, next_hops)
+    owned_down = _contains(down, next_hops)
+    unreachable = []
+    for i in np.flatnonzero(~owned).tolist():
+        hostname, route = collected['routes'][i]
+        unreachable.append({'device': hostname, 'route': dict(route),
+                            'reason': 'owner_shutdown' if owned_down[i] else 'unowned'})
+    return unreachable
+
+def _contains(sorted_values, queries):
+    positions = np.searchsorted(sorted_values, queries)
+    found = positions < len(sorted_values)
+    found[found] = sorted_values[positions[found]] == queries[found]
+    return found
+
+def find_shutdown_with_ip(collected):
+    """[{'device', 'interface', 'ip'}, ...] for shut interfaces that still have an address."""
+    return [{'device': collected['owners'][i][0], 'interface': collected['owners'][i][1],
+             'ip': int_to_quad(int(collected['ips'][i]))}
+            for i in np.flatnonzero(collected['shutdown']).tolist()]
+
+def audit_devices(devices):
+    """Runs every check over a {hostname: parser} dict. Returns a JSON-serializable report."""
+    collected = collect(devices)
+    report = {
+        'duplicate_addresses': find_duplicates(collected),
+        'overlapping_prefixes': find_overlaps(collected),
+        'unreachable_next_hops': find_unreachable_next_hops(collected),
+        'shutdown_with_ip': find_shutdown_with_ip(collected),
+    }
+    report['summary'] = {'devices': len(devices), 'addresses': len(collected['ips']),
+                         'static_routes': len(collected['routes']),
+                         **{name: len(findings) for name, findings in report.items()}}
+    return report
+
+def audit_topology(topology):
+    """The audit over a NetworkTopologyBuilder's devices."""
+    return audit_devices(topology.devices)
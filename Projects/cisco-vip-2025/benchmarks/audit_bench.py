@@ -0,0 +1,78 @@
+# Addressing audit (audit.py): sorted NumPy sweeps vs. pairwise comparison of every interface.
+# The pairwise version is only run where it finishes in reasonable time.
+# Run from the project directory:  python -m benchmarks.audit_bench
+import random
+import time
+
+from audit import collect, find_duplicates, find_overlaps, find_unreachable_next_hops
+from config_parser import CiscoConfigParser
+from records import int_to_quad
+
+
+def make_devices(devices, interfaces_per_device, seed=3):
+    """Compact parsed devices with random /24-/30 interfaces in 10/8 and two static routes each."""
+    rng = random.Random(seed)
+    parsed = {}
+    for device in range(devices):
+        interfaces = []
+        for i in range(interfaces_per_device):
+            ip = (10 << 24) | rng.getrandbits(24)
+            length = rng.choice([24, 26, 28, 30])
+            mask = int_to_quad((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF)
+            network = f"{int_to_quad(ip & ((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF))}/{length}"
+            interfaces.append((f"Gi{i // 48}/{i % 48}", int_to_quad(ip), mask, None, rng.random() < 0.01, None, network))
+        routes = [{'network': '0.0.0.0', 'mask': '0.0.0.0', 'next_hop': int_to_quad((10 << 24) | rng.getrandbits(24))}
+                  for _ in range(2)]
+        record = (f"D{device}", interfaces, routes, {}, [], 'ios')
+        parsed[f"D{device}"] = CiscoConfigParser.from_record(record, compact=True)
+    return parsed
+
+
+def pairwise(collected):
+    """Duplicates and overlaps by comparing every pair of interfaces."""
+    ips, lengths = collected['ips'].tolist(), collected['lengths'].tolist()
+    prefixes = [(ip & ((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF), length) for ip, length in zip(ips, lengths)]
+    duplicates, overlaps = set(), set()
+    for i in range(len(ips)):
+        for j in range(i + 1, len(ips)):
+            if ips[i] == ips[j]:
+                duplicates.add(ips[i])
+            (net_a, len_a), (net_b, len_b) = prefixes[i], prefixes[j]
+            if len_a != len_b:
+                shorter = min(len_a, len_b)
+                mask = (0xFFFFFFFF << (32 - shorter)) & 0xFFFFFFFF
+                if net_a & mask == net_b & mask:
+                    overlaps.add(prefixes[i] if len_a > len_b else prefixes[j])
+    return duplicates, overlaps
+
+
+def run(scenarios=((50, 40), (100, 100), (1_000, 100), (10_000, 100)), pairwise_limit=10_000):
+    rows = []
+    for devices, interfaces_per_device in scenarios:
+        parsed = make_devices(devices, interfaces_per_device)
+        start = time.perf_counter()
+        collected = collect(parsed)
+        collect_s = time.perf_counter() - start
+        start = time.perf_counter()
+        duplicates = find_duplicates(collected)
+        overlaps = find_overlaps(collected)
+        find_unreachable_next_hops(collected)
+        sorted_s = time.perf_counter() - start
+        row = {'addresses': len(collected['ips']), 'collect_s': collect_s, 'sorted_s': sorted_s,
+               'duplicates': len(duplicates), 'overlaps': len(overlaps), 'pairwise_s': None}
+        if len(collected['ips']) <= pairwise_limit:
+            start = time.perf_counter()
+            pair_duplicates, pair_overlaps = pairwise(collected)
+            row['pairwise_s'] = time.perf_counter() - start
+            assert len(pair_duplicates) == len(duplicates)
+            assert len(pair_overlaps) == len(overlaps)
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'addresses':>10}  {'collect (s)':>11}  {'sorted (s)':>10}  {'pairwise (s)':>12}  {'dups':>6}  {'overlaps':>8}")
+    for row in run():
+        pairwise_s = f"{row['pairwise_s']:>12.3f}" if row['pairwise_s'] is not None else f"{'-':>12}"
+        print(f"{row['addresses']:>10}  {row['collect_s']:>11.3f}  {row['sorted_s']:>10.3f}  {pairwise_s}  "
+              f"{row['duplicates']:>6}  {row['overlaps']:>8}")
@@ -0,0 +1,53 @@
+# Topology diff time vs. the number of changed devices, on a fixed-size network.
+# Two copies of a synthetic Conf directory are built with the parse cache; the second copy gets
+# more and more devices edited (an interface moved to a new subnet plus a new static route), and
+# diff_topologies() is timed after each round. The diff should track the change, not the network.
+# Run from the project directory:  python -m benchmarks.diff_bench
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.snapshot_bench import write_conf_directory
+from topology_builder import NetworkTopologyBuilder
+from topology_diff import diff_topologies
+
+
+def edit_device(conf, i):
+    path = os.path.join(conf, f"R{i}", 'config.dump')
+    with open(path) as f:
+        text = f.read()
+    # Renumber the first access LAN and add a route
+    text = text.replace(" description Access LAN 0\n ip address 10.", " description Access LAN 0\n ip address 11.", 1)
+    with open(path, 'w') as f:
+        f.write(text + f"ip route 192.168.{i % 256}.0 255.255.255.0 172.16.{i // 64}.{(i % 64) * 4 + 2}\n")
+
+
+def run(devices=10000, interfaces=4, changes=(0, 1, 10, 100, 1000)):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        old_conf, new_conf = os.path.join(tmp, 'old'), os.path.join(tmp, 'new')
+        write_conf_directory(old_conf, devices, interfaces)
+        shutil.copytree(old_conf, new_conf)
+        old = NetworkTopologyBuilder()
+        old.build_topology_from_configs(old_conf, use_cache=True)
+        new = NetworkTopologyBuilder()
+        edited = 0
+        for target in changes:
+            while edited < target:
+                edited += 1
+                edit_device(new_conf, edited)
+            new.build_topology_from_configs(new_conf, use_cache=True) # Incremental after the first round
+            start = time.perf_counter()
+            diff = diff_topologies(old, new)
+            seconds = time.perf_counter() - start
+            assert len(diff['devices']['changed']) == edited
+            rows.append({'changed': edited, 'diff_s': seconds, **diff['stats']})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'changed':>8}  {'diff (ms)':>9}  {'fingerprinted':>13}  {'subnets':>8}  {'edges':>7}")
+    for row in run():
+        print(f"{row['changed']:>8}  {row['diff_s'] * 1000:>9.1f}  {row['devices_fingerprinted']:>13}  "
+              f"{row['subnets_compared']:>8}  {row['edges_compared']:>7}")
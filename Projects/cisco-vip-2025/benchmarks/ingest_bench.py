@@ -0,0 +1,66 @@
+# Stages one after another (fetch every config, then parse them all, then discover links) vs. the
+# asyncio pipeline in ingest.py, where parsing and link discovery run while fetches are in flight.
+# Devices are simulated with FakeDeviceSource: every chunk arrives after a fixed latency.
+# Run from the project directory:  python -m benchmarks.ingest_bench
+import asyncio
+import time
+
+from config_parser import CiscoConfigParser
+from ingest import FakeDeviceSource, ingest
+from topology_builder import NetworkTopologyBuilder
+
+
+def make_device_config(i, interfaces):
+    """Device i: a /30 uplink shared with device i - 1, a downlink shared with i + 1, and `interfaces` stub LANs."""
+    lines = [f"hostname R{i}", "!",
+             "interface GigabitEthernet0/0", f" ip address 172.16.{i // 64}.{(i % 64) * 4 + 1} 255.255.255.252", "!",
+             "interface GigabitEthernet0/1", f" ip address 172.16.{(i - 1) // 64}.{((i - 1) % 64) * 4 + 2} 255.255.255.252", "!"]
+    for k in range(interfaces):
+        lines += [f"interface GigabitEthernet1/{k}", f" description Access LAN {k}",
+                  f" ip address 10.{i % 256}.{k % 256}.1 255.255.255.0", " duplex auto", " speed auto", "!"]
+    return "\n".join(lines) + "\n"
+
+
+async def fetch_all(source, concurrency):
+    # Same bounded concurrency as the pipeline, but nothing is parsed until every download is done
+    semaphore = asyncio.Semaphore(concurrency)
+    async def fetch(device):
+        async with semaphore:
+            return device, ''.join([chunk async for chunk in source.fetch(device)])
+    return await asyncio.gather(*(fetch(device) for device in source.configs))
+
+
+def staged(configs, concurrency, chunk_size, delay):
+    topology = NetworkTopologyBuilder()
+    start = time.perf_counter()
+    texts = asyncio.run(fetch_all(FakeDeviceSource(configs, chunk_size, delay), concurrency))
+    for device, text in texts:
+        device_parser = CiscoConfigParser(text, hostname=device)
+        device_parser.parse()
+        topology.add_device(device_parser)
+    topology._discover_links()
+    return time.perf_counter() - start, topology.graph.number_of_edges()
+
+
+def pipelined(configs, concurrency, chunk_size, delay):
+    topology = NetworkTopologyBuilder()
+    start = time.perf_counter()
+    asyncio.run(ingest(topology, FakeDeviceSource(configs, chunk_size, delay), concurrency))
+    return time.perf_counter() - start, topology.graph.number_of_edges()
+
+
+def run(devices=200, interfaces=200, concurrency=16, chunk_size=4096, delays=(0.0, 0.01, 0.025, 0.05)):
+    configs = {f"R{i}": make_device_config(i, interfaces) for i in range(1, devices + 1)}
+    rows = []
+    for delay in delays:
+        staged_s, staged_edges = staged(configs, concurrency, chunk_size, delay)
+        pipelined_s, pipelined_edges = pipelined(configs, concurrency, chunk_size, delay)
+        assert staged_edges == pipelined_edges
+        rows.append({'delay_ms': delay * 1000, 'staged_s': staged_s, 'pipelined_s': pipelined_s, 'edges': pipelined_edges})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'chunk latency':>13}  {'staged (s)':>10}  {'pipelined (s)':>13}  {'speedup':>8}")
+    for row in run():
+        print(f"{row['delay_ms']:>11.1f}ms  {row['staged_s']:>10.3f}  {row['pipelined_s']:>13.3f}  {row['staged_s'] / row['pipelined_s']:>7.2f}x")
@@ -0,0 +1,41 @@
+# benchmarks/memory_bench.py
+# Memory held by parsed devices with dict interfaces vs. compact InterfaceRecord/StaticRouteRecord.
+# Run from the project directory:  python -m benchmarks.memory_bench
+import gc
+import tracemalloc
+
+from benchmarks.parser_bench import make_synthetic_config
+from config_parser import CiscoConfigParser
+
+
+def measure(config_texts, compact):
+    """Returns bytes still allocated after parsing every config and keeping the parsers around."""
+    gc.collect()
+    tracemalloc.start()
+    parsers = []
+    for config_text in config_texts:
+        parser = CiscoConfigParser(hostname="X", compact=compact)
+        parser.parse(config_text.splitlines())
+        parsers.append(parser)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    interfaces = sum(len(parser.interfaces) for parser in parsers)
+    return current, interfaces
+
+
+def run(devices=200, lines_per_device=1_400):
+    # ~200 interfaces per device, like the access/distribution boxes in the estate
+    config_texts = [make_synthetic_config(lines_per_device, hostname=f"R{i}") for i in range(devices)]
+    dict_bytes, interfaces = measure(config_texts, compact=False)
+    compact_bytes, _ = measure(config_texts, compact=True)
+    return {'devices': devices, 'interfaces': interfaces, 'dict_bytes': dict_bytes,
+            'compact_bytes': compact_bytes, 'reduction': dict_bytes / compact_bytes}
+
+
+if __name__ == "__main__":
+    row = run()
+    print(f"{row['devices']} devices, {row['interfaces']} interfaces")
+    print(f"  dict records:    {row['dict_bytes'] / 2**20:8.1f} MiB ({row['dict_bytes'] / row['interfaces']:.0f} B/interface)")
+    print(f"  compact records: {row['compact_bytes'] / 2**20:8.1f} MiB ({row['compact_bytes'] / row['interfaces']:.0f} B/interface)")
+    print(f"  reduction:       {row['reduction']:8.1f}x")
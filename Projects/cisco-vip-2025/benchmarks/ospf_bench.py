@@ -0,0 +1,55 @@
+# benchmarks/ospf_bench.py
+# OSPF network-statement matching: NumPy-vectorized vs. nested Python loops.
+# Run from the project directory:  python -m benchmarks.ospf_bench
+import random
+import time
+
+from config_parser import CiscoConfigParser
+from ospf_analysis import collect, match_collected, match_collected_naive
+
+
+def make_devices(devices, interfaces_per_device, statements_per_device, seed=11):
+    rng = random.Random(seed)
+    parsed = {}
+    for device in range(devices):
+        lines = [f"hostname D{device}"]
+        for i in range(interfaces_per_device):
+            lines += [f"interface Gi{i // 48}/{i % 48}",
+                      f" ip address 10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)} 255.255.255.0", "!"]
+        lines.append("router ospf 1")
+        for _ in range(statements_per_device):
+            bits = rng.choice([2, 8, 16, 24])
+            wildcard = (1 << bits) - 1
+            lines.append(f" network 10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.0 "
+                         f"{wildcard >> 24 & 255}.{wildcard >> 16 & 255}.{wildcard >> 8 & 255}.{wildcard & 255} area {rng.randint(0, 9)}")
+        device_parser = CiscoConfigParser("\n".join(lines) + "\n!\n", compact=True)
+        device_parser.parse()
+        parsed[device_parser.hostname] = device_parser
+    return parsed
+
+
+def run(scenarios=((2_000, 20, 5), (200, 100, 200), (50, 400, 1_000))):
+    rows = []
+    for devices, interfaces_per_device, statements_per_device in scenarios:
+        parsed = make_devices(devices, interfaces_per_device, statements_per_device)
+        # Turning the parsed strings into ints is shared by both implementations; time it separately
+        start = time.perf_counter()
+        collected = collect(parsed)
+        collect_s = time.perf_counter() - start
+        start = time.perf_counter()
+        vectorized = match_collected(*collected)
+        vectorized_s = time.perf_counter() - start
+        start = time.perf_counter()
+        naive = match_collected_naive(*collected)
+        naive_s = time.perf_counter() - start
+        assert vectorized == naive
+        rows.append({'interfaces': devices * interfaces_per_device, 'statements': devices * statements_per_device,
+                     'collect_s': collect_s, 'vectorized_s': vectorized_s, 'naive_s': naive_s, 'enabled': len(vectorized)})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'interfaces':>10}  {'statements':>10}  {'enabled':>8}  {'collect (s)':>11}  {'numpy (s)':>10}  {'naive (s)':>10}  {'speedup':>8}")
+    for row in run():
+        print(f"{row['interfaces']:>10}  {row['statements']:>10}  {row['enabled']:>8}  {row['collect_s']:>11.3f}  {row['vectorized_s']:>10.3f}  "
+              f"{row['naive_s']:>10.3f}  {row['naive_s'] / row['vectorized_s']:>7.1f}x")
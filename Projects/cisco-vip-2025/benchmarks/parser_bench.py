@@ -0,0 +1,61 @@
+# benchmarks/parser_bench.py
+# Compares the single-pass streaming parser against the original regex parser.
+# Run from the project directory:  python -m benchmarks.parser_bench
+import time
+
+from config_parser import CiscoConfigParser
+
+
+def make_synthetic_config(target_lines, hostname="CORE1"):
+    """Builds an IOS-style running-config of roughly `target_lines` lines."""
+    lines = ["!", "version 15.1", "!", f"hostname {hostname}", "!"]
+    i = 0
+    while len(lines) < target_lines:
+        third, fourth = divmod(i * 4, 256)
+        lines += [
+            f"interface GigabitEthernet{i // 48}/{i % 48}.{100 + i % 3000}",
+            f" description Link to access switch {i}",
+            f" encapsulation dot1Q {100 + i % 3000}",
+            f" ip address 10.{third // 256 % 256}.{third % 256}.{fourth + 1} 255.255.255.252",
+            " duplex auto",
+            " speed auto",
+            "!",
+        ]
+        if i % 10 == 0:
+            lines.append(f"ip route 172.16.{i % 256}.0 255.255.255.0 10.0.0.{i % 250 + 2}")
+        i += 1
+    lines += ["router ospf 1", " network 10.0.0.0 0.255.255.255 area 0", "!", "end"]
+    return "\n".join(lines) + "\n"
+
+
+def _time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=(10_000, 50_000), repeat=3):
+    results = []
+    for size in sizes:
+        config_text = make_synthetic_config(size)
+
+        def streaming():
+            CiscoConfigParser(config_text).parse()
+
+        def regex():
+            CiscoConfigParser(config_text).parse_regex()
+
+        stream_time = _time(streaming, repeat)
+        regex_time = _time(regex, repeat)
+        results.append({'lines': size, 'streaming_s': stream_time, 'regex_s': regex_time,
+                        'speedup': regex_time / stream_time if stream_time else None})
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'lines':>8}  {'streaming (s)':>14}  {'regex (s)':>10}  {'speedup':>8}")
+    for row in run():
+        print(f"{row['lines']:>8}  {row['streaming_s']:>14.4f}  {row['regex_s']:>10.4f}  {row['speedup']:>7.1f}x")
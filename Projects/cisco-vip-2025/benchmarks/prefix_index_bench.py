@@ -0,0 +1,51 @@
+# benchmarks/prefix_index_bench.py
+# Build and query times for the prefix index (Patricia trie) with a large number of prefixes.
+# Run from the project directory:  python -m benchmarks.prefix_index_bench [prefix count]
+import random
+import sys
+import time
+
+from prefix_index import PrefixTrie, prefix_mask
+
+
+def random_prefixes(count, seed=42):
+    """Mostly /24-/32 with some shorter aggregates, roughly like a large enterprise table."""
+    rng = random.Random(seed)
+    lengths = [8, 16, 20, 22, 24, 24, 24, 28, 29, 30, 30, 30, 32]
+    prefixes = []
+    for _ in range(count):
+        length = rng.choice(lengths)
+        prefixes.append((rng.getrandbits(32) & prefix_mask(length), length))
+    return prefixes
+
+
+def run(count=1_000_000, queries=200_000):
+    prefixes = random_prefixes(count)
+    trie = PrefixTrie()
+    start = time.perf_counter()
+    for index, (network, length) in enumerate(prefixes):
+        trie.insert(network, length, index)
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(7)
+    addresses = [rng.getrandbits(32) for _ in range(queries)]
+    start = time.perf_counter()
+    hits = sum(1 for address in addresses if trie.longest_match(address) is not None)
+    lpm_s = time.perf_counter() - start
+
+    aggregates = [prefix for prefix in prefixes[:10_000] if prefix[1] <= 16][:1_000]
+    start = time.perf_counter()
+    contained = sum(len(trie.contained(network, length)) for network, length in aggregates)
+    contained_s = time.perf_counter() - start
+
+    return {'prefixes': len(trie), 'build_s': build_s, 'lpm_per_s': queries / lpm_s, 'lpm_hits': hits,
+            'contained_queries': len(aggregates), 'contained_results': contained, 'contained_s': contained_s}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    row = run(count)
+    print(f"distinct prefixes:     {row['prefixes']}")
+    print(f"build:                 {row['build_s']:.2f} s")
+    print(f"longest-prefix match:  {row['lpm_per_s']:,.0f} lookups/s ({row['lpm_hits']} hits)")
+    print(f"contained-in queries:  {row['contained_queries']} aggregates -> {row['contained_results']} prefixes in {row['contained_s']:.2f} s")
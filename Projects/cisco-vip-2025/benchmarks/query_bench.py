@@ -0,0 +1,103 @@
+# Topology lookups by walking every device's interfaces (the way print_topology_summary does)
+# vs. the indexed, LRU-cached query layer (query.py), on a synthetic network (synthetic.py).
+# Run from the project directory:  python -m benchmarks.query_bench
+import os
+import random
+import tempfile
+import time
+
+from synthetic import SyntheticNetwork
+from topology_builder import NetworkTopologyBuilder
+
+
+def scan_ip_owner(topology, ip):
+    for hostname, device_parser in topology.devices.items():
+        for intf in device_parser.interfaces:
+            if intf['ip_address'] == ip:
+                return hostname, intf['name']
+    return None
+
+def scan_vlan(topology, vlan):
+    return sorted({hostname for hostname, device_parser in topology.devices.items()
+                   for intf in device_parser.interfaces if intf['vlan'] == vlan})
+
+def scan_description(topology, keyword):
+    return sorted((hostname, intf['name']) for hostname, device_parser in topology.devices.items()
+                  for intf in device_parser.interfaces if intf['description'] and keyword in intf['description'].lower().split())
+
+def scan_neighbors(topology, hostname):
+    return sorted({neighbor for neighbor in topology.graph[hostname] if neighbor in topology.devices})
+
+
+def make_queries(topology, count, seed=5):
+    """A repeating mix of lookups, like a tool polling the same handful of devices and VLANs."""
+    rng = random.Random(seed)
+    hostnames = rng.sample(sorted(topology.devices), 50)
+    ips = [rng.choice([intf for intf in topology.devices[hostname].interfaces if intf['ip_address']])['ip_address']
+           for hostname in hostnames]
+    kinds = [('ip', ips), ('vlan', ['10', '11']), ('description', ['uplink', 'transit']), ('neighbors', hostnames)]
+    queries = []
+    for _ in range(count):
+        kind, values = rng.choice(kinds)
+        queries.append((kind, rng.choice(values)))
+    return queries
+
+
+def run_scans(topology, queries):
+    scans = {'ip': scan_ip_owner, 'vlan': scan_vlan, 'description': scan_description, 'neighbors': scan_neighbors}
+    for kind, value in queries:
+        scans[kind](topology, value)
+
+def run_queries(topology, queries):
+    for kind, value in queries:
+        topology.query(kind, value)
+
+
+def run(routers=10000, count=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        conf = os.path.join(tmp, 'Conf')
+        SyntheticNetwork(routers, lans=2, svis=2, subinterfaces=1).write(conf)
+        topology = NetworkTopologyBuilder()
+        topology.build_topology_from_configs(conf)
+    queries = make_queries(topology, count)
+    interfaces = sum(len(device_parser.interfaces) for device_parser in topology.devices.values())
+
+    rows = {}
+    scan_sample = queries[:count // 20] # Scans are slow; time a sample and scale it
+    start = time.perf_counter()
+    run_scans(topology, scan_sample)
+    rows['interface scans'] = (time.perf_counter() - start) * len(queries) / len(scan_sample)
+
+    start = time.perf_counter()
+    topology.queries._index()
+    rows['build indexes (once)'] = time.perf_counter() - start
+    topology.queries.maxsize = 0 # Index lookups only
+    start = time.perf_counter()
+    run_queries(topology, queries)
+    rows['indexed, no cache'] = time.perf_counter() - start
+    topology.queries.invalidate()
+    topology.queries._index()
+    topology.queries.maxsize = 1024
+    topology.queries.hits = topology.queries.misses = 0
+    start = time.perf_counter()
+    run_queries(topology, queries)
+    rows['indexed + LRU cache'] = time.perf_counter() - start
+
+    # Same answers either way
+    for kind, value in queries[:50]:
+        if kind == 'ip':
+            assert topology.query(kind, value) == scan_ip_owner(topology, value)
+        elif kind == 'vlan':
+            assert list(topology.query(kind, value)) == scan_vlan(topology, value)
+        elif kind == 'description':
+            assert list(topology.query(kind, value)) == scan_description(topology, value)
+    return rows, interfaces, topology.queries.hits, topology.queries.misses
+
+
+if __name__ == "__main__":
+    count = 2000
+    rows, interfaces, hits, misses = run(count=count)
+    print(f"{interfaces} interfaces, {count} queries ({hits} cache hits, {misses} misses in the cached run)")
+    baseline = rows['interface scans']
+    for name, seconds in rows.items():
+        print(f"{name:>22}  {seconds * 1000:>10.1f} ms  {seconds / count * 1e6:>10.1f} us/query  {baseline / seconds:>9.1f}x")
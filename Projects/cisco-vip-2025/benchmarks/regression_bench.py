@@ -0,0 +1,180 @@
+# Performance regression suite: builds synthetic networks (synthetic.py) of 10, 1k and 10k
+# routers and records parse throughput, link-discovery time, peak memory and graph size, then
+# compares them with the stored baseline in benchmarks/baseline.json.
+# Run from the project directory:
+#   python -m benchmarks.regression_bench                     # all sizes, compare with the baseline
+#   python -m benchmarks.regression_bench --sizes 10 1000     # a subset
+#   python -m benchmarks.regression_bench --update-baseline   # record this machine's numbers
+# Exits with status 1 when a metric is worse than the baseline by more than its tolerance.
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+
+from synthetic import SyntheticNetwork
+from topology_builder import NetworkTopologyBuilder
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SIZES = (10, 1_000, 10_000)
+NETWORK_OPTIONS = {'lans': 2, 'svis': 1, 'subinterfaces': 1, 'segment_size': 0, 'static_routes': 3, 'ospf_areas': 4, 'seed': 0}
+
+# metric -> (which direction is better, allowed relative change before it counts as a regression).
+# Graph size is deterministic for a given generator, so any change there is a behaviour change.
+CHECKS = {
+    'parse_lines_per_s': ('higher', 0.25),
+    'discover_links_s': ('lower', 0.25),
+    'build_s': ('lower', 0.25),
+    'peak_memory_mb': ('lower', 0.10),
+    'graph_nodes': ('exact', 0),
+    'graph_edges': ('exact', 0),
+    'router_links': ('exact', 0),
+}
+# Timings below this are mostly noise (the 10-router build takes a few milliseconds)
+MIN_SECONDS = 0.05
+
+
+def _build(conf, trace_memory=False):
+    topology = NetworkTopologyBuilder()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        topology.build_topology_from_configs(conf)
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return topology, peak
+
+
+def measure(routers, repeat=2, options=NETWORK_OPTIONS):
+    """Metrics for one network size: the best of `repeat` timed builds, plus one traced build for peak memory."""
+    network = SyntheticNetwork(routers, **options)
+    with tempfile.TemporaryDirectory() as tmp:
+        conf = os.path.join(tmp, 'Conf')
+        summary = network.write(conf)
+        best = None
+        for _ in range(repeat):
+            topology, _ = _build(conf)
+            stages = {name: seconds for name, (seconds, _) in topology.stats.stages.items()}
+            if best is None or stages['build_total'] < best[1]['build_total']:
+                best = topology, stages
+        _, peak = _build(conf, trace_memory=True)
+
+    topology, stages = best
+    router_links = {frozenset((a, b)) for a, b in topology.graph.edges() if a in topology.devices and b in topology.devices}
+    if len(router_links) != summary['adjacent_pairs']:
+        # A correctness failure, not a slowdown: the timings of a wrong build aren't worth comparing
+        raise RuntimeError(f"{routers} routers: discovered {len(router_links)} router links, "
+                           f"the generated network has {summary['adjacent_pairs']}")
+    return {
+        'routers': routers,
+        'config_lines': summary['config_lines'],
+        'config_mb': round(summary['config_bytes'] / 1e6, 3),
+        'parse_s': round(stages['parse'], 4),
+        'parse_lines_per_s': round(summary['config_lines'] / stages['parse']),
+        'parse_mb_per_s': round(summary['config_bytes'] / 1e6 / stages['parse'], 2),
+        'discover_links_s': round(stages['discover_links'], 4),
+        'build_s': round(stages['build_total'], 4),
+        'peak_memory_mb': round(peak / 1e6, 2),
+        'graph_nodes': topology.graph.number_of_nodes(),
+        'graph_edges': topology.graph.number_of_edges(),
+        'router_links': len(router_links),
+    }
+
+
+def compare(results, baseline, tolerance_scale=1.0):
+    """
+    Regressions of results against baseline (both {routers: metrics}), as a list of
+    {'routers', 'metric', 'baseline', 'current', 'change'} dicts. tolerance_scale widens
+    (or narrows) every tolerance, e.g. 2.0 on a noisy CI machine.
+    """
+    regressions = []
+    for routers, current in results.items():
+        previous = baseline.get(routers)
+        if previous is None:
+            continue
+        for metric, (better, tolerance) in CHECKS.items():
+            if metric not in current or metric not in previous:
+                continue
+            old, new = previous[metric], current[metric]
+            if better == 'exact':
+                worse = new != old
+            else:
+                # Skip timings too short to compare (throughput is judged by the parse time behind it)
+                seconds = previous['parse_s'] if metric == 'parse_lines_per_s' else old
+                if metric != 'peak_memory_mb' and seconds < MIN_SECONDS:
+                    continue
+                limit = tolerance * tolerance_scale
+                worse = new < old * (1 - limit) if better == 'higher' else new > old * (1 + limit)
+            if worse:
+                regressions.append({'routers': routers, 'metric': metric, 'baseline': old, 'current': new,
+                                    'change': round(new / old - 1, 3) if old else None})
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        stored = json.load(f)
+    return stored, {int(routers): metrics for routers, metrics in stored['results'].items()}
+
+
+def write_baseline(results, path=BASELINE_PATH, options=NETWORK_OPTIONS):
+    stored = {
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        'python': platform.python_version(),
+        'network_options': options,
+        'results': {str(routers): metrics for routers, metrics in sorted(results.items())},
+    }
+    with open(path, 'w') as f:
+        json.dump(stored, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Topology build regression benchmarks")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="router counts to build")
+    arg_parser.add_argument('--repeat', type=int, default=2, help="timed builds per size (the best one counts)")
+    arg_parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline JSON to compare with or update")
+    arg_parser.add_argument('--update-baseline', action='store_true', help="store these results as the new baseline")
+    arg_parser.add_argument('--tolerance-scale', type=float, default=1.0, help="multiply every tolerance (e.g. 2 on noisy machines)")
+    arg_parser.add_argument('--output', metavar='PATH', help="also write the results as JSON")
+    args = arg_parser.parse_args()
+
+    results = {}
+    print(f"{'routers':>8}  {'lines':>9}  {'parse (s)':>9}  {'lines/s':>9}  {'MB/s':>6}  {'links (s)':>9}  "
+          f"{'build (s)':>9}  {'peak MB':>8}  {'nodes':>7}  {'edges':>7}")
+    for routers in args.sizes:
+        row = results[routers] = measure(routers, args.repeat)
+        print(f"{routers:>8}  {row['config_lines']:>9}  {row['parse_s']:>9.3f}  {row['parse_lines_per_s']:>9}  "
+              f"{row['parse_mb_per_s']:>6.1f}  {row['discover_links_s']:>9.3f}  {row['build_s']:>9.3f}  "
+              f"{row['peak_memory_mb']:>8.1f}  {row['graph_nodes']:>7}  {row['graph_edges']:>7}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({str(routers): row for routers, row in results.items()}, f, indent=2)
+
+    if args.update_baseline:
+        write_baseline(results, args.baseline)
+        print(f"Baseline written to '{args.baseline}'")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at '{args.baseline}'; run with --update-baseline to create one")
+        return 0
+    stored, baseline = load_baseline(args.baseline)
+    print(f"Baseline: {stored['machine']}, Python {stored['python']}")
+    if stored.get('network_options') != NETWORK_OPTIONS:
+        print("Warning: the baseline was recorded with different network options")
+    regressions = compare(results, baseline, args.tolerance_scale)
+    for regression in regressions:
+        change = f"{regression['change']:+.0%}" if regression['change'] is not None else "changed"
+        print(f"REGRESSION  {regression['routers']} routers  {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']} ({change})")
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
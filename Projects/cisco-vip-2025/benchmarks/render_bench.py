@@ -0,0 +1,79 @@
+# Headless render time per graph size: a cold render (full layout) and a warm re-render after a
+# few devices were added (cached layout, only the new nodes placed). For comparison, the spring
+# layout the interactive visualize_topology() uses is timed on its own up to 500 nodes
+# (above that networkx needs SciPy for it).
+# Run from the project directory:  python -m benchmarks.render_bench
+import os
+import tempfile
+import time
+
+import networkx as nx
+
+from config_parser import CiscoConfigParser
+from render import LayoutCache, render_topology
+from topology_builder import NetworkTopologyBuilder
+
+
+FANOUT = 4
+
+
+def _link_base(link):
+    # Link n (router n's uplink) is the /30 at 10.0.0.0 + 4n
+    address = link * 4
+    return f"10.{(address >> 16) & 255}.{(address >> 8) & 255}.{address & 255}"
+
+
+def _add(topology, i):
+    # A tree of routers: router i uplinks to router (i - 1) // FANOUT and has FANOUT downlink ports.
+    # Ports without a child yet show up as stub networks.
+    lines = [f"hostname R{i}"]
+    if i:
+        base = _link_base(i).rsplit('.', 1)
+        lines += ["interface Gi0/0", f" ip address {base[0]}.{int(base[1]) + 2} 255.255.255.252", "!"]
+    for k in range(FANOUT):
+        base = _link_base(i * FANOUT + k + 1).rsplit('.', 1)
+        lines += [f"interface Gi0/{k + 1}", f" ip address {base[0]}.{int(base[1]) + 1} 255.255.255.252", "!"]
+    device_parser = CiscoConfigParser("\n".join(lines) + "\n")
+    device_parser.parse()
+    topology.add_device(device_parser)
+
+
+def build(routers):
+    topology = NetworkTopologyBuilder()
+    for i in range(routers):
+        _add(topology, i)
+    topology._discover_links()
+    return topology
+
+
+def run(sizes=(25, 100, 500, 2500, 10000)):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, 'topology.png')
+        for routers in sizes:
+            topology = build(routers)
+            cache = LayoutCache()
+            cold = render_topology(topology.graph, output_path, cache)
+            # Grow by 1% and re-render with the cached positions
+            for i in range(routers, routers + max(1, routers // 100)):
+                _add(topology, i)
+            topology._discover_links()
+            warm = render_topology(topology.graph, output_path, cache)
+            spring_s = None
+            if cold['nodes'] <= 500:
+                start = time.perf_counter()
+                nx.spring_layout(topology.graph, seed=42)
+                spring_s = time.perf_counter() - start
+            rows.append({'nodes': cold['nodes'], 'edges': cold['edges'], 'layout': cold['layout'],
+                         'cold_layout_s': cold['layout_s'], 'cold_total_s': cold['total_s'],
+                         'warm_layout_s': warm['layout_s'], 'warm_total_s': warm['total_s'], 'spring_layout_s': spring_s})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'nodes':>7}  {'links':>7}  {'layout':>12}  {'cold layout':>11}  {'cold total':>10}  "
+          f"{'warm layout':>11}  {'warm total':>10}  {'spring only':>11}")
+    for row in run():
+        spring = f"{row['spring_layout_s']:>10.2f}s" if row['spring_layout_s'] is not None else f"{'-':>11}"
+        print(f"{row['nodes']:>7}  {row['edges']:>7}  {row['layout']:>12}  {row['cold_layout_s']:>10.3f}s  {row['cold_total_s']:>9.2f}s  "
+              f"{row['warm_layout_s']:>10.3f}s  {row['warm_total_s']:>9.2f}s  {spring}")
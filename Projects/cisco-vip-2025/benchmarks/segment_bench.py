@@ -0,0 +1,35 @@
+# benchmarks/segment_bench.py
+# Graph size and link-discovery time for one large multi-access subnet, full mesh vs. segment hub node.
+# Run from the project directory:  python -m benchmarks.segment_bench
+import time
+
+from config_parser import CiscoConfigParser
+from topology_builder import NetworkTopologyBuilder
+
+
+def build(members, multi_access_mode):
+    topology = NetworkTopologyBuilder(multi_access_mode=multi_access_mode)
+    for i in range(members):
+        device_parser = CiscoConfigParser(
+            f"hostname SW{i}\ninterface Vlan40\n ip address 10.40.{i // 250}.{i % 250 + 1} 255.255.252.0\n!\n")
+        device_parser.parse()
+        topology.add_device(device_parser)
+    start = time.perf_counter()
+    topology._discover_links()
+    elapsed = time.perf_counter() - start
+    return topology.graph.number_of_nodes(), topology.graph.number_of_edges(), elapsed
+
+
+def run(sizes=(10, 50, 100, 300, 1000)):
+    rows = []
+    for members in sizes:
+        for multi_access_mode in ('mesh', 'segment'):
+            nodes, edges, elapsed = build(members, multi_access_mode)
+            rows.append({'members': members, 'mode': multi_access_mode, 'nodes': nodes, 'edges': edges, 'discover_s': elapsed})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'members':>8}  {'mode':>8}  {'nodes':>7}  {'edges':>9}  {'discover (s)':>12}")
+    for row in run():
+        print(f"{row['members']:>8}  {row['mode']:>8}  {row['nodes']:>7}  {row['edges']:>9}  {row['discover_s']:>12.4f}")
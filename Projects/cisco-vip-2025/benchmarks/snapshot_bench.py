@@ -0,0 +1,74 @@
+# Re-parsing a Conf directory vs. loading the topology from a binary snapshot (snapshot.py).
+# Three ways to get at a built topology: parse every config.dump again, rebuild a full builder
+# with load_topology(), or just mmap the snapshot with TopologySnapshot and query it in place.
+# Run from the project directory:  python -m benchmarks.snapshot_bench
+import os
+import tempfile
+import time
+
+from snapshot import TopologySnapshot, load_topology
+from topology_builder import NetworkTopologyBuilder
+
+
+def make_device_config(i, interfaces):
+    """Device i: a /30 uplink shared with device i - 1, a downlink shared with i + 1, and `interfaces` /27 stub LANs of its own."""
+    lines = [f"hostname R{i}", "!",
+             "interface GigabitEthernet0/0", f" ip address 172.16.{i // 64}.{(i % 64) * 4 + 1} 255.255.255.252", "!",
+             "interface GigabitEthernet0/1", f" ip address 172.16.{(i - 1) // 64}.{((i - 1) % 64) * 4 + 2} 255.255.255.252", "!"]
+    for k in range(interfaces):
+        lines += [f"interface GigabitEthernet1/{k}", f" description Access LAN {k}",
+                  f" ip address 10.{i >> 8}.{i & 255}.{k * 32 + 1} 255.255.255.224", " duplex auto", " speed auto", "!"]
+    lines += ["router ospf 1", " network 172.16.0.0 0.0.255.255 area 0", "!",
+              f"ip route 0.0.0.0 0.0.0.0 172.16.{i // 64}.{(i % 64) * 4 + 2}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_conf_directory(root, devices, interfaces):
+    for i in range(1, devices + 1):
+        os.makedirs(os.path.join(root, f"R{i}"))
+        with open(os.path.join(root, f"R{i}", 'config.dump'), 'w') as f:
+            f.write(make_device_config(i, interfaces))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def query(snapshot, devices):
+    # A handful of typical lookups against the mapped file
+    for i in range(1, devices + 1, max(1, devices // 100)):
+        snapshot.neighbors(f"R{i}")
+        snapshot.interfaces(f"R{i}")
+    return snapshot.subnet_members('172.16.0.4/30')
+
+
+def run(devices=10000, interfaces=4):
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conf = os.path.join(tmp, 'Conf')
+        write_conf_directory(conf, devices, interfaces)
+        snapshot_path = os.path.join(tmp, 'topology.snap')
+
+        topology = NetworkTopologyBuilder()
+        rows['re-parse configs'], _ = timed(topology.build_topology_from_configs, conf)
+        rows['save snapshot'], _ = timed(topology.save_snapshot, snapshot_path)
+        rows['load_topology()'], loaded = timed(load_topology, snapshot_path)
+        assert loaded.graph.number_of_edges() == topology.graph.number_of_edges()
+
+        rows['open snapshot'], snapshot = timed(TopologySnapshot, snapshot_path)
+        rows['100 device queries'], members = timed(query, snapshot, devices)
+        assert sorted(hostname for hostname, _ in members) == ['R1', 'R2']
+        snapshot.close()
+
+        config_bytes = sum(os.path.getsize(os.path.join(conf, device, 'config.dump')) for device in os.listdir(conf))
+        sizes = {'configs': config_bytes, 'snapshot': os.path.getsize(snapshot_path)}
+    return rows, sizes, topology.graph.number_of_nodes(), topology.graph.number_of_edges()
+
+
+if __name__ == "__main__":
+    rows, sizes, nodes, edges = run()
+    print(f"{nodes} nodes, {edges} edges; configs {sizes['configs'] / 1e6:.1f} MB, snapshot {sizes['snapshot'] / 1e6:.1f} MB")
+    for name, seconds in rows.items():
+        print(f"{name:>20}  {seconds * 1000:>10.1f} ms  {rows['re-parse configs'] / seconds:>8.1f}x")
@@ -1,30 +1,288 @@
 import re
 import os
+import logging
+from itertools import chain, islice
 from ipaddress import ip_interface, IPv4Network
+from instrumentation import BuildStats, timed_method
+from records import InterfaceRecord, StaticRouteRecord, int_to_quad, quad_to_int
+import platforms
+
+logger = logging.getLogger(__name__)
+
+# Methods timed individually when a parser is given a BuildStats with profile_parser=True
+_STREAM_PARSE_METHODS = ('_parse_global_line', '_parse_interface_line', '_parse_ospf_line', '_parse_vlan_line')
+_REGEX_PARSE_METHODS = ('_parse_hostname', '_parse_interfaces', '_parse_static_routes', '_parse_routing_ospf')
+
+# Config file names looked for inside a per-device directory (Conf/R1/config.dump), in this order
+CONFIG_FILE_NAMES = ('config.dump', 'running-config', 'running-config.txt')
+# Single-file configs can also sit directly in the Conf directory (Conf/R1.cfg)
+CONFIG_FILE_EXTENSIONS = ('.cfg', '.conf', '.dump')
 
 class CiscoConfigParser:
-    def __init__(self, config_text, hostname="Unknown"):
+    """
+    IOS parser, and the base class of the other platforms' parsers (see platforms.py). Every
+    platform produces the same normalized interfaces, static routes, OSPF network statements
+    and VLANs, so the topology builder doesn't care which one parsed a device.
+    """
+    platform = 'ios'
+
+    def __init__(self, config_text=None, hostname="Unknown", compact=False, stats=None):
         self.config_text = config_text
         self.hostname = hostname
+        # compact=True stores interfaces and static routes as InterfaceRecord / StaticRouteRecord
+        # (slotted, int-encoded addresses) instead of dicts. They support the same dict-style access.
+        self.compact = compact
+        # Optional BuildStats: counts lines, and with profile_parser times each _parse_* method
+        self.stats = stats
         self.interfaces = []
         self.static_routes = []
         self.routing_protocols = {}
         self.vlan_info = []
+        self._carry = None # Unfinished last line between feed() calls; None when no feed is in progress
+        # (process id, area, interface name) for OSPF enabled under an interface rather than by a
+        # network statement (NX-OS, IOS-XR); turned into network statements when the parse ends
+        self._interface_ospf = []
 
-    def parse(self):
+    def parse(self, lines=None):
+        """
+        Single-pass, line-oriented parse. `lines` can be an open file handle or any
+        iterator of lines; if omitted, the stored config_text is split into lines.
+        Each line is looked at once and dispatched on its indentation and first keyword,
+        so the whole config never has to be held in memory.
+        """
+        if lines is None:
+            lines = (self.config_text or "").splitlines()
+        self._reset_stream_state()
+        if self.stats is None:
+            for line in lines:
+                self._feed_line(line)
+        else:
+            self._instrument(_STREAM_PARSE_METHODS)
+            line_count = 0
+            for line in lines:
+                line_count += 1
+                self._feed_line(line)
+            self.stats.count('lines_parsed', line_count)
+        self._finish()
+
+    def feed(self, chunk):
+        """
+        Incremental parse: hand the config over in arbitrary text chunks (e.g. as they arrive
+        from a device) and call close() after the last one. A line split across chunks is
+        carried over until its end arrives.
+        """
+        if self._carry is None:
+            self._reset_stream_state()
+            self._carry = ''
+            if self.stats is not None:
+                self._instrument(_STREAM_PARSE_METHODS)
+        lines = (self._carry + chunk).split('\n')
+        self._carry = lines.pop()
+        if self.stats is not None:
+            self.stats.count('lines_parsed', len(lines))
+        for line in lines:
+            self._feed_line(line)
+
+    def close(self):
+        """Finishes a feed() parse: the last, unterminated line and the open section."""
+        if self._carry:
+            if self.stats is not None:
+                self.stats.count('lines_parsed')
+            self._feed_line(self._carry)
+        self._carry = None
+        self._finish()
+
+    def parse_regex(self):
+        """The original multi-regex parse over config_text. Kept for benchmarking and cross-checks."""
+        if self.stats is not None:
+            self._instrument(_REGEX_PARSE_METHODS)
         self._parse_hostname()
         self._parse_interfaces()
         self._parse_static_routes()
         self._parse_routing_ospf()
 
+    def _instrument(self, method_names):
+        # Shadow the methods on this instance with timed wrappers; parsers without stats pay nothing
+        if not self.stats.profile_parser:
+            return
+        for name in method_names:
+            if name not in self.__dict__:
+                setattr(self, name, timed_method(getattr(self, name), self.stats, f"parser.{name}"))
+
+    def to_record(self):
+        """
+        Compact, picklable summary of the parse results (no config_text, no IPv4Network objects).
+        Used to ship results back from worker processes; from_record() rebuilds the parser.
+        """
+        interfaces = [(intf['name'], intf['ip_address'], intf['subnet_mask'], intf['description'],
+                       intf['shutdown'], intf['vlan'], intf.get('network'))
+                      for intf in self.interfaces]
+        static_routes = [dict(route) for route in self.static_routes]
+        return (self.hostname, interfaces, static_routes, self.routing_protocols, self.vlan_info, self.platform)
+
+    @classmethod
+    def from_record(cls, record, compact=False):
+        """
+        Rebuilds a parsed parser of this class from a to_record() tuple. The record's platform
+        isn't looked at here; parser_from_record() picks the class that goes with it.
+        """
+        hostname, interfaces, static_routes, routing_protocols, vlan_info, _ = record
+        parser = cls(hostname=hostname, compact=compact)
+        if compact:
+            parser.interfaces = [InterfaceRecord(*intf) for intf in interfaces]
+            parser.static_routes = [StaticRouteRecord.from_dict(route) for route in static_routes]
+            parser.routing_protocols = routing_protocols
+            parser.vlan_info = vlan_info
+            return parser
+        for name, ip, mask, description, shutdown, vlan, network in interfaces:
+            intf_dict = {'name': name, 'ip_address': ip, 'subnet_mask': mask, 'description': description, 'shutdown': shutdown, 'vlan': vlan}
+            # The parser only sets 'network' (and 'network_object') on interfaces that have an IP
+            if ip is not None:
+                intf_dict['network'] = network
+                if network is not None:
+                    intf_dict['network_object'] = IPv4Network(network)
+            parser.interfaces.append(intf_dict)
+        parser.static_routes = static_routes
+        parser.routing_protocols = routing_protocols
+        parser.vlan_info = vlan_info
+        return parser
+
+    # --- Streaming parser internals ---
+
+    def _reset_stream_state(self):
+        # The section we are currently inside: None, 'interface', 'ospf', 'vlan' or 'other'
+        self._section = None
+        self._section_indent = 0
+        self._section_data = None
+
+    def _feed_line(self, line):
+        stripped = line.strip()
+        if not stripped:
+            return
+        indent = len(line) - len(line.lstrip())
+
+        # '!' closes whatever block we're in, same as the end-of-block marker in the regex path
+        if stripped[0] == '!':
+            self._end_section()
+            return
+
+        # Anything indented deeper than the section header belongs to that section
+        if self._section is not None and indent > self._section_indent:
+            tokens = stripped.split()
+            if self._section == 'interface':
+                self._parse_interface_line(tokens, stripped)
+            elif self._section == 'ospf':
+                self._parse_ospf_line(tokens)
+            elif self._section == 'vlan':
+                self._parse_vlan_line(tokens, stripped)
+            return
+
+        self._end_section()
+        self._parse_global_line(stripped.split(), stripped, indent)
+
+    def _parse_global_line(self, tokens, stripped, indent):
+        keyword = tokens[0]
+        self._section = 'other'
+        self._section_indent = indent
+
+        if keyword == 'hostname' and len(tokens) > 1:
+            self.hostname = tokens[1]
+        elif keyword == 'interface' and len(tokens) > 1:
+            name = stripped[len('interface'):].strip()
+            self._section = 'interface'
+            self._section_data = {'name': name, 'ip_address': None, 'subnet_mask': None, 'description': None, 'shutdown': False, 'vlan': None}
+            if name.lower().startswith('vlan'):
+                vlan_num = name[4:].strip()
+                if vlan_num.isdigit():
+                    self._section_data['vlan'] = vlan_num
+        elif keyword == 'ip' and len(tokens) >= 5 and tokens[1] == 'route':
+            if _is_dotted_quad(tokens[2]) and _is_dotted_quad(tokens[3]) and _is_dotted_quad(tokens[4]):
+                self._add_static_route(tokens[2], tokens[3], tokens[4])
+        elif keyword == 'router' and len(tokens) > 2 and tokens[1] == 'ospf' and tokens[2].isdigit():
+            self._section = 'ospf'
+            self._section_data = {'process_id': tokens[2], 'networks': []}
+            self.routing_protocols.setdefault('ospf', []).append(self._section_data)
+        elif keyword == 'vlan' and len(tokens) == 2 and tokens[1].isdigit():
+            self._section = 'vlan'
+            self._section_data = {'vlan_id': tokens[1], 'name': None}
+            self.vlan_info.append(self._section_data)
+
+    def _parse_interface_line(self, tokens, stripped):
+        intf_dict = self._section_data
+        keyword = tokens[0]
+        if keyword == 'shutdown':
+            intf_dict['shutdown'] = True
+        elif keyword == 'ip' and len(tokens) >= 4 and tokens[1] == 'address' and intf_dict['ip_address'] is None:
+            if 'secondary' in tokens[4:]:
+                return
+            self._set_interface_address(tokens[2], tokens[3])
+        elif keyword == 'description' and intf_dict['description'] is None and len(tokens) > 1:
+            intf_dict['description'] = stripped[len('description'):].strip()
+        elif keyword == 'encapsulation' and len(tokens) >= 3 and tokens[1].lower() == 'dot1q' and tokens[2].isdigit():
+            intf_dict['vlan'] = tokens[2]
+
+    def _parse_ospf_line(self, tokens):
+        if tokens[0] == 'network' and len(tokens) >= 5 and tokens[3] == 'area':
+            self._section_data['networks'].append({'network': tokens[1], 'wildcard': tokens[2], 'area': tokens[4]})
+
+    def _parse_vlan_line(self, tokens, stripped):
+        if tokens[0] == 'name' and len(tokens) > 1:
+            self._section_data['name'] = stripped[len('name'):].strip()
+
+    def _finish(self):
+        self._end_section()
+        # One host-address statement per interface OSPF runs on: matches exactly that interface
+        by_name = {intf['name']: intf for intf in self.interfaces} if self._interface_ospf else {}
+        for process_id, area, name in self._interface_ospf:
+            intf = by_name.get(name)
+            if intf is None or intf['ip_address'] is None:
+                continue
+            process = self._ospf_process(process_id)
+            process['networks'].append({'network': intf['ip_address'], 'wildcard': '0.0.0.0', 'area': area})
+        self._interface_ospf = []
+
+    def _ospf_process(self, process_id):
+        for process in self.routing_protocols.setdefault('ospf', []):
+            if process['process_id'] == process_id:
+                return process
+        process = {'process_id': process_id, 'networks': []}
+        self.routing_protocols['ospf'].append(process)
+        return process
+
+    def _add_static_route(self, network, mask, next_hop):
+        if self.compact:
+            self.static_routes.append(StaticRouteRecord(network, mask, next_hop))
+        else:
+            self.static_routes.append({'network': network, 'mask': mask, 'next_hop': next_hop})
+
+    def _set_interface_address(self, ip, mask):
+        intf_dict = self._section_data
+        if intf_dict['ip_address'] is not None or not (_is_dotted_quad(ip) and _is_dotted_quad(mask)):
+            return
+        intf_dict['ip_address'] = ip
+        intf_dict['subnet_mask'] = mask
+        network = _network_from_ip_mask(ip, mask)
+        intf_dict['network'] = str(network) if network is not None else None
+        if network is not None:
+            intf_dict['network_object'] = network
+
+    def _end_section(self):
+        if self._section == 'interface':
+            if self.compact:
+                self.interfaces.append(InterfaceRecord.from_dict(self._section_data))
+            else:
+                self.interfaces.append(self._section_data)
+        self._section = None
+        self._section_data = None
+
+    # --- Original regex-based parser ---
+
     def _parse_hostname(self):
-        print(f"DEBUG: Looking for hostname in config text...")  # ADD THIS LINE
         match = re.search(r'^hostname\s+(\S+)', self.config_text, re.MULTILINE)
         if match:
-            print(f"DEBUG: Found hostname: {match.group(1)}")  # ADD THIS LINE
             self.hostname = match.group(1)
         else:
-            print(f"DEBUG: No hostname found in config")  # ADD THIS LINE
+            logger.debug("No hostname found in config")
 
     def _parse_interfaces(self):
         interface_blocks = re.findall(r'interface\s+(\S+[^\n!]*)(.*?)(?=^!|\Z)', self.config_text, re.MULTILINE | re.DOTALL)
@@ -82,25 +340,97 @@ class CiscoConfigParser:
                     process_info['networks'].append({'network': network, 'wildcard': wildcard, 'area': area})
                 self.routing_protocols['ospf'].append(process_info)
 
+def _is_dotted_quad(token):
+    parts = token.split('.')
+    return len(parts) == 4 and all(part.isdigit() for part in parts)
+
+def _split_cidr(token):
+    """'10.1.1.1/30' -> ('10.1.1.1', '255.255.255.252'), or None if it isn't address/length."""
+    address, _, length = token.partition('/')
+    if not (_is_dotted_quad(address) and length.isdigit() and int(length) <= 32):
+        return None
+    return address, int_to_quad((0xFFFFFFFF << (32 - int(length))) & 0xFFFFFFFF)
+
+# Netmask int -> prefix length, for the contiguous masks IOS accepts on interfaces
+_PREFIX_BY_MASK = {(0xFFFFFFFF << (32 - plen)) & 0xFFFFFFFF: plen for plen in range(33)}
+
+def _network_from_ip_mask(ip, mask):
+    """Same result as ip_interface(f"{ip}/{mask}").network, without the string parsing on the common path."""
+    try:
+        ip_int = quad_to_int(ip)
+        prefixlen = _PREFIX_BY_MASK.get(quad_to_int(mask))
+        if prefixlen is not None:
+            return IPv4Network((ip_int & ((0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF), prefixlen))
+        # Uncommon masks (hostmask form etc.) take the slow path so the semantics stay identical
+        return ip_interface(f"{ip}/{mask}").network
+    except ValueError:
+        return None
+
+def find_config_file(conf_directory, entry):
+    """
+    The config file for one entry of a Conf directory: <entry>/config.dump (or another of
+    CONFIG_FILE_NAMES) for a device directory, or the entry itself for a single-file config
+    like R1.cfg. None if the entry doesn't hold a config.
+    """
+    path = os.path.join(conf_directory, entry)
+    if os.path.isdir(path):
+        for name in CONFIG_FILE_NAMES:
+            if os.path.isfile(os.path.join(path, name)):
+                return os.path.join(path, name)
+        return None
+    if not entry.startswith('.') and os.path.splitext(entry)[1].lower() in CONFIG_FILE_EXTENSIONS and os.path.isfile(path):
+        return path
+    return None
+
+def guess_hostname(file_path):
+    """Fallback hostname for a config file, used until its `hostname` line is seen."""
+    base_name = os.path.basename(file_path)
+    if base_name in CONFIG_FILE_NAMES:
+        return os.path.basename(os.path.dirname(file_path)) # 'R1' from 'Conf/R1/config.dump'
+    return os.path.splitext(base_name)[0] # 'R1' from 'R1.cfg'
+
 # Helper function to load a config file from disk and return a parser object
-def load_config_from_file(file_path):
-    """Reads a config file and returns a parsed CiscoConfigParser object."""
+def load_config_from_file(file_path, compact=False, stats=None, platform=None):
+    """
+    Reads a config file and returns it parsed. The platform (IOS, NX-OS, IOS-XR...) is detected
+    from the first lines of the file unless given, and picks the parser class (see platforms.py).
+    """
     try:
+        hostname_guess = guess_hostname(file_path)
+        # Stream the file straight into the parser instead of reading it into one string
         with open(file_path, 'r') as f:
-            config_text = f.read()
-        # Extract a hostname from the filename as a fallback
-        base_name = os.path.basename(file_path)
-        print(f"DEBUG: File path: {file_path}")  # ADD THIS
-        print(f"DEBUG: Base name: {base_name}")  # ADD THIS
-        hostname_guess = os.path.splitext(base_name)[0] # 'R1' from 'R1.config.dump'
-        print(f"DEBUG: Hostname guess: {hostname_guess}")  # ADD THIS
-        parser = CiscoConfigParser(config_text, hostname_guess)
-        parser.parse()
+            head = list(islice(f, platforms.DETECT_LINES))
+            if platform is None:
+                platform = platforms.detect_platform(head)
+            logger.debug("Parsing %s (hostname guess: %s, platform: %s)", file_path, hostname_guess, platform)
+            parser = platforms.parser_class(platform)(hostname=hostname_guess, compact=compact, stats=stats)
+            if stats is not None:
+                stats.count('files_read')
+                stats.count('bytes_parsed', os.fstat(f.fileno()).st_size)
+                stats.count(f'platform_{platform}')
+            parser.parse(chain(head, f))
         return parser
     except FileNotFoundError:
-        print(f"Error: Config file not found at {file_path}")
+        logger.error("Config file not found at %s", file_path)
         return None
 
+def parser_from_record(record, compact=False):
+    """Rebuilds a parser from a to_record() tuple, as an instance of its platform's parser class."""
+    return platforms.parser_class(record[5]).from_record(record, compact=compact)
+
+def parse_config_record(file_path, profile=False):
+    """
+    Process-pool entry point: parses one config file and returns its compact record (or None).
+    With profile=True, returns (record, BuildStats report dict) so workers can ship their timings back.
+    """
+    if not profile:
+        parser = load_config_from_file(file_path)
+        return parser.to_record() if parser is not None else None
+    stats = BuildStats(profile_parser=True)
+    with stats.stage('parse_file'):
+        parser = load_config_from_file(file_path, stats=stats)
+    return (parser.to_record() if parser is not None else None), stats.to_dict()
+
 # Test code - only runs if this file is executed directly
 if __name__ == "__main__":
     sample_config = """
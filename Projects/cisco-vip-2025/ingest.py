@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+
+import platforms
+from config_parser import find_config_file, guess_hostname
+
+logger = logging.getLogger(__name__)
+
+# Asyncio ingestion pipeline: fetch running-configs from a source, parse them chunk by chunk as
+# they arrive, and add finished devices to a NetworkTopologyBuilder while other fetches are
+# still in flight.
+#
+#   source.devices() --> [device queue] --> `concurrency` fetch/parse workers --> [parsed queue] --> builder
+#
+# Both queues are bounded. When the builder falls behind, workers block on the parsed queue and
+# stop pulling new devices, and a worker only asks its source for the next chunk once the
+# parser has taken the previous one, so nothing upstream runs ahead of what can be consumed.
+
+DEFAULT_CONCURRENCY = 8
+DIRECTORY_CHUNK_SIZE = 64 * 1024
+
+
+class ConfigSource(ABC):
+    """
+    Where configs come from. Subclasses implement devices() and fetch(), usually as async
+    generators; a subclass missing either can't be instantiated.
+    hostname_guess(device) is the hostname used until the config's own `hostname` line is seen;
+    by default the device id itself.
+    """
+
+    @abstractmethod
+    def devices(self):
+        """Async iterator of device ids."""
+
+    @abstractmethod
+    def fetch(self, device):
+        """Async iterator of config text chunks for one device (split anywhere, even mid-line)."""
+
+    def hostname_guess(self, device):
+        return device
+
+
+class DirectorySource(ConfigSource):
+    """A Conf directory on local disk (same layout as build_topology_from_configs), read in chunks off the event loop."""
+
+    def __init__(self, conf_directory, chunk_size=DIRECTORY_CHUNK_SIZE):
+        self.conf_directory = conf_directory
+        self.chunk_size = chunk_size
+
+    async def devices(self):
+        for entry in await asyncio.to_thread(os.listdir, self.conf_directory):
+            if self._config_path(entry) is not None:
+                yield entry
+            else:
+                logger.info("Skipping %s, no config file found.", entry)
+
+    async def fetch(self, device):
+        with open(self._config_path(device), 'r') as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def hostname_guess(self, device):
+        return guess_hostname(self._config_path(device)) # 'R1' for both R1/config.dump and R1.cfg
+
+    def _config_path(self, device):
+        return find_config_file(self.conf_directory, device)
+
+
+class FakeDeviceSource(ConfigSource):
+    """
+    In-memory stand-in for live devices, for tests and benchmarks. Serves each config in
+    chunk_size pieces, one every `delay` seconds after the fetch starts, and raises
+    ConnectionError for devices listed in `failing`. max_active records the most fetches that
+    were ever open at once.
+
+    Like a real transfer filling a socket buffer, the clock keeps running while the consumer is
+    busy: a chunk that came due while the parser was working is handed over straight away.
+    """
+
+    def __init__(self, configs, chunk_size=256, delay=0.0, failing=()):
+        self.configs = configs # device id -> config text
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+
+    async def devices(self):
+        for device in self.configs:
+            yield device
+
+    async def fetch(self, device):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            text = self.configs[device]
+            loop = asyncio.get_running_loop()
+            due = loop.time()
+            for start in range(0, len(text), self.chunk_size):
+                due += self.delay
+                await asyncio.sleep(max(0.0, due - loop.time()))
+                if device in self.failing and start > 0:
+                    raise ConnectionError(f"Connection to {device} dropped")
+                yield text[start:start + self.chunk_size]
+        finally:
+            self.active -= 1
+
+
+async def ingest(topology, source, concurrency=DEFAULT_CONCURRENCY, max_pending=None):
+    """
+    Pulls every device from `source` into `topology` (a NetworkTopologyBuilder).
+
+    concurrency: fetches in flight at once.
+    max_pending: parsed devices allowed to wait for the builder before fetching pauses
+                 (default: 2 * concurrency).
+    Devices are added in the order they finish; links are discovered incrementally for each batch
+    of finished devices, so link discovery overlaps with the fetches still running.
+    Returns the number of devices added.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if max_pending is None:
+        max_pending = 2 * concurrency
+    device_queue = asyncio.Queue(maxsize=concurrency)
+    parsed_queue = asyncio.Queue(maxsize=max_pending)
+
+    async def list_devices():
+        async for device in source.devices():
+            await device_queue.put(device)
+        for _ in range(concurrency):
+            await device_queue.put(None) # One stop marker per worker
+
+    async def worker():
+        while True:
+            device = await device_queue.get()
+            if device is None:
+                break
+            device_parser = await _fetch_and_parse(topology, source, device)
+            if device_parser is not None:
+                await parsed_queue.put(device_parser)
+
+    lister = asyncio.create_task(list_devices())
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+
+    async def close_when_done():
+        try:
+            await asyncio.gather(lister, *workers)
+        finally:
+            # Also on failure, so the loop below stops waiting; the error surfaces from `await closer`
+            await parsed_queue.put(None)
+
+    closer = asyncio.create_task(close_when_done())
+    added = 0
+    try:
+        done = False
+        while not done:
+            # Take everything that finished while the last batch was being linked
+            batch = [await parsed_queue.get()]
+            while not parsed_queue.empty():
+                batch.append(parsed_queue.get_nowait())
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if batch:
+                _add_batch(topology, batch)
+                added += len(batch)
+                # Let fetches blocked on the queue move on before linking the next batch
+                await asyncio.sleep(0)
+        await closer
+    finally:
+        for task in (lister, closer, *workers):
+            task.cancel()
+    return added
+
+
+async def _fetch_and_parse(topology, source, device):
+    # The parser class depends on the platform, which is detected from the first lines; hold
+    # chunks back until those have arrived (or the config ends)
+    device_parser = None
+    head = ''
+    try:
+        async for chunk in source.fetch(device):
+            topology.stats.count('bytes_parsed', len(chunk.encode('utf-8'))) # Bytes like the file builds count, not characters
+            if device_parser is None:
+                head += chunk
+                if head.count('\n') < platforms.DETECT_LINES:
+                    continue
+                device_parser, chunk = _new_parser(topology, source.hostname_guess(device), head), head
+            device_parser.feed(chunk)
+    except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+        logger.warning("Fetching %s failed: %s", device, e)
+        topology.stats.count('fetch_errors')
+        return None
+    if device_parser is None:
+        device_parser = _new_parser(topology, source.hostname_guess(device), head)
+        device_parser.feed(head)
+    device_parser.close()
+    topology.stats.count('files_read')
+    return device_parser
+
+
+def _new_parser(topology, hostname, head):
+    platform = platforms.detect_platform(head)
+    topology.stats.count(f'platform_{platform}')
+    return platforms.parser_class(platform)(hostname=hostname, compact=topology.compact_records, stats=topology.stats)
+
+
+def _add_batch(topology, batch):
+    changed_devices = {}
+    for device_parser in batch:
+        changed_devices.setdefault(device_parser.hostname, topology.devices.get(device_parser.hostname))
+        topology.add_device(device_parser)
+    topology._discover_links(changed_devices)
@@ -0,0 +1,77 @@
+import json
+import time
+from contextlib import contextmanager
+
+# Build instrumentation: named counters and per-stage wall-clock timings, collected while a
+# topology is built and dumped as a JSON report at the end. Replaces the old DEBUG prints;
+# human-readable progress goes through the logging module instead (quiet unless configured).
+
+class BuildStats:
+    """
+    Counters and stage timings for one build.
+
+    Stages nest freely and accumulate: timing 'parse' once per file adds up to the total parse
+    time, with the number of calls alongside. Reports from worker processes are folded in with
+    merge().
+    """
+
+    def __init__(self, profile_parser=False):
+        # profile_parser: also time every CiscoConfigParser._parse_* method. Costs a timer call
+        # per config line, so it's off unless asked for.
+        self.profile_parser = profile_parser
+        self.counters = {}
+        self.stages = {} # name -> [seconds, calls]
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds, calls=1):
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = [seconds, calls]
+        else:
+            stage[0] += seconds
+            stage[1] += calls
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def merge(self, report):
+        """Adds the counters and stage times of a to_dict() report (e.g. from a worker process)."""
+        for name, amount in report.get('counters', {}).items():
+            self.count(name, amount)
+        for name, stage in report.get('stages', {}).items():
+            self.add_time(name, stage['seconds'], stage['calls'])
+
+    def to_dict(self):
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'stages': {name: {'seconds': round(seconds, 6), 'calls': calls}
+                       for name, (seconds, calls) in sorted(self.stages.items())},
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+            f.write('\n')
+
+
+def timed_method(method, stats, name):
+    """Wraps a bound method so every call adds its duration to stats under `name`."""
+    timer = time.perf_counter
+    add_time = stats.add_time
+    def timed(*args, **kwargs):
+        start = timer()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            add_time(name, timer() - start)
+    return timed
@@ -0,0 +1,101 @@
+import re
+
+from config_parser import CiscoConfigParser, _is_dotted_quad, _split_cidr
+
+# IOS-XR running-config grammar. Differences from IOS that matter for the topology:
+#   - interface addresses are "ipv4 address A M" (or A/len); "dot1q vlan N" on older releases
+#   - blocks nest several levels deep and an indented '!' only closes the innermost sub-block,
+#     so only a '!' in the first column ends the top-level section
+#   - static routes live under router static / address-family ipv4 unicast, as "<prefix>
+#     [<exit interface>] <next hop>"; routes inside a vrf block are skipped like IOS "ip route vrf"
+#   - OSPF is enabled per interface under router ospf / area <id> / interface <name>
+# Configs saved from a terminal may start with the prompt and "show running-config" line and
+# a "!! IOS XR Configuration" banner; those are ignored.
+
+_INTERFACE_PRECONFIGURE = re.compile(r'^interface\s+preconfigure\s', re.IGNORECASE)
+
+
+class IOSXRConfigParser(CiscoConfigParser):
+    platform = 'iosxr'
+
+    def _reset_stream_state(self):
+        super()._reset_stream_state()
+        # (indent, tokens) of the enclosing lines inside a router static / router ospf block
+        self._block_path = []
+
+    def _feed_line(self, line):
+        stripped = line.strip()
+        if not stripped:
+            return
+        indent = len(line) - len(line.lstrip())
+        if stripped[0] == '!':
+            # Indented '!' closes a sub-block, which indentation already tells us about
+            if indent == 0:
+                self._end_section()
+            return
+        if self._section is not None and indent > self._section_indent:
+            tokens = stripped.split()
+            if self._section == 'interface':
+                self._parse_interface_line(tokens, stripped)
+            elif self._section in ('static', 'ospf'):
+                # Drop the sub-blocks this line is no longer inside, then look at where we are
+                while self._block_path and self._block_path[-1][0] >= indent:
+                    self._block_path.pop()
+                if self._section == 'static':
+                    self._parse_static_line(tokens)
+                else:
+                    self._parse_ospf_line(tokens)
+                self._block_path.append((indent, tokens))
+            return
+        self._end_section()
+        self._parse_global_line(stripped.split(), stripped, indent)
+
+    def _parse_global_line(self, tokens, stripped, indent):
+        keyword = tokens[0]
+        if keyword == 'router' and len(tokens) == 2 and tokens[1] == 'static':
+            self._section, self._section_indent = 'static', indent
+            self._block_path = []
+        elif keyword == 'router' and len(tokens) > 2 and tokens[1] == 'ospf':
+            self._section, self._section_indent = 'ospf', indent
+            self._section_data = self._ospf_process(tokens[2])
+            self._block_path = []
+        elif keyword == 'interface' and _INTERFACE_PRECONFIGURE.match(stripped):
+            # Config for hardware that isn't installed: not part of the topology
+            self._section, self._section_indent = 'other', indent
+        else:
+            super()._parse_global_line(tokens, stripped, indent)
+
+    def _parse_interface_line(self, tokens, stripped):
+        keyword = tokens[0]
+        if keyword == 'ipv4' and len(tokens) >= 3 and tokens[1] == 'address':
+            if 'secondary' in tokens[3:]:
+                return
+            address = _split_cidr(tokens[2]) if '/' in tokens[2] else (tokens[2], tokens[3]) if len(tokens) >= 4 else None
+            if address is not None:
+                self._set_interface_address(*address)
+        elif keyword == 'dot1q' and len(tokens) >= 3 and tokens[1] == 'vlan' and tokens[2].isdigit():
+            self._section_data['vlan'] = tokens[2]
+        else:
+            super()._parse_interface_line(tokens, stripped)
+
+    def _parse_static_line(self, tokens):
+        # Only routes directly under "address-family ipv4 unicast", outside any vrf
+        enclosing = [path_tokens for _, path_tokens in self._block_path]
+        if any(path_tokens[0] == 'vrf' for path_tokens in enclosing):
+            return
+        if not (enclosing and enclosing[-1][:2] == ['address-family', 'ipv4']):
+            return
+        prefix = _split_cidr(tokens[0])
+        if prefix is None:
+            return
+        next_hop = next((token for token in tokens[1:3] if _is_dotted_quad(token)), None)
+        if next_hop is not None:
+            self._add_static_route(prefix[0], prefix[1], next_hop)
+
+    def _parse_ospf_line(self, tokens):
+        if tokens[0] != 'interface' or len(tokens) < 2:
+            return
+        area = next((path_tokens[1] for _, path_tokens in reversed(self._block_path)
+                     if path_tokens[0] == 'area' and len(path_tokens) > 1), None)
+        if area is not None and not any(path_tokens[0] == 'vrf' for _, path_tokens in self._block_path):
+            self._interface_ospf.append((self._section_data['process_id'], area, tokens[1]))
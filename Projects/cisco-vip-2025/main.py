@@ -1,33 +1,90 @@
 # main.py
+import argparse
+import json
+import logging
+import sys
+
+from query import TopologyQuery
 from topology_builder import NetworkTopologyBuilder
 
+def answer(topology, kind, value=None):
+    """One query's result as a JSON line, or the error message."""
+    try:
+        return json.dumps({'query': kind, 'value': value, 'result': topology.query(kind, value)})
+    except (KeyError, ValueError) as error:
+        return json.dumps({'query': kind, 'value': value, 'error': error.args[0] if error.args else str(error)})
+
+def serve_queries(topology, lines):
+    """Answers one query per line against the already-built topology, until EOF or 'quit'."""
+    for line in lines:
+        parts = line.split(maxsplit=1)
+        if not parts:
+            continue
+        if parts[0] in ('quit', 'exit'):
+            break
+        print(answer(topology, parts[0], parts[1].strip() if len(parts) > 1 else None), flush=True)
+
 def main():
-    print("Starting Cisco Auto Topology Tool...")
+    arg_parser = argparse.ArgumentParser(description="Cisco Auto Topology Tool")
+    arg_parser.add_argument('conf_directory', nargs='?', default="Conf", help="directory with one <device>/config.dump (or running-config) or <device>.cfg per device")
+    arg_parser.add_argument('-v', '--verbose', action='count', default=0, help="-v for progress, -vv for per-device/per-link detail")
+    arg_parser.add_argument('--report', metavar='PATH', help="write the build's counters and stage timings as JSON")
+    arg_parser.add_argument('--profile-parser', action='store_true', help="also time each parser method (slower)")
+    arg_parser.add_argument('--audit', metavar='PATH', help="write an addressing audit (duplicate IPs, overlaps, dead next hops) as JSON")
+    arg_parser.add_argument('--diff', metavar='OLD_CONF', help="compare against an older Conf directory and print the changes as JSON")
+    arg_parser.add_argument('--cache', action='store_true',
+                            help="keep a parse cache next to each Conf directory (written as .<dir>_parse_cache.json); "
+                                 "re-runs only parse changed configs, and --diff skips configs whose files hash the same")
+    arg_parser.add_argument('-q', '--query', nargs='+', action='append', metavar=('KIND', 'VALUE'),
+                            help=f"answer a query and print it as JSON; repeatable. KIND is one of {', '.join(TopologyQuery.KINDS)}")
+    arg_parser.add_argument('--shell', action='store_true', help="read queries ('vlan 40', 'neighbors R1', ...) from stdin, one per line")
+    args = arg_parser.parse_args()
+
+    # Quiet by default: only warnings and errors unless -v is given
+    level = logging.DEBUG if args.verbose > 1 else logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=level, format="%(levelname)s %(name)s: %(message)s")
+
+    # On stderr, so stdout holds nothing but the JSON in --diff and query modes
+    print("Starting Cisco Auto Topology Tool...", file=sys.stderr)
     # 1. Create the topology builder
     topology = NetworkTopologyBuilder()
-    
-    # 2. Point it to your Conf directory
-    config_directory = "Conf" 
-    
-    # 3. Build the topology from the config files!
-    topology.build_topology_from_configs(config_directory)
-    
-    # DEBUG: Show interfaces found on each device
-    print("\nDEBUG: Interfaces found on each device:")
-    for hostname, device_parser in topology.devices.items():
-        print(f"{hostname}:")
-        for intf in device_parser.interfaces:
-            if intf.get('ip_address'):
-                print(f"  - {intf['name']}: {intf['ip_address']}/{intf.get('subnet_mask')} -> Network: {intf.get('network')}")
-        print()  # Add empty line between devices
-    
+
+    # 2./3. Build the topology from the config files in the Conf directory
+    # (Nothing is written next to the directories unless --cache asks for it; the diff works from fingerprints either way)
+    topology.build_topology_from_configs(args.conf_directory, use_cache=args.cache, profile_parser=args.profile_parser)
+
+    # Diff mode: only the changes against the older directory
+    if args.diff:
+        older = NetworkTopologyBuilder()
+        older.build_topology_from_configs(args.diff, use_cache=args.cache)
+        print(json.dumps(topology.diff_from(older), indent=2))
+        return
+
+    # Query mode: answer lookups from the built topology instead of printing the summary
+    if args.query or args.shell:
+        for kind, *value in args.query or ():
+            print(answer(topology, kind, ' '.join(value) or None))
+        if args.shell:
+            serve_queries(topology, sys.stdin)
+        return
+
     # 4. Print a summary to the console
     topology.print_topology_summary()
-    
-    # 5. Generate a visual diagram (This will pop up a window and save a file)
+
+    # 5. Addressing audit and machine-readable instrumentation report
+    if args.audit:
+        report = topology.audit()
+        with open(args.audit, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Audit written to '{args.audit}': " + ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in report['summary'].items()))
+    if args.report:
+        topology.stats.write_json(args.report)
+        print(f"Build report written to '{args.report}'")
+
+    # 6. Generate a visual diagram (This will pop up a window and save a file)
     # topology.visualize_topology()  # COMMENTED OUT FOR NOW
-    
+
     print("Done! Check the 'generated_topology.png' file.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
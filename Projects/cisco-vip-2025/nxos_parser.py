@@ -0,0 +1,68 @@
+import re
+
+from config_parser import CiscoConfigParser, _is_dotted_quad, _split_cidr
+
+# NX-OS running-config grammar. Differences from IOS that matter for the topology:
+#   - addresses and static routes are usually written as prefixes: ip address 10.1.1.1/30,
+#     ip route 10.0.0.0/8 10.1.1.2 (optionally with an exit interface before the next hop)
+#   - OSPF is enabled per interface (ip router ospf 1 area 0.0.0.0) rather than by network
+#     statements, and process tags can be words (router ospf UNDERLAY)
+#   - switchname as an alternative to hostname; vlan 10,20-22 declares several VLANs at once
+# Everything else (interface blocks, description, shutdown, encapsulation dot1q, vlan names)
+# reads the same as IOS and is left to CiscoConfigParser.
+
+_VLAN_RANGE = re.compile(r'^(\d+)(?:-(\d+))?$')
+
+
+class NXOSConfigParser(CiscoConfigParser):
+    platform = 'nxos'
+
+    def _parse_global_line(self, tokens, stripped, indent):
+        keyword = tokens[0]
+        if keyword == 'switchname' and len(tokens) > 1:
+            self._section, self._section_indent = 'other', indent
+            self.hostname = tokens[1]
+        elif keyword == 'ip' and len(tokens) >= 4 and tokens[1] == 'route' and '/' in tokens[2]:
+            self._section, self._section_indent = 'other', indent
+            self._parse_static_route(tokens[2:])
+        elif keyword == 'router' and len(tokens) > 2 and tokens[1] == 'ospf':
+            self._section, self._section_indent = 'ospf', indent
+            self._section_data = self._ospf_process(tokens[2])
+        elif keyword == 'vlan' and len(tokens) == 2 and not tokens[1].isdigit():
+            self._section, self._section_indent = 'other', indent
+            self._parse_vlan_list(tokens[1])
+        else:
+            super()._parse_global_line(tokens, stripped, indent)
+
+    def _parse_static_route(self, args):
+        # ip route <prefix> [<exit interface>] <next hop> [name ...] [tag ...] [<preference>]
+        prefix = _split_cidr(args[0])
+        if prefix is None:
+            return
+        next_hop = next((token for token in args[1:3] if _is_dotted_quad(token)), None)
+        if next_hop is not None:
+            self._add_static_route(prefix[0], prefix[1], next_hop)
+
+    def _parse_vlan_list(self, vlan_list):
+        vlan_ids = []
+        for part in vlan_list.split(','):
+            match = _VLAN_RANGE.match(part)
+            if match is None:
+                return
+            first = int(match.group(1))
+            last = int(match.group(2) or first)
+            vlan_ids.extend(range(first, last + 1))
+        self.vlan_info.extend({'vlan_id': str(vlan_id), 'name': None} for vlan_id in vlan_ids)
+
+    def _parse_interface_line(self, tokens, stripped):
+        keyword = tokens[0]
+        if keyword == 'ip' and len(tokens) >= 3 and tokens[1] == 'address' and '/' in tokens[2]:
+            if 'secondary' in tokens[3:]:
+                return
+            address = _split_cidr(tokens[2])
+            if address is not None:
+                self._set_interface_address(*address)
+        elif keyword == 'ip' and len(tokens) >= 6 and tokens[1] == 'router' and tokens[2] == 'ospf' and tokens[4] == 'area':
+            self._interface_ospf.append((tokens[3], tokens[5], self._section_data['name']))
+        else:
+            super()._parse_interface_line(tokens, stripped)
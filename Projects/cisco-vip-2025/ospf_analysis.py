@@ -0,0 +1,190 @@
+import numpy as np
+
+from records import InterfaceRecord, quad_to_int
+
+# OSPF area/adjacency model. Works out which interfaces each device's `router ospf` network
+# statements enable, then tags graph edges with their area and routers with their role.
+#
+# IOS matches an interface when (ip & ~wildcard) == (network & ~wildcard), and when several
+# statements match, the most specific one (fewest wildcard bits) wins. The matching is done
+# with NumPy over uint32 arrays: every interface is compared against all of its own device's
+# statements at once, in chunks, instead of a Python loop per interface/statement pair.
+
+BACKBONE_AREA = '0'
+
+# Upper bound on interface x statement cells compared per NumPy chunk (keeps memory flat)
+_CHUNK_CELLS = 4_000_000
+
+def normalize_area(area):
+    """'0', '0.0.0.0' -> '0'; '0.0.0.10' -> '10'. Areas that can't be parsed are kept as-is."""
+    try:
+        return str(quad_to_int(area)) if '.' in area else str(int(area))
+    except ValueError:
+        return area
+
+def _interface_ip(intf):
+    if isinstance(intf, InterfaceRecord):
+        return intf.ip_int
+    try:
+        return quad_to_int(intf['ip_address']) if intf['ip_address'] else None
+    except ValueError:
+        return None
+
+def collect(devices):
+    """Flattens devices into OSPF-eligible interfaces and per-device network statements."""
+    interfaces = [] # (device index, ip int, hostname, intf)
+    statements = [] # per device: [(care mask, network & care, specificity, area, process id), ...]
+    for device_index, (hostname, device_parser) in enumerate(devices.items()):
+        for intf in device_parser.interfaces:
+            ip = _interface_ip(intf)
+            # A shut interface is down, so OSPF never runs on it
+            if ip is not None and not intf['shutdown']:
+                interfaces.append((device_index, ip, hostname, intf))
+        device_statements = []
+        for process in device_parser.routing_protocols.get('ospf', []):
+            for statement in process['networks']:
+                try:
+                    care = ~quad_to_int(statement['wildcard']) & 0xFFFFFFFF
+                    network = quad_to_int(statement['network']) & care
+                except ValueError:
+                    continue
+                device_statements.append((care, network, bin(care).count('1'), normalize_area(statement['area']), process['process_id']))
+        statements.append(device_statements)
+    return interfaces, statements
+
+def match_interfaces(devices):
+    """
+    Vectorized matching. Returns {(hostname, interface name): (process_id, area)} for every
+    interface some network statement enables.
+    """
+    return match_collected(*collect(devices))
+
+def match_collected(interfaces, statements):
+    """The NumPy matching stage on already-collected interfaces and statements (see collect)."""
+    width = max((len(device_statements) for device_statements in statements), default=0)
+    if not interfaces or width == 0:
+        return {}
+
+    # Per-device statement tables padded to the same width; padding never matches
+    rows = [device_index for device_index, device_statements in enumerate(statements) for _ in device_statements]
+    slots = [k for device_statements in statements for k in range(len(device_statements))]
+    flat = [statement for device_statements in statements for statement in device_statements]
+    care = np.zeros((len(statements), width), dtype=np.uint32)
+    network = np.zeros((len(statements), width), dtype=np.uint32)
+    # Most specific wins, ties go to the statement that comes first; -1 marks padding
+    score = np.full((len(statements), width), -1, dtype=np.int64)
+    care[rows, slots] = [statement[0] for statement in flat]
+    network[rows, slots] = [statement[1] for statement in flat]
+    score[rows, slots] = np.array([statement[2] for statement in flat], dtype=np.int64) * width + (width - 1 - np.array(slots, dtype=np.int64))
+
+    device_of = np.fromiter((row[0] for row in interfaces), dtype=np.int64, count=len(interfaces))
+    ips = np.fromiter((row[1] for row in interfaces), dtype=np.uint32, count=len(interfaces))
+    best = np.empty(len(interfaces), dtype=np.int64)
+    best_score = np.empty(len(interfaces), dtype=np.int64)
+    chunk = max(1, _CHUNK_CELLS // width)
+    for start in range(0, len(interfaces), chunk):
+        stop = start + chunk
+        devs = device_of[start:stop]
+        hit = (ips[start:stop, None] & care[devs]) == network[devs]
+        scores = np.where(hit, score[devs], -1)
+        best[start:stop] = scores.argmax(axis=1)
+        best_score[start:stop] = scores.max(axis=1)
+
+    matches = {}
+    for row, k, row_score in zip(interfaces, best.tolist(), best_score.tolist()):
+        if row_score >= 0:
+            _, _, _, area, process_id = statements[row[0]][k]
+            matches[(row[2], row[3]['name'])] = (process_id, area)
+    return matches
+
+def match_interfaces_naive(devices):
+    """Reference implementation: nested Python loops over interfaces and statements."""
+    return match_collected_naive(*collect(devices))
+
+def match_collected_naive(interfaces, statements):
+    matches = {}
+    for device_index, ip, hostname, intf in interfaces:
+        best = None
+        for care, network, specificity, area, process_id in statements[device_index]:
+            if ip & care == network and (best is None or specificity > best[0]):
+                best = (specificity, process_id, area)
+        if best is not None:
+            matches[(hostname, intf['name'])] = (best[1], best[2])
+    return matches
+
+def analyze_ospf(topology):
+    """
+    Runs the matching over a NetworkTopologyBuilder and tags its graph:
+      router nodes: ospf_areas (sorted list), ospf_role ('ABR', 'backbone' or 'internal')
+      edges:        ospf_area when every router end is enabled in the same area,
+                    ospf_adjacency=True on router-to-router links in the same area,
+                    ospf_area_mismatch=True when the two ends are in different areas
+    Returns a summary dict with the enabled interfaces, adjacencies, mismatches and ABRs.
+    """
+    matches = match_interfaces(topology.devices)
+    graph = topology.graph
+
+    areas_by_device = {}
+    for (hostname, _), (_, area) in matches.items():
+        areas_by_device.setdefault(hostname, set()).add(area)
+    for hostname in topology.devices:
+        areas = areas_by_device.get(hostname, set())
+        node = graph.nodes[hostname]
+        node['ospf_areas'] = sorted(areas, key=_area_sort_key)
+        if len(areas) > 1:
+            node['ospf_role'] = 'ABR'
+        elif areas:
+            node['ospf_role'] = 'backbone' if BACKBONE_AREA in areas else 'internal'
+        else:
+            node.pop('ospf_role', None)
+
+    adjacencies = []
+    mismatches = []
+    for device_a, device_b, attr in graph.edges(data=True):
+        for key in ('ospf_area', 'ospf_adjacency', 'ospf_area_mismatch'):
+            attr.pop(key, None)
+        ends = []
+        if device_a in topology.devices and 'interface_a' in attr:
+            ends.append(matches.get((device_a, attr['interface_a'])))
+        if device_b in topology.devices and 'interface_b' in attr:
+            ends.append(matches.get((device_b, attr['interface_b'])))
+        if not ends or None in ends:
+            continue
+        areas = {area for _, area in ends}
+        if len(areas) > 1:
+            attr['ospf_area_mismatch'] = True
+            if device_a < device_b:
+                mismatches.append({'devices': [device_a, device_b], 'subnet': attr.get('subnet'), 'areas': sorted(areas, key=_area_sort_key)})
+            continue
+        attr['ospf_area'] = areas.pop()
+        if len(ends) == 2:
+            attr['ospf_adjacency'] = True
+            if device_a < device_b:
+                adjacencies.append({'devices': [device_a, device_b], 'subnet': attr.get('subnet'), 'area': attr['ospf_area']})
+
+    # Multi-access segments (segment mode): every member enabled in the same area forms adjacencies there
+    for node, node_attr in graph.nodes(data=True):
+        if node_attr.get('type') != 'segment':
+            continue
+        members = {}
+        for device, _, attr in graph.in_edges(node, data=True):
+            match = matches.get((device, attr.get('interface_a')))
+            if match is not None:
+                members.setdefault(match[1], []).append(device)
+        for area, devices in sorted(members.items()):
+            if len(devices) > 1:
+                adjacencies.append({'devices': sorted(devices), 'subnet': node_attr.get('subnet'), 'area': area})
+        if len(members) > 1:
+            mismatches.append({'devices': sorted(d for devices in members.values() for d in devices),
+                               'subnet': node_attr.get('subnet'), 'areas': sorted(members, key=_area_sort_key)})
+
+    return {
+        'interfaces': [{'device': hostname, 'interface': name, 'process_id': process_id, 'area': area}
+                       for (hostname, name), (process_id, area) in matches.items()],
+        'adjacencies': adjacencies,
+        'area_mismatches': mismatches,
+        'abrs': sorted(hostname for hostname, areas in areas_by_device.items() if len(areas) > 1),
+    }
+
+def _area_sort_key(area):
+    return (0, int(area)) if area.isdigit() else (1, area)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Bump this whenever CiscoConfigParser.to_record() changes shape; older caches are then discarded
+CACHE_VERSION = 2
+
+class ParseCache:
+    """
+    On-disk cache of parse records (CiscoConfigParser.to_record) for the configs in a Conf/ directory.
+    The cache file lives next to the directory, e.g. Conf/ -> .Conf_parse_cache.json.
+
+    Each entry is keyed by the config path relative to the Conf/ directory and remembers the
+    file's mtime/size and SHA-256. If mtime and size are unchanged the cached record is used
+    without reading the file; otherwise the file is hashed and the record is only reused if the
+    content is really the same.
+    """
+
+    def __init__(self, conf_directory, cache_path=None):
+        self.conf_directory = conf_directory
+        if cache_path is None:
+            conf_abspath = os.path.abspath(conf_directory)
+            cache_path = os.path.join(os.path.dirname(conf_abspath), f".{os.path.basename(conf_abspath)}_parse_cache.json")
+        self.cache_path = cache_path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """Loads the cache file. A missing, unreadable or corrupt file just gives an empty cache."""
+        self.entries = {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION or not isinstance(data.get('entries'), dict):
+            return
+        # Drop individual entries that don't have the expected shape
+        for key, entry in data['entries'].items():
+            if _is_valid_entry(entry):
+                self.entries[key] = entry
+
+    def save(self):
+        """
+        Writes the cache atomically so a crash mid-write can't leave a truncated file behind.
+        The cache is only an optimization: if it can't be written (read-only directory, full
+        disk...) a warning is logged and False returned instead of failing the build.
+        """
+        tmp_path = self.cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self.entries}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("Couldn't write the parse cache %s: %s", self.cache_path, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def lookup(self, config_path):
+        """
+        Returns (record, stat_key, digest) for a config file. record is None on a miss;
+        stat_key and digest are what store() should be given after re-parsing.
+        """
+        key = self._key(config_path)
+        entry = self.entries.get(key)
+        st = os.stat(config_path)
+        stat_key = [st.st_mtime_ns, st.st_size]
+        if entry is not None and entry['stat'] == stat_key:
+            self.hits += 1
+            return entry['record'], stat_key, entry['sha256']
+
+        with open(config_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if entry is not None and entry['sha256'] == digest:
+            # Touched but not modified: refresh the stat so the next run takes the fast path
+            entry['stat'] = stat_key
+            self.hits += 1
+            return entry['record'], stat_key, digest
+
+        self.misses += 1
+        return None, stat_key, digest
+
+    def store(self, config_path, stat_key, digest, record):
+        self.entries[self._key(config_path)] = {'stat': stat_key, 'sha256': digest, 'record': record}
+
+    def discard(self, config_path):
+        """Removes an entry, e.g. one whose record turned out to be unusable."""
+        self.entries.pop(self._key(config_path), None)
+
+    def prune(self, config_paths):
+        """Forgets entries for configs that no longer exist."""
+        live_keys = {self._key(path) for path in config_paths}
+        for key in list(self.entries):
+            if key not in live_keys:
+                del self.entries[key]
+
+    def _key(self, config_path):
+        return os.path.relpath(config_path, self.conf_directory)
+
+def _is_valid_entry(entry):
+    return (isinstance(entry, dict)
+            and isinstance(entry.get('stat'), list) and len(entry['stat']) == 2
+            and isinstance(entry.get('sha256'), str)
+            and isinstance(entry.get('record'), list) and len(entry['record']) == 6)
@@ -0,0 +1,169 @@
+from prefix_index import PrefixTrie, format_prefix, interface_prefix, route_prefix
+from records import int_to_quad, quad_to_int
+
+class PathEngine:
+    """
+    Forwarding-path engine over a NetworkTopologyBuilder.
+
+    Each device gets a forwarding table (a PrefixTrie) built from its connected interface
+    networks and its static routes, with every route's next hop resolved to the neighbor
+    device and interface that owns it. trace() then follows longest-prefix matches hop by hop.
+
+    Traces are cached per (source device, destination prefix): when every device on the path
+    has no more-specific entry inside the most specific prefix that was matched, every address
+    in that prefix takes the same path and the whole prefix is cached; otherwise only the /32 is.
+    Tables and caches are dropped whenever the builder's topology_version changes.
+    """
+
+    MAX_HOPS = 64
+
+    def __init__(self, topology):
+        self.topology = topology
+        self._version = None
+        self._tables = {} # hostname -> PrefixTrie of forwarding entries
+        self._path_cache = {} # source hostname -> PrefixTrie of cached walks
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self._tables.clear()
+        self._path_cache.clear()
+        self._version = self.topology.topology_version
+
+    def _check_version(self):
+        if self._version != self.topology.topology_version:
+            self.invalidate()
+
+    def forwarding_table(self, hostname):
+        """
+        The device's forwarding table. Entries are ('connected', intf) or
+        ('static', route, egress_intf, neighbor_hostname, neighbor_intf); unresolved parts are None.
+        """
+        self._check_version()
+        table = self._tables.get(hostname)
+        if table is not None:
+            return table
+
+        table = PrefixTrie()
+        device_parser = self.topology.devices[hostname]
+        for intf in device_parser.interfaces:
+            prefix = interface_prefix(intf)
+            if prefix is not None and not intf['shutdown']:
+                table.insert(prefix[0], prefix[1], ('connected', intf))
+        for route in device_parser.static_routes:
+            prefix = route_prefix(route)
+            if prefix is None:
+                continue
+            try:
+                next_hop = quad_to_int(route['next_hop'])
+            except ValueError:
+                continue
+            # The next hop has to be on one of this device's own connected networks
+            connected = table.longest_match(next_hop, lambda entry: entry[0] == 'connected')
+            egress_intf = connected[2][0][1] if connected else None
+            owner = self.topology.find_ip_owner(next_hop) if egress_intf is not None else None
+            if owner is not None and owner[0] == hostname:
+                owner = None
+            neighbor, neighbor_intf = owner if owner is not None else (None, None)
+            table.insert(prefix[0], prefix[1], ('static', route, egress_intf, neighbor, neighbor_intf))
+        self._tables[hostname] = table
+        return table
+
+    def resolve_static_routes(self, hostname=None):
+        """Every static route with its egress interface and next-hop neighbor, for one device or all of them."""
+        hostnames = [hostname] if hostname is not None else list(self.topology.devices)
+        resolved = []
+        for name in hostnames:
+            for _, _, entries in self.forwarding_table(name).items():
+                for entry in entries:
+                    if entry[0] == 'static':
+                        _, route, egress_intf, neighbor, neighbor_intf = entry
+                        resolved.append({'device': name, 'route': route,
+                                         'egress_interface': egress_intf['name'] if egress_intf is not None else None,
+                                         'neighbor': neighbor,
+                                         'neighbor_interface': neighbor_intf['name'] if neighbor_intf is not None else None})
+        return resolved
+
+    def trace(self, source, destination):
+        """
+        Follows the forwarding path from device `source` to the IP `destination`.
+        Returns a dict with status ('delivered', 'connected', 'no_route', 'unresolved_next_hop'
+        or 'loop'), the hops taken and, when the address belongs to a device, its owner.
+        """
+        self._check_version()
+        if source not in self.topology.devices:
+            raise KeyError(f"Unknown device: {source}")
+        address = quad_to_int(destination) if isinstance(destination, str) else destination
+
+        cache = self._path_cache.setdefault(source, PrefixTrie())
+        cached = cache.longest_match(address)
+        if cached is not None:
+            self.hits += 1
+            status, hops = cached[2][0]
+        else:
+            self.misses += 1
+            status, hops, class_prefix = self._walk(source, address)
+            cache.insert(class_prefix[0], class_prefix[1], (status, hops))
+        return self._finish(source, address, status, hops)
+
+    def is_reachable(self, source, destination):
+        return self.trace(source, destination)['status'] in ('delivered', 'connected')
+
+    def _walk(self, source, address):
+        hops = []
+        matched = [] # (device, matched prefix or None)
+        visited = set()
+        device = source
+        status = None
+        while status is None:
+            if device in visited or len(hops) >= self.MAX_HOPS:
+                status = 'loop'
+                break
+            visited.add(device)
+            table = self.forwarding_table(device)
+            match = table.longest_match(address)
+            if match is None:
+                matched.append((device, None))
+                hops.append({'device': device, 'prefix': None, 'via': None})
+                status = 'no_route'
+                break
+            network, length, entries = match
+            matched.append((device, (network, length)))
+            # Connected beats static for the same prefix, like IOS administrative distance
+            entry = next((entry for entry in entries if entry[0] == 'connected'), entries[0])
+            prefix = format_prefix(network, length)
+            if entry[0] == 'connected':
+                hops.append({'device': device, 'prefix': prefix, 'via': 'connected', 'egress_interface': entry[1]['name']})
+                status = 'connected'
+                break
+            _, route, egress_intf, neighbor, neighbor_intf = entry
+            hops.append({'device': device, 'prefix': prefix, 'via': 'static', 'next_hop': route['next_hop'],
+                         'egress_interface': egress_intf['name'] if egress_intf is not None else None,
+                         'neighbor': neighbor,
+                         'neighbor_interface': neighbor_intf['name'] if neighbor_intf is not None else None})
+            if neighbor is None:
+                status = 'unresolved_next_hop'
+                break
+            device = neighbor
+        return status, hops, self._class_prefix(address, matched)
+
+    def _class_prefix(self, address, matched):
+        """The widest prefix around `address` that is guaranteed to follow the same walk (see class docstring)."""
+        prefixes = [prefix for _, prefix in matched if prefix is not None]
+        class_prefix = max(prefixes, key=lambda prefix: prefix[1]) if prefixes else (0, 0)
+        for device, prefix in matched:
+            for network, length, _ in self.forwarding_table(device).contained(*class_prefix):
+                if (network, length) != prefix:
+                    return address, 32
+        return class_prefix
+
+    def _finish(self, source, address, status, hops):
+        result = {'source': source, 'destination': int_to_quad(address), 'status': status,
+                  'hops': [dict(hop) for hop in hops], 'owner': None}
+        if status == 'connected':
+            owner = self.topology.find_ip_owner(address)
+            if owner is not None:
+                result['status'] = 'delivered'
+                result['owner'] = {'device': owner[0], 'interface': owner[1]['name']}
+        return result
+
@@ -0,0 +1,100 @@
+import importlib
+import re
+
+# Parser registry: which parser class handles which platform's configs, and how to tell the
+# platforms apart from the first lines of a config.
+#
+# Parsers are registered as "module:ClassName" strings and only imported the first time a
+# config of that platform turns up, so a run over IOS devices only never loads (or compiles the
+# patterns of) the NX-OS and IOS-XR grammars. Every parser subclasses CiscoConfigParser and
+# fills in the same normalized interfaces / static routes / OSPF statements / VLANs.
+
+DEFAULT_PLATFORM = 'ios'
+DETECT_LINES = 50 # Lines read before the platform is decided
+DETECT_MIN_SCORE = 2 # Marker lines a platform needs (and more than any other platform) to be picked
+
+_parsers = {} # platform -> "module:ClassName"
+_markers = {} # platform -> tuple of regex strings; a config matching more of them wins
+_loaded = {} # platform -> parser class, once imported
+_compiled = {} # platform -> compiled alternation of its markers
+
+
+def register_platform(name, parser, markers=()):
+    """
+    Adds (or replaces) a platform. parser: "module:ClassName" of a CiscoConfigParser subclass.
+    markers: regexes matched against the first DETECT_LINES lines of a config.
+    """
+    _parsers[name] = parser
+    _markers[name] = tuple(markers)
+    _loaded.pop(name, None)
+    _compiled.pop(name, None)
+
+
+register_platform('ios', 'config_parser:CiscoConfigParser', markers=(
+    r'^Current configuration : \d+ bytes',
+    r'^version \d+\.\d+\s*$',
+    r'^boot-(?:start|end)-marker',
+    r'^service timestamps ',
+    r'^ ip address \d+\.\d+\.\d+\.\d+ \d+\.\d+\.\d+\.\d+',
+))
+register_platform('nxos', 'nxos_parser:NXOSConfigParser', markers=(
+    r'^!Command: show running-config',
+    r'^!Time: ',
+    r'^feature \S',
+    r'^version \d+\.\d+\(\d+\)',
+    r'^switchname ',
+    r'^boot nxos ',
+    r'^vdc ',
+    r'^\s+ip address \d+\.\d+\.\d+\.\d+/\d+',
+))
+register_platform('iosxr', 'iosxr_parser:IOSXRConfigParser', markers=(
+    r'^!! IOS XR',
+    r'^RP/\d+/',
+    r'^\s+ipv4 address ',
+    r'^interface \S*?\d+/\d+/\d+/\d+',
+    r'^router static\s*$',
+))
+
+
+def registered_platforms():
+    return list(_parsers)
+
+
+def detect_platform(lines):
+    """
+    The platform whose markers match the most of the first DETECT_LINES lines (an iterable of
+    lines, or a string). Falls back to DEFAULT_PLATFORM unless one platform has a clear lead:
+    at least DETECT_MIN_SCORE matching lines and more than every other platform.
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    scores = dict.fromkeys(_parsers, 0)
+    for count, line in enumerate(lines):
+        if count >= DETECT_LINES:
+            break
+        for name in scores:
+            pattern = _marker_pattern(name)
+            if pattern is not None and pattern.match(line):
+                scores[name] += 1
+    ranked = sorted(scores.values(), reverse=True)
+    best = max(scores, key=scores.get)
+    if ranked[0] < DETECT_MIN_SCORE or (len(ranked) > 1 and ranked[1] == ranked[0]):
+        return DEFAULT_PLATFORM
+    return best
+
+
+def _marker_pattern(name):
+    if name not in _compiled:
+        _compiled[name] = re.compile('|'.join(f'(?:{marker})' for marker in _markers[name])) if _markers[name] else None
+    return _compiled[name]
+
+
+def parser_class(name):
+    """The parser class for a platform, importing its module on first use."""
+    parser = _loaded.get(name)
+    if parser is None:
+        if name not in _parsers:
+            raise ValueError(f"Unknown platform: {name}")
+        module_name, class_name = _parsers[name].split(':')
+        parser = _loaded[name] = getattr(importlib.import_module(module_name), class_name)
+    return parser
@@ -0,0 +1,236 @@
+from records import InterfaceRecord, quad_to_int, int_to_quad
+
+# Path-compressed binary (Patricia) trie over IPv4 prefixes stored as (network int, prefix length).
+# Every lookup walks at most one node per prefix bit, so longest-prefix match, "what covers X"
+# and "what is inside X" are O(prefix length) plus the size of the answer.
+
+_FULL_MASK = 0xFFFFFFFF
+
+_MASKS = tuple((_FULL_MASK << (32 - length)) & _FULL_MASK for length in range(33))
+_LENGTH_BY_MASK = {mask: length for length, mask in enumerate(_MASKS)}
+
+def prefix_mask(length):
+    return _MASKS[length]
+
+def mask_to_length(mask):
+    """Prefix length for a netmask int, or None if the mask isn't contiguous."""
+    return _LENGTH_BY_MASK.get(mask)
+
+def parse_prefix(text):
+    """'10.1.1.0/30' -> (167837952, 30). Host bits are cleared."""
+    address, length = text.split('/')
+    length = int(length)
+    if not 0 <= length <= 32:
+        raise ValueError(f"Invalid prefix length in {text}")
+    return quad_to_int(address) & prefix_mask(length), length
+
+def format_prefix(network, length):
+    return f"{int_to_quad(network)}/{length}"
+
+def interface_prefix(intf):
+    """(network int, prefix length) of a parsed interface's subnet, or None if it has none."""
+    if isinstance(intf, InterfaceRecord):
+        return intf.network_int
+    network = intf.get('network')
+    return parse_prefix(network) if network else None
+
+def interface_address(intf):
+    """A parsed interface's IP address as an int, or None if it has no valid one."""
+    if isinstance(intf, InterfaceRecord):
+        return intf.ip_int
+    try:
+        return quad_to_int(intf['ip_address']) if intf['ip_address'] else None
+    except ValueError:
+        return None
+
+def route_prefix(route):
+    """(network int, prefix length) of a static route's destination, or None if it isn't a valid prefix."""
+    try:
+        length = mask_to_length(quad_to_int(route['mask']))
+        if length is None:
+            return None
+        return quad_to_int(route['network']) & _MASKS[length], length
+    except ValueError:
+        return None
+
+
+class _Node:
+    __slots__ = ('network', 'length', 'values', 'left', 'right')
+
+    def __init__(self, network, length):
+        self.network = network
+        self.length = length
+        self.values = None # List of stored items, or None for a pure branching node
+        self.left = None
+        self.right = None
+
+    def child(self, address):
+        # The child to follow is picked by the first bit after this node's prefix
+        return self.right if (address >> (31 - self.length)) & 1 else self.left
+
+    def set_child(self, address, node):
+        if (address >> (31 - self.length)) & 1:
+            self.right = node
+        else:
+            self.left = node
+
+
+class PrefixTrie:
+    """
+    Maps IPv4 prefixes to lists of items. Several items can share a prefix
+    (e.g. both ends of a /30), so insert/remove work on individual items.
+    """
+
+    def __init__(self):
+        self._root = _Node(0, 0)
+        self._size = 0
+
+    def __len__(self):
+        """Number of distinct prefixes stored."""
+        return self._size
+
+    def insert(self, network, length, item):
+        network &= _MASKS[length]
+        node = self._root
+        while True:
+            if node.length == length:
+                # Only reachable when node.network == network (invariant: node covers the target)
+                if node.values is None:
+                    node.values = []
+                    self._size += 1
+                node.values.append(item)
+                return
+            # The child to follow is picked by the first bit after this node's prefix
+            go_right = (network >> (31 - node.length)) & 1
+            child = node.right if go_right else node.left
+            if child is None:
+                child = _Node(network, length)
+                child.values = [item]
+                self._size += 1
+            else:
+                common = 32 - (child.network ^ network).bit_length()
+                if common > length:
+                    common = length
+                if common >= child.length:
+                    node = child
+                    continue
+                # The child and the new prefix diverge (or the new prefix sits above the child):
+                # put a node at their common prefix and hang both underneath
+                middle = _Node(network & _MASKS[common], common)
+                middle.set_child(child.network, child)
+                if common == length:
+                    middle.values = [item]
+                else:
+                    leaf = _Node(network, length)
+                    leaf.values = [item]
+                    middle.set_child(network, leaf)
+                self._size += 1
+                child = middle
+            if go_right:
+                node.right = child
+            else:
+                node.left = child
+            return
+
+    def remove(self, network, length, predicate):
+        """Removes the items stored at exactly this prefix for which predicate(item) is true. Returns how many."""
+        network &= _MASKS[length]
+        path = []
+        node = self._root
+        while node is not None and node.length < length:
+            if (network & _MASKS[node.length]) != node.network:
+                return 0
+            path.append(node)
+            node = node.child(network)
+        if node is None or node.length != length or node.network != network or node.values is None:
+            return 0
+        kept = [item for item in node.values if not predicate(item)]
+        removed = len(node.values) - len(kept)
+        if kept:
+            node.values = kept
+            return removed
+        node.values = None
+        self._size -= 1
+        # Splice out nodes that no longer store anything and don't branch
+        while node is not self._root and node.values is None and (node.left is None or node.right is None):
+            parent = path.pop()
+            only_child = node.left or node.right
+            if parent.left is node:
+                parent.left = only_child
+            else:
+                parent.right = only_child
+            node = parent
+        return removed
+
+    def get(self, network, length):
+        """Items stored at exactly this prefix (empty list if none)."""
+        network &= _MASKS[length]
+        node = self._root
+        while node is not None and node.length < length:
+            if (network & _MASKS[node.length]) != node.network:
+                return []
+            node = node.child(network)
+        if node is None or node.length != length or node.network != network:
+            return []
+        return list(node.values or [])
+
+    def covering(self, network, length=32):
+        """All stored (network, length, items) that contain the given prefix (itself included), shortest first."""
+        network &= _MASKS[length]
+        node = self._root
+        matches = []
+        while node is not None and node.length <= length:
+            if (network & _MASKS[node.length]) != node.network:
+                break
+            if node.values is not None:
+                matches.append((node.network, node.length, node.values))
+            if node.length == 32:
+                break
+            node = node.right if (network >> (31 - node.length)) & 1 else node.left
+        return matches
+
+    def longest_match(self, address, predicate=None):
+        """
+        Longest stored prefix containing `address` (an int) as (network, length, items), or None.
+        With a predicate, only prefixes holding at least one item it accepts count, and only those items are returned.
+        """
+        for network, length, values in reversed(self.covering(address, 32)):
+            if predicate is None:
+                return network, length, values
+            accepted = [item for item in values if predicate(item)]
+            if accepted:
+                return network, length, accepted
+        return None
+
+    def contained(self, network, length):
+        """All stored (network, length, items) inside the given prefix (itself included), in address order."""
+        network &= _MASKS[length]
+        node = self._root
+        # Walk down to the first node that is inside the query prefix
+        while node is not None and node.length < length:
+            if (network & _MASKS[node.length]) != node.network:
+                return []
+            node = node.child(network)
+        if node is None or (node.network & _MASKS[length]) != network:
+            return []
+        matches = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.values is not None:
+                matches.append((node.network, node.length, node.values))
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+        return matches
+
+    def overlapping(self, network, length):
+        """Every stored prefix that overlaps the given one: the ones covering it plus the ones inside it."""
+        covering = self.covering(network, length)
+        inside = [match for match in self.contained(network, length) if match[1] != length]
+        return covering + inside
+
+    def items(self):
+        """All (network, length, items) in address order."""
+        return self.contained(0, 0)
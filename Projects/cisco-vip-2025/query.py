@@ -0,0 +1,205 @@
+import re
+from collections import OrderedDict
+from ipaddress import ip_network
+
+from records import int_to_quad, quad_to_int
+
+# Read-side query layer over a NetworkTopologyBuilder: neighbors, subnet / IP owners, VLAN
+# membership, interfaces by name and by description keyword, stub networks.
+#
+# The first query after a change walks every device's interfaces once and builds secondary
+# indexes (dicts keyed by VLAN, subnet, interface name, IP and description word); each query is
+# then a dict lookup. Results go into an LRU cache keyed by (query, argument). Indexes and cache
+# are dropped together whenever the builder's topology_version moves, i.e. when a device is
+# added or removed or links are rediscovered.
+#
+# Results are tuples (of tuples) so cached values can't be modified by callers; interface
+# matches are (hostname, interface name) pairs sorted by hostname, then interface name.
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+class TopologyQuery:
+    """
+    Cached queries over a NetworkTopologyBuilder (available as topology.queries).
+
+    maxsize: number of query results kept in the LRU cache.
+    """
+
+    # Query names accepted by query(), as used by the main.py CLI
+    KINDS = {
+        'neighbors': 'neighbors',
+        'subnet': 'subnet_owners',
+        'vlan': 'devices_in_vlan',
+        'vlan-interfaces': 'vlan_interfaces',
+        'interface': 'interfaces_named',
+        'ip': 'ip_owner',
+        'description': 'description_search',
+        'stubs': 'stub_networks',
+    }
+
+    def __init__(self, topology, maxsize=1024):
+        self.topology = topology
+        self.maxsize = maxsize
+        self._version = None
+        self._indexes = None
+        self._cache = OrderedDict() # (method name, argument) -> result
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self._indexes = None
+        self._cache.clear()
+        self._version = self.topology.topology_version
+
+    def _check_version(self):
+        if self._version != self.topology.topology_version:
+            self.invalidate()
+
+    def _cached(self, name, argument, compute):
+        self._check_version()
+        key = (name, argument)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+        result = compute()
+        self._cache[key] = result
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def _index(self):
+        """Builds the secondary indexes in one pass over the devices (and the subnet map)."""
+        if self._indexes is not None:
+            return self._indexes
+        by_vlan = {} # vlan id -> set of (hostname, interface name)
+        vlan_devices = {} # vlan id -> set of hostnames (interfaces in it, or the VLAN declared)
+        by_subnet = {} # network string -> set of (hostname, interface name)
+        by_name = {} # lower-case interface name -> set of (hostname, interface name)
+        by_ip = {} # ip string -> list of (hostname, interface name)
+        by_word = {} # lower-case description word -> set of (hostname, interface name)
+        for hostname, device_parser in self.topology.devices.items():
+            for vlan in device_parser.vlan_info:
+                vlan_devices.setdefault(str(vlan['vlan_id']), set()).add(hostname)
+            for intf in device_parser.interfaces:
+                match = (hostname, intf['name'])
+                by_name.setdefault(intf['name'].lower(), set()).add(match)
+                if intf['vlan'] is not None:
+                    by_vlan.setdefault(str(intf['vlan']), set()).add(match)
+                    vlan_devices.setdefault(str(intf['vlan']), set()).add(hostname)
+                if intf['ip_address']:
+                    by_ip.setdefault(intf['ip_address'], []).append(match)
+                if intf.get('network'):
+                    by_subnet.setdefault(intf['network'], set()).add(match)
+                if intf['description']:
+                    for word in _words(intf['description']):
+                        by_word.setdefault(word, set()).add(match)
+        # Peer networks with different masks are grouped under the wider one; that subnet finds its members too
+        device_subnets = {} # hostname -> set of subnet map keys it's a member of
+        for subnet, members in self.topology.subnet_map.items():
+            for hostname, intf in members:
+                by_subnet.setdefault(subnet, set()).add((hostname, intf['name']))
+                device_subnets.setdefault(hostname, set()).add(subnet)
+        # Stored as sorted tuples, so a lookup hands back the index entry as it is
+        self._indexes = {name: {key: tuple(sorted(values)) for key, values in index.items()} for name, index in
+                         (('vlan', by_vlan), ('vlan_devices', vlan_devices), ('subnet', by_subnet), ('name', by_name), ('word', by_word))}
+        self._indexes.update(ip=by_ip, device_subnets=device_subnets)
+        return self._indexes
+
+    def query(self, kind, value=None):
+        """Runs a query by name (see KINDS), e.g. query('vlan', '40') or query('stubs')."""
+        method = self.KINDS.get(kind)
+        if method is None:
+            raise ValueError(f"Unknown query: {kind} (expected one of {', '.join(self.KINDS)})")
+        if kind == 'stubs':
+            return self.stub_networks()
+        if value is None:
+            raise ValueError(f"Query {kind} needs a value")
+        return getattr(self, method)(value)
+
+    def neighbors(self, hostname):
+        """
+        Devices sharing a subnet with `hostname`, as (neighbor, subnet, local interface, neighbor
+        interface) tuples. Taken from the subnet map rather than the graph, so two links between
+        the same pair of devices and members of a multi-access segment all show up, in either mode.
+        """
+        def compute():
+            if hostname not in self.topology.devices:
+                raise KeyError(f"Unknown device: {hostname}")
+            subnet_map = self.topology.subnet_map
+            found = set()
+            for subnet in self._index()['device_subnets'].get(hostname, ()):
+                members = subnet_map[subnet]
+                local = [intf['name'] for device, intf in members if device == hostname]
+                for device, intf in members:
+                    if device != hostname:
+                        found.update((device, subnet, name, intf['name']) for name in local)
+            return tuple(sorted(found))
+        return self._cached('neighbors', hostname, compute)
+
+    def subnet_owners(self, subnet):
+        """Devices and interfaces on `subnet` ('10.1.1.0/30'; host bits are ignored)."""
+        subnet = str(ip_network(subnet, strict=False))
+        return self._cached('subnet_owners', subnet, lambda: self._index()['subnet'].get(subnet, ()))
+
+    def devices_in_vlan(self, vlan):
+        """Devices with an interface in the VLAN (SVI or dot1Q subinterface) or declaring it."""
+        vlan = str(vlan)
+        return self._cached('devices_in_vlan', vlan, lambda: self._index()['vlan_devices'].get(vlan, ()))
+
+    def vlan_interfaces(self, vlan):
+        """Interfaces in the VLAN: SVIs (interface VlanN) and dot1Q subinterfaces."""
+        vlan = str(vlan)
+        return self._cached('vlan_interfaces', vlan, lambda: self._index()['vlan'].get(vlan, ()))
+
+    def interfaces_named(self, name):
+        """Every device's interface with this name (case-insensitive), e.g. 'GigabitEthernet0/0'."""
+        name = name.lower()
+        return self._cached('interfaces_named', name, lambda: self._index()['name'].get(name, ()))
+
+    def ip_owner(self, ip):
+        """(hostname, interface name) with this address configured, or None. The first device wins on duplicates."""
+        try:
+            address = quad_to_int(ip) if isinstance(ip, str) else ip
+        except ValueError:
+            address = None
+        if not isinstance(address, int) or not 0 <= address <= 0xFFFFFFFF:
+            raise ValueError(f"Invalid IPv4 address: {ip}")
+        ip = int_to_quad(address)
+        def compute():
+            owners = self._index()['ip'].get(ip)
+            return owners[0] if owners else None
+        return self._cached('ip_owner', ip, compute)
+
+    def description_search(self, keywords):
+        """Interfaces whose description contains every word of `keywords` (case-insensitive, whole words)."""
+        words = tuple(sorted(set(_words(keywords))))
+        def compute():
+            if not words:
+                return ()
+            by_word = self._index()['word']
+            if len(words) == 1:
+                return by_word.get(words[0], ())
+            matches = set(by_word.get(words[0], ()))
+            for word in words[1:]:
+                matches.intersection_update(by_word.get(word, ()))
+            return tuple(sorted(matches))
+        return self._cached('description_search', words, compute)
+
+    def stub_networks(self):
+        """Subnets with a single device on them, as (subnet, hostname, interface name) tuples."""
+        def compute():
+            graph = self.topology.graph
+            stubs = []
+            for node, data in graph.nodes(data=True):
+                if data.get('type') == 'network':
+                    for device, _, edge in graph.in_edges(node, data=True):
+                        stubs.append((data['subnet'], device, edge.get('interface_a')))
+            return tuple(sorted(stubs))
+        return self._cached('stub_networks', None, compute)
@@ -0,0 +1,142 @@
+import sys
+from collections.abc import Mapping
+from ipaddress import IPv4Network
+
+# Compact record types for parsed interfaces and static routes.
+# Addresses and masks are stored as 32-bit ints instead of dotted-quad strings and IPv4Network
+# objects; the string forms are rebuilt on access. Both classes behave like read-only dicts
+# with the same keys the parser's dicts have, so intf['name'], intf.get('network') etc. still work.
+
+def quad_to_int(text):
+    """'10.1.1.1' -> 167837953. Raises ValueError for anything that isn't a valid IPv4 address."""
+    a, b, c, d = map(int, text.split('.'))
+    if not (0 <= a <= 255 and 0 <= b <= 255 and 0 <= c <= 255 and 0 <= d <= 255):
+        raise ValueError(f"Invalid IPv4 address: {text}")
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+def int_to_quad(value):
+    return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+def _pack_address(text):
+    """Stores an address as an int when it's a valid IPv4 address, else keeps the original text."""
+    try:
+        return quad_to_int(text)
+    except ValueError:
+        return text
+
+# Masks and VLAN ids come from a small set of values; share one int object per value
+_shared_ints = {}
+
+def _shared(value):
+    return _shared_ints.setdefault(value, value)
+
+def _unpack_address(value):
+    return int_to_quad(value) if isinstance(value, int) else value
+
+
+class InterfaceRecord(Mapping):
+    """One parsed interface. Drop-in for the parser's interface dict, at a fraction of the memory."""
+
+    __slots__ = ('name', 'description', 'shutdown', '_vlan', '_ip', '_mask', '_prefixlen')
+
+    def __init__(self, name, ip_address=None, subnet_mask=None, description=None, shutdown=False, vlan=None, network=None):
+        # Interface names repeat across devices (GigabitEthernet0/0...), so share one copy of each
+        self.name = sys.intern(name)
+        self.description = description
+        self.shutdown = shutdown
+        # VLAN ids are kept as ints unless that would change their text (e.g. a leading zero)
+        self._vlan = _shared(int(vlan)) if vlan is not None and vlan.isdigit() and str(int(vlan)) == vlan else vlan
+        self._ip = _pack_address(ip_address) if ip_address is not None else None
+        self._mask = _shared(_pack_address(subnet_mask)) if subnet_mask is not None else None
+        # Prefix length of the interface network; -1 when the IP/mask didn't form a valid network
+        self._prefixlen = int(network.rsplit('/', 1)[1]) if network else -1
+
+    @classmethod
+    def from_dict(cls, intf_dict):
+        return cls(intf_dict['name'], intf_dict['ip_address'], intf_dict['subnet_mask'], intf_dict['description'],
+                   intf_dict['shutdown'], intf_dict['vlan'], intf_dict.get('network'))
+
+    @property
+    def ip_int(self):
+        """Interface address as an int, or None."""
+        return self._ip if isinstance(self._ip, int) else None
+
+    @property
+    def network_int(self):
+        """(network address as int, prefix length) of the interface subnet, or None."""
+        if self._prefixlen < 0:
+            return None
+        return self._ip & ((0xFFFFFFFF << (32 - self._prefixlen)) & 0xFFFFFFFF), self._prefixlen
+
+    def _keys(self):
+        if self._ip is None:
+            return _BASE_KEYS
+        return _NETWORK_KEYS if self._prefixlen >= 0 else _IP_KEYS
+
+    def __getitem__(self, key):
+        if key == 'name':
+            return self.name
+        if key == 'ip_address':
+            return _unpack_address(self._ip) if self._ip is not None else None
+        if key == 'subnet_mask':
+            return _unpack_address(self._mask) if self._mask is not None else None
+        if key == 'description':
+            return self.description
+        if key == 'shutdown':
+            return self.shutdown
+        if key == 'vlan':
+            return str(self._vlan) if isinstance(self._vlan, int) else self._vlan
+        if key == 'network' and self._ip is not None:
+            network = self.network_int
+            return f"{int_to_quad(network[0])}/{network[1]}" if network is not None else None
+        if key == 'network_object' and self._prefixlen >= 0:
+            return IPv4Network(self.network_int)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __repr__(self):
+        return f"InterfaceRecord({dict(self)!r})"
+
+
+class StaticRouteRecord(Mapping):
+    """One parsed `ip route`, with network, mask and next hop stored as ints."""
+
+    __slots__ = ('_network', '_mask', '_next_hop')
+
+    def __init__(self, network, mask, next_hop):
+        self._network = _pack_address(network)
+        self._mask = _shared(_pack_address(mask))
+        self._next_hop = _pack_address(next_hop)
+
+    @classmethod
+    def from_dict(cls, route_dict):
+        return cls(route_dict['network'], route_dict['mask'], route_dict['next_hop'])
+
+    def __getitem__(self, key):
+        if key == 'network':
+            return _unpack_address(self._network)
+        if key == 'mask':
+            return _unpack_address(self._mask)
+        if key == 'next_hop':
+            return _unpack_address(self._next_hop)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(_ROUTE_KEYS)
+
+    def __len__(self):
+        return len(_ROUTE_KEYS)
+
+    def __repr__(self):
+        return f"StaticRouteRecord({dict(self)!r})"
+
+
+_BASE_KEYS = ('name', 'ip_address', 'subnet_mask', 'description', 'shutdown', 'vlan')
+_IP_KEYS = _BASE_KEYS + ('network',)
+_NETWORK_KEYS = _IP_KEYS + ('network_object',)
+_ROUTE_KEYS = ('network', 'mask', 'next_hop')
@@ -0,0 +1,283 @@
+import json
+import math
+import os
+import time
+
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+# Headless topology rendering for large graphs.
+#
+# Draws straight onto an Agg canvas (no pyplot, no GUI backend, nothing to show()), with all
+# edges in one LineCollection and one scatter call per node type instead of an artist per node
+# and edge. Positions come from a LayoutCache, so a re-render after an incremental update keeps
+# every known node where it was and only places the new ones.
+
+LAYOUT_CACHE_VERSION = 1
+
+# Up to this many nodes the 'auto' layout is the original spring layout; above it, hierarchical
+SPRING_LAYOUT_MAX_NODES = 300
+# Labels stop being readable (and cost one text artist each) past these sizes, so they're skipped
+NODE_LABEL_MAX_NODES = 300
+EDGE_LABEL_MAX_EDGES = 150
+MIN_FONT_SIZE = 4
+# Canvas size: UNIT_INCHES per layout unit, kept within these bounds (longest side)
+UNIT_INCHES = 0.5
+MIN_FIGURE_INCHES = 12
+MAX_FIGURE_INCHES = 60
+# Re-layout from scratch when more than this share of the nodes is new
+RELAYOUT_NEW_FRACTION = 0.5
+
+# (node type, color, marker size, legend label), in drawing order
+NODE_STYLES = (
+    ('router', 'lightblue', 1000, 'Routers'),
+    ('network', 'lightgreen', 800, 'Stub Networks'),
+    ('segment', 'orange', 900, 'Multi-access Segments'),
+)
+
+def _neighbors(graph):
+    """Undirected adjacency of a (Di)Graph as {node: set of neighbors}."""
+    adjacency = {node: set() for node in graph}
+    for node_a, node_b in graph.edges():
+        if node_a != node_b:
+            adjacency[node_a].add(node_b)
+            adjacency[node_b].add(node_a)
+    return adjacency
+
+def hierarchical_layout(graph):
+    """
+    Layered layout in O(nodes + edges): each connected component is laid out as BFS layers from its
+    best-connected router (one row per hop, wrapped when very wide), and the components are
+    packed onto shelves.
+    Returns {node: (x, y)} with one unit between neighboring nodes.
+    """
+    adjacency = _neighbors(graph)
+    node_types = {node: attr.get('type') for node, attr in graph.nodes(data=True)}
+    # Roots are tried in this order: routers first, then by degree, then by name for stable output
+    order = sorted(graph, key=lambda node: (node_types[node] != 'router', -len(adjacency[node]), str(node)))
+
+    components = [] # [(width, layers)]
+    seen = set()
+    for root in order:
+        if root in seen:
+            continue
+        seen.add(root)
+        layers = [[root]]
+        while True:
+            # Children are appended in their parents' order, which keeps most edges between layers short
+            next_layer = []
+            for node in layers[-1]:
+                for neighbor in sorted(adjacency[node], key=str):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        next_layer.append(neighbor)
+            if not next_layer:
+                break
+            layers.append(next_layer)
+        # Wide layers (e.g. thousands of leaves) wrap onto several rows so the component stays roughly square
+        wrap = max(8, math.ceil(2 * math.sqrt(sum(len(layer) for layer in layers))))
+        rows = [layer[i:i + wrap] for layer in layers for i in range(0, len(layer), wrap)]
+        components.append((max(len(row) for row in rows), rows))
+
+    # Shelf packing, biggest components first, into rows about as wide as the whole layout is tall
+    components.sort(key=lambda component: -component[0] * len(component[1]))
+    row_width = max(math.sqrt(sum(width * len(rows) for width, rows in components)),
+                    max((width for width, _ in components), default=0))
+    positions = {}
+    x = y = shelf_height = 0
+    for width, rows in components:
+        if x > 0 and x + width > row_width:
+            x = 0
+            y -= shelf_height + 1
+            shelf_height = 0
+        for depth, row in enumerate(rows):
+            offset = x + (width - len(row)) / 2
+            for i, node in enumerate(row):
+                positions[node] = (offset + i, y - depth)
+        x += width + 1
+        shelf_height = max(shelf_height, len(rows))
+    return positions
+
+def spring_layout(graph, positions=None, fixed=None):
+    """
+    The original visualize_topology layout (same seed), rescaled from networkx's [-1, 1] box to
+    about one unit per node like hierarchical_layout. positions/fixed are in the same units.
+    """
+    if not graph:
+        return {}
+    scale = math.sqrt(graph.number_of_nodes()) / 2
+    scaled = {node: (x / scale, y / scale) for node, (x, y) in positions.items()} if positions is not None else None
+    layout = nx.spring_layout(graph, pos=scaled, fixed=fixed, seed=42)
+    result = {node: (float(x) * scale, float(y) * scale) for node, (x, y) in layout.items()}
+    # Hand pinned nodes back exactly as given, not as a rescaled round trip
+    for node in fixed or ():
+        result[node] = positions[node]
+    return result
+
+
+class LayoutCache:
+    """
+    Node positions kept between renders, optionally persisted to a JSON file.
+
+    update() lays out the whole graph the first time (or when most of it is new) and otherwise
+    keeps every known node in place: removed nodes are dropped and new ones are put next to
+    their already-placed neighbors.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.layout = None # Name of the layout the positions came from
+        self.positions = {} # node -> (x, y)
+
+    def load(self):
+        """Loads positions from self.path. A missing, unreadable or corrupt file gives an empty cache."""
+        self.layout = None
+        self.positions = {}
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != LAYOUT_CACHE_VERSION or not isinstance(data.get('positions'), dict):
+            return
+        for node, position in data['positions'].items():
+            if isinstance(position, list) and len(position) == 2 and all(isinstance(v, (int, float)) for v in position):
+                self.positions[node] = tuple(position)
+        self.layout = data.get('layout')
+
+    def save(self):
+        """Writes the positions atomically (same approach as ParseCache.save)."""
+        if self.path is None:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': LAYOUT_CACHE_VERSION, 'layout': self.layout,
+                       'positions': {node: list(position) for node, position in self.positions.items()}}, f)
+        os.replace(tmp_path, self.path)
+
+    def update(self, graph, layout='auto'):
+        """
+        Returns {node: (x, y)} for every node of the graph. layout is 'spring', 'hierarchical' or
+        'auto' (spring up to SPRING_LAYOUT_MAX_NODES nodes, hierarchical above).
+        """
+        if layout == 'auto':
+            layout = 'spring' if graph.number_of_nodes() <= SPRING_LAYOUT_MAX_NODES else 'hierarchical'
+        if layout not in ('spring', 'hierarchical'):
+            raise ValueError(f"Unknown layout: {layout}")
+
+        # Node names are strings in the graph, and JSON keys always are
+        known = {node: self.positions[node] for node in graph if node in self.positions}
+        new_nodes = [node for node in graph if node not in known]
+        if layout != self.layout or not known or len(new_nodes) > RELAYOUT_NEW_FRACTION * graph.number_of_nodes():
+            self.positions = hierarchical_layout(graph) if layout == 'hierarchical' else spring_layout(graph)
+        elif not new_nodes:
+            self.positions = known
+        elif layout == 'spring':
+            # Let the spring model place only the new nodes around the pinned old ones
+            self.positions = spring_layout(graph, positions=self._seed_positions(graph, known, new_nodes), fixed=list(known))
+        else:
+            self.positions = self._seed_positions(graph, known, new_nodes)
+        self.layout = layout
+        return self.positions
+
+    def _seed_positions(self, graph, known, new_nodes):
+        """Known positions plus a spot for each new node: next to its placed neighbors, or on a row below everything."""
+        positions = dict(known)
+        adjacency = _neighbors(graph)
+        xs = [x for x, _ in known.values()]
+        ys = [y for _, y in known.values()]
+        spacing = (max(xs) - min(xs) + max(ys) - min(ys)) / (2 * math.sqrt(len(known))) or 1.0
+        spare_x, spare_y = min(xs), min(ys) - 2 * spacing
+        pending = list(new_nodes)
+        # New nodes attached only to other new nodes get placed once a neighbor has a position
+        while pending:
+            deferred = []
+            for node in pending:
+                placed = [positions[neighbor] for neighbor in adjacency[node] if neighbor in positions]
+                if not placed:
+                    deferred.append(node)
+                    continue
+                center_x = sum(x for x, _ in placed) / len(placed)
+                center_y = sum(y for _, y in placed) / len(placed)
+                # Spread nodes that share an anchor around it (golden angle) instead of stacking them
+                turn = len(positions) * 2.399963
+                positions[node] = (center_x + spacing * math.cos(turn), center_y + spacing * math.sin(turn))
+            if len(deferred) == len(pending):
+                # Nothing left connects to a placed node: start a new row below the layout
+                node = deferred.pop(0)
+                positions[node] = (spare_x, spare_y)
+                spare_x += spacing
+            pending = deferred
+        return positions
+
+
+def render_topology(graph, output_path, layout_cache=None, layout='auto', title="Automatically Discovered Network Topology"):
+    """
+    Renders the topology graph to an image file without a display. Returns timing stats:
+    {'nodes', 'edges', 'layout', 'layout_s', 'draw_s', 'save_s', 'total_s'}.
+    """
+    start = time.perf_counter()
+    if layout_cache is None:
+        layout_cache = LayoutCache()
+    positions = layout_cache.update(graph, layout)
+    layout_done = time.perf_counter()
+
+    # Layouts are in units of about one node apart. Size the canvas to the layout's extent, within
+    # MIN/MAX_FIGURE_INCHES, and size markers and text to the space one unit gets on it
+    node_count = graph.number_of_nodes()
+    xs = [x for x, _ in positions.values()] or [0]
+    ys = [y for _, y in positions.values()] or [0]
+    cells_x = max(xs) - min(xs) + 1
+    cells_y = max(ys) - min(ys) + 1
+    inches_per_cell = min(max(UNIT_INCHES, MIN_FIGURE_INCHES / max(cells_x, cells_y)), MAX_FIGURE_INCHES / max(cells_x, cells_y))
+    figure = Figure(figsize=(max(cells_x * inches_per_cell, 6), max(cells_y * inches_per_cell, 4)))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    points_per_cell = inches_per_cell * 72
+    font_size = min(10, points_per_cell / 4)
+
+    # Each link is two directed edges; draw it once
+    links = {}
+    for node_a, node_b, attr in graph.edges(data=True):
+        key = (node_a, node_b) if str(node_a) <= str(node_b) else (node_b, node_a)
+        links.setdefault(key, attr.get('label'))
+    ax.add_collection(LineCollection([(positions[a], positions[b]) for a, b in links],
+                                     colors='gray', linewidths=min(2, points_per_cell / 20), alpha=0.7, zorder=1))
+
+    by_type = {}
+    for node, attr in graph.nodes(data=True):
+        by_type.setdefault(attr.get('type'), []).append(node)
+    for node_type, color, size, label in NODE_STYLES:
+        nodes = by_type.get(node_type)
+        if nodes:
+            ax.scatter([positions[node][0] for node in nodes], [positions[node][1] for node in nodes],
+                       s=min(size, (points_per_cell * 0.6) ** 2), c=color, label=label, zorder=2)
+
+    if node_count <= NODE_LABEL_MAX_NODES and font_size >= MIN_FONT_SIZE:
+        for node, (x, y) in positions.items():
+            ax.text(x, y, str(node), fontsize=font_size, ha='center', va='center', zorder=3)
+    if len(links) <= EDGE_LABEL_MAX_EDGES and font_size >= MIN_FONT_SIZE:
+        for (node_a, node_b), label in links.items():
+            if label:
+                (xa, ya), (xb, yb) = positions[node_a], positions[node_b]
+                ax.text((xa + xb) / 2, (ya + yb) / 2, label, fontsize=min(8, font_size), ha='center', va='center', zorder=3,
+                        bbox={'boxstyle': 'round', 'fc': 'white', 'ec': 'none', 'alpha': 0.8})
+
+    ax.autoscale_view()
+    ax.margins(0.05)
+    ax.set_title(title)
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend(loc='upper right')
+    ax.set_axis_off()
+    figure.tight_layout()
+    draw_done = time.perf_counter()
+
+    figure.savefig(output_path)
+    end = time.perf_counter()
+    return {'nodes': node_count, 'edges': len(links), 'layout': layout_cache.layout,
+            'layout_s': layout_done - start, 'draw_s': draw_done - layout_done,
+            'save_s': end - draw_done, 'total_s': end - start}
@@ -0,0 +1,452 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from platforms import DEFAULT_PLATFORM
+from prefix_index import format_prefix, parse_prefix, prefix_mask
+from records import int_to_quad, quad_to_int
+
+# Binary topology snapshots.
+#
+# A built NetworkTopologyBuilder is written as a set of flat, typed arrays (one section each):
+# every string (hostnames, interface names, descriptions...) goes into one string table and is
+# referred to by index, addresses are stored as 32-bit ints, and the edges are kept in CSR form
+# (per-node offsets into one array of edge targets). A reader mmaps the file and reads the
+# arrays in place through memoryviews, so opening a snapshot costs the same for 10 or 10,000
+# devices and neighbor/subnet queries never build NetworkX or parser objects.
+# load_topology() turns a snapshot back into a full builder when one is needed.
+#
+# Layout: header, section table, then the sections, each 8-byte aligned. Numbers are in the
+# writer's byte order, which the header records; a reader on the other byte order refuses the file.
+
+MAGIC = b'TOPOSNAP'
+SNAPSHOT_VERSION = 2
+
+_HEADER = struct.Struct('<8sIII4x') # magic, version, byte-order mark, section count
+_SECTION = struct.Struct('<16sQQ4sI') # name, offset, length, array typecode, item count
+_BYTE_ORDER_MARK = 0x01020304
+
+NONE = 0xFFFFFFFF # "no string" / "no address" in u32 columns
+
+NODE_TYPES = ('router', 'network', 'segment')
+
+# Interface and route flag bits
+_HAS_IP = 1
+_IP_IS_TEXT = 2 # The address isn't a valid dotted quad; the column holds a string id instead
+_HAS_MASK = 4
+_MASK_IS_TEXT = 8
+_SHUTDOWN = 16
+_NETWORK_IS_TEXT = 1
+_ROUTE_MASK_IS_TEXT = 2
+_NEXT_HOP_IS_TEXT = 4
+
+_MASK_MISMATCH = 1
+
+# Edge attributes stored in columns; anything else (e.g. OSPF tags) goes to the metadata JSON.
+# 'label' isn't stored at all: it's always "<interface_a or source> -> <interface_b or target>".
+_EDGE_COLUMNS = {'label', 'subnet', 'interface_a', 'interface_b', 'mask_mismatch'}
+_NODE_COLUMNS = {'type', 'subnet', 'parser', 'members'}
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, text):
+        if text is None:
+            return NONE
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+
+def _address_column(text, strings):
+    """(u32 value, is_text): the address as an int, or a string id when it isn't a valid IPv4 address."""
+    try:
+        return quad_to_int(text), False
+    except ValueError:
+        return strings.add(text), True
+
+
+def save_snapshot(topology, path):
+    """Writes a NetworkTopologyBuilder to `path` as a binary snapshot."""
+    strings = _StringTable()
+    graph = topology.graph
+    nodes = list(graph.nodes)
+    node_ids = {node: i for i, node in enumerate(nodes)}
+
+    columns = {name: array(typecode) for name, typecode in (
+        ('node_name', 'I'), ('node_type', 'B'), ('node_net', 'I'), ('node_plen', 'b'), ('node_members', 'I'),
+        ('node_iface_ptr', 'I'), ('node_route_ptr', 'I'), ('node_edge_ptr', 'I'),
+        ('if_name', 'I'), ('if_ip', 'I'), ('if_mask', 'I'), ('if_plen', 'b'), ('if_flags', 'B'),
+        ('if_desc', 'I'), ('if_vlan', 'I'), ('if_node', 'I'),
+        ('rt_net', 'I'), ('rt_mask', 'I'), ('rt_hop', 'I'), ('rt_flags', 'B'),
+        ('edge_dst', 'I'), ('edge_net', 'I'), ('edge_plen', 'b'), ('edge_if_a', 'I'), ('edge_if_b', 'I'), ('edge_flags', 'B'),
+    )}
+    meta = {'multi_access_mode': topology.multi_access_mode, 'compact_records': topology.compact_records,
+            'routing_protocols': {}, 'vlan_info': {}, 'platforms': {}, 'node_extra': {}, 'edge_extra': {}}
+
+    for node_id, node in enumerate(nodes):
+        attr = graph.nodes[node]
+        columns['node_name'].append(strings.add(node))
+        columns['node_type'].append(NODE_TYPES.index(attr.get('type', 'router')))
+        network, length = parse_prefix(attr['subnet']) if attr.get('subnet') else (0, -1)
+        columns['node_net'].append(network)
+        columns['node_plen'].append(length)
+        columns['node_members'].append(attr.get('members', 0)) # Member interfaces of a segment hub
+        extra = {key: value for key, value in attr.items() if key not in _NODE_COLUMNS}
+        if extra:
+            meta['node_extra'][node_id] = extra
+
+        columns['node_iface_ptr'].append(len(columns['if_name']))
+        columns['node_route_ptr'].append(len(columns['rt_net']))
+        device_parser = topology.devices.get(node) if attr.get('type') == 'router' else None
+        if device_parser is not None:
+            _write_device(device_parser, node_id, columns, strings)
+            if device_parser.routing_protocols:
+                meta['routing_protocols'][node] = device_parser.routing_protocols
+            if device_parser.vlan_info:
+                meta['vlan_info'][node] = device_parser.vlan_info
+            if device_parser.platform != DEFAULT_PLATFORM:
+                meta['platforms'][node] = device_parser.platform
+
+        columns['node_edge_ptr'].append(len(columns['edge_dst']))
+        for target, edge_attr in graph.adj[node].items():
+            columns['edge_dst'].append(node_ids[target])
+            network, length = parse_prefix(edge_attr['subnet']) if edge_attr.get('subnet') else (0, -1)
+            columns['edge_net'].append(network)
+            columns['edge_plen'].append(length)
+            columns['edge_if_a'].append(strings.add(edge_attr.get('interface_a')))
+            columns['edge_if_b'].append(strings.add(edge_attr.get('interface_b')))
+            columns['edge_flags'].append(_MASK_MISMATCH if edge_attr.get('mask_mismatch') else 0)
+            extra = {key: value for key, value in edge_attr.items() if key not in _EDGE_COLUMNS}
+            if extra:
+                meta['edge_extra'][len(columns['edge_dst']) - 1] = extra
+    # CSR offsets get a closing entry
+    columns['node_iface_ptr'].append(len(columns['if_name']))
+    columns['node_route_ptr'].append(len(columns['rt_net']))
+    columns['node_edge_ptr'].append(len(columns['edge_dst']))
+
+    # Lookup indexes: node ids sorted by name, interface ids sorted by (network, prefix length)
+    columns['node_by_name'] = array('I', sorted(range(len(nodes)), key=lambda node_id: str(nodes[node_id])))
+    subnet_keys = sorted(((columns['if_ip'][i] & prefix_mask(columns['if_plen'][i])) << 8 | columns['if_plen'][i], i)
+                         for i in range(len(columns['if_name']))
+                         if columns['if_plen'][i] >= 0 and not columns['if_flags'][i] & _IP_IS_TEXT)
+    columns['subnet_key'] = array('Q', [key for key, _ in subnet_keys])
+    columns['subnet_iface'] = array('I', [iface for _, iface in subnet_keys])
+
+    encoded = [text.encode('utf-8') for text in strings.strings]
+    offsets = array('Q', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    columns['string_offsets'] = offsets
+    columns['string_data'] = array('B', b''.join(encoded))
+    columns['meta'] = array('B', json.dumps(meta).encode('utf-8'))
+
+    _write_sections(path, columns)
+
+
+def _write_device(device_parser, node_id, columns, strings):
+    for intf in device_parser.interfaces:
+        flags = _SHUTDOWN if intf['shutdown'] else 0
+        ip = mask = NONE
+        if intf['ip_address'] is not None:
+            ip, is_text = _address_column(intf['ip_address'], strings)
+            flags |= _HAS_IP | (_IP_IS_TEXT if is_text else 0)
+        if intf['subnet_mask'] is not None:
+            mask, is_text = _address_column(intf['subnet_mask'], strings)
+            flags |= _HAS_MASK | (_MASK_IS_TEXT if is_text else 0)
+        network = intf.get('network')
+        columns['if_name'].append(strings.add(intf['name']))
+        columns['if_ip'].append(ip)
+        columns['if_mask'].append(mask)
+        columns['if_plen'].append(int(network.rsplit('/', 1)[1]) if network else -1)
+        columns['if_flags'].append(flags)
+        columns['if_desc'].append(strings.add(intf['description']))
+        columns['if_vlan'].append(strings.add(intf['vlan']))
+        columns['if_node'].append(node_id)
+    for route in device_parser.static_routes:
+        flags = 0
+        for column, key, text_flag in (('rt_net', 'network', _NETWORK_IS_TEXT), ('rt_mask', 'mask', _ROUTE_MASK_IS_TEXT),
+                                       ('rt_hop', 'next_hop', _NEXT_HOP_IS_TEXT)):
+            value, is_text = _address_column(route[key], strings)
+            columns[column].append(value)
+            flags |= text_flag if is_text else 0
+        columns['rt_flags'].append(flags)
+
+
+def _write_sections(path, columns):
+    names = sorted(columns)
+    table_size = _HEADER.size + _SECTION.size * len(names)
+    offset = _align(table_size)
+    entries = []
+    for name in names:
+        column = columns[name]
+        entries.append((name, offset, column))
+        offset = _align(offset + len(column) * column.itemsize)
+
+    path = os.fspath(path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, SNAPSHOT_VERSION, _BYTE_ORDER_MARK, len(names)))
+        for name, section_offset, column in entries:
+            f.write(_SECTION.pack(name.encode('ascii'), section_offset, len(column) * column.itemsize,
+                                  column.typecode.encode('ascii'), len(column)))
+        for name, section_offset, column in entries:
+            f.write(b'\0' * (section_offset - f.tell()))
+            column.tofile(f)
+    # Same atomic replace as ParseCache.save
+    os.replace(tmp_path, path)
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class TopologySnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file. Nothing is decoded up front; every query
+    reads straight from the mapped arrays. Use as a context manager or call close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Empty file
+            self._file.close()
+            raise ValueError(f"Not a topology snapshot: {path}")
+        self._views = []
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+        self._meta = None
+        self._strings = None # Every string decoded at once; only filled in for bulk reads (load_topology)
+
+    def _read_header(self):
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"Not a topology snapshot: {self.path}")
+        magic, version, byte_order_mark, section_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a topology snapshot: {self.path}")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} in {self.path}")
+        if byte_order_mark != _BYTE_ORDER_MARK:
+            raise ValueError(f"Snapshot {self.path} was written on a machine with the other byte order")
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+        sections = {}
+        for i in range(section_count):
+            name, offset, length, typecode, count = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._mmap):
+                raise ValueError(f"Truncated snapshot: {self.path}")
+            view = buffer[offset:offset + length]
+            typecode = typecode.rstrip(b'\0').decode('ascii')
+            if typecode != 'B':
+                view = view.cast(typecode)
+            self._views.append(view)
+            sections[name.rstrip(b'\0').decode('ascii')] = view
+        self._sections = sections
+        for name, view in sections.items():
+            setattr(self, '_' + name, view)
+
+    def close(self):
+        # Views into the map have to be released before it can be closed
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Strings and metadata ---
+
+    def _string(self, string_id):
+        if string_id == NONE:
+            return None
+        if self._strings is not None:
+            return self._strings[string_id]
+        return bytes(self._string_data[self._string_offsets[string_id]:self._string_offsets[string_id + 1]]).decode('utf-8')
+
+    def _decode_strings(self):
+        data = bytes(self._string_data)
+        offsets = self._string_offsets
+        self._strings = [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    @property
+    def meta(self):
+        """The JSON part: builder settings, OSPF/VLAN info and non-column node/edge attributes."""
+        if self._meta is None:
+            self._meta = json.loads(bytes(self._sections['meta']).decode('utf-8'))
+        return self._meta
+
+    # --- Nodes ---
+
+    @property
+    def node_count(self):
+        return len(self._node_name)
+
+    @property
+    def edge_count(self):
+        return len(self._edge_dst)
+
+    def nodes(self):
+        return [self._string(string_id) for string_id in self._node_name]
+
+    def node_id(self, name):
+        """Index of a node by name (binary search over the name index), or None."""
+        position = bisect.bisect_left(self._node_by_name, name, key=lambda node_id: self._string(self._node_name[node_id]))
+        if position < len(self._node_by_name):
+            node_id = self._node_by_name[position]
+            if self._string(self._node_name[node_id]) == name:
+                return node_id
+        return None
+
+    def _require(self, name):
+        node_id = self.node_id(name)
+        if node_id is None:
+            raise KeyError(name)
+        return node_id
+
+    def node_type(self, name):
+        return NODE_TYPES[self._node_type[self._require(name)]]
+
+    def devices(self):
+        """Hostnames of the router nodes, in the builder's order."""
+        return [self._string(self._node_name[i]) for i in range(self.node_count) if self._node_type[i] == 0]
+
+    # --- Edges ---
+
+    def neighbors(self, name):
+        """[(neighbor name, {'subnet', 'interface_a', 'interface_b'[, 'mask_mismatch']}), ...] for a node's outgoing edges."""
+        node_id = self._require(name)
+        return [(self._string(self._node_name[self._edge_dst[i]]), self._edge_attr(i))
+                for i in range(self._node_edge_ptr[node_id], self._node_edge_ptr[node_id + 1])]
+
+    def _edge_attr(self, i):
+        attr = {}
+        if self._edge_plen[i] >= 0:
+            attr['subnet'] = format_prefix(self._edge_net[i], self._edge_plen[i])
+        if self._edge_if_a[i] != NONE:
+            attr['interface_a'] = self._string(self._edge_if_a[i])
+        if self._edge_if_b[i] != NONE:
+            attr['interface_b'] = self._string(self._edge_if_b[i])
+        if self._edge_flags[i] & _MASK_MISMATCH:
+            attr['mask_mismatch'] = True
+        return attr
+
+    # --- Interfaces, routes, subnets ---
+
+    def interfaces(self, hostname):
+        """The device's interfaces as dicts with the parser's keys (without 'network_object')."""
+        return self._interfaces_at(self._require(hostname))
+
+    def _interfaces_at(self, node_id):
+        return [self._interface(i) for i in range(self._node_iface_ptr[node_id], self._node_iface_ptr[node_id + 1])]
+
+    def _interface(self, i):
+        flags = self._if_flags[i]
+        ip = mask = None
+        if flags & _HAS_IP:
+            ip = self._string(self._if_ip[i]) if flags & _IP_IS_TEXT else int_to_quad(self._if_ip[i])
+        if flags & _HAS_MASK:
+            mask = self._string(self._if_mask[i]) if flags & _MASK_IS_TEXT else int_to_quad(self._if_mask[i])
+        intf = {'name': self._string(self._if_name[i]), 'ip_address': ip, 'subnet_mask': mask,
+                'description': self._string(self._if_desc[i]), 'shutdown': bool(flags & _SHUTDOWN),
+                'vlan': self._string(self._if_vlan[i])}
+        if ip is not None:
+            length = self._if_plen[i]
+            intf['network'] = format_prefix(self._if_ip[i] & prefix_mask(length), length) if length >= 0 else None
+        return intf
+
+    def static_routes(self, hostname):
+        return self._static_routes_at(self._require(hostname))
+
+    def _static_routes_at(self, node_id):
+        routes = []
+        for i in range(self._node_route_ptr[node_id], self._node_route_ptr[node_id + 1]):
+            flags = self._rt_flags[i]
+            routes.append({key: self._string(column[i]) if flags & text_flag else int_to_quad(column[i])
+                           for key, column, text_flag in (('network', self._rt_net, _NETWORK_IS_TEXT),
+                                                          ('mask', self._rt_mask, _ROUTE_MASK_IS_TEXT),
+                                                          ('next_hop', self._rt_hop, _NEXT_HOP_IS_TEXT))})
+        return routes
+
+    def subnet_members(self, subnet):
+        """[(hostname, interface name), ...] for every interface whose network is exactly `subnet` ('10.1.1.0/30')."""
+        network, length = parse_prefix(subnet)
+        key = network << 8 | length
+        start = bisect.bisect_left(self._subnet_key, key)
+        members = []
+        for position in range(start, len(self._subnet_key)):
+            if self._subnet_key[position] != key:
+                break
+            iface = self._subnet_iface[position]
+            members.append((self._string(self._node_name[self._if_node[iface]]), self._string(self._if_name[iface])))
+        return members
+
+    def subnets(self):
+        """Every distinct interface network, in address order."""
+        result = []
+        previous = None
+        for key in self._subnet_key:
+            if key != previous:
+                result.append(format_prefix(key >> 8, key & 0xFF))
+                previous = key
+        return result
+
+
+def load_topology(path):
+    """Rebuilds a full NetworkTopologyBuilder (devices, graph, indexes) from a snapshot."""
+    # Imported here: topology_builder imports this module
+    from config_parser import parser_from_record
+    from topology_builder import NetworkTopologyBuilder
+
+    with TopologySnapshot(path) as snapshot:
+        snapshot._decode_strings()
+        meta = snapshot.meta
+        topology = NetworkTopologyBuilder(compact_records=meta['compact_records'], multi_access_mode=meta['multi_access_mode'])
+        names = snapshot.nodes()
+        for node_id, node in enumerate(names):
+            node_type = NODE_TYPES[snapshot._node_type[node_id]]
+            attr = {'type': node_type}
+            if snapshot._node_plen[node_id] >= 0:
+                attr['subnet'] = format_prefix(snapshot._node_net[node_id], snapshot._node_plen[node_id])
+            if node_type == 'router':
+                record = (node, [(intf['name'], intf['ip_address'], intf['subnet_mask'], intf['description'],
+                                  intf['shutdown'], intf['vlan'], intf.get('network'))
+                                 for intf in snapshot._interfaces_at(node_id)],
+                          snapshot._static_routes_at(node_id), meta['routing_protocols'].get(node, {}), meta['vlan_info'].get(node, []),
+                          meta.get('platforms', {}).get(node, DEFAULT_PLATFORM))
+                device_parser = parser_from_record(record, compact=topology.compact_records)
+                topology.devices[node] = device_parser
+                attr['parser'] = device_parser
+            elif node_type == 'segment':
+                attr['members'] = snapshot._node_members[node_id]
+            attr.update(meta['node_extra'].get(str(node_id), {}))
+            topology.graph.add_node(node, **attr)
+
+        for node_id, node in enumerate(names):
+            for i in range(snapshot._node_edge_ptr[node_id], snapshot._node_edge_ptr[node_id + 1]):
+                target = names[snapshot._edge_dst[i]]
+                attr = snapshot._edge_attr(i)
+                attr['label'] = f"{attr.get('interface_a', node)} -> {attr.get('interface_b', target)}"
+                attr.update(meta['edge_extra'].get(str(i), {}))
+                topology.graph.add_edge(node, target, **attr)
+    topology._rebuild_indexes()
+    topology.topology_version += 1
+    return topology
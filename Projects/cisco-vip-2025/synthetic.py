@@ -0,0 +1,214 @@
+import argparse
+import os
+import random
+
+from records import int_to_quad
+
+# Deterministic synthetic networks for tests and benchmarks: N IOS routers with
+# config.dump files laid out like Conf/ (one <hostname>/config.dump per router).
+#
+# The routers form a chain of /30 links (R1 - R2 - ... - RN). Each router can also have:
+#   - stub LANs and VLAN SVIs (interface VlanN, plus the vlan declaration) carved from its own /22
+#   - dot1Q subinterfaces on GigabitEthernet0/2, each one a /30 link to a random other router
+#   - a multi-access segment (GigabitEthernet0/3) shared with the next segment_size - 1 routers
+#   - static routes: a default towards the previous router and routes to other routers' /22s
+#   - OSPF, area 0 for the links and a configurable number of areas for the LANs
+# The same arguments and seed always give byte-identical configs, so results stay comparable
+# between runs and machines.
+
+P2P_POOL = 0xAC100000 # 172.16.0.0/12, one /30 per link
+LAN_POOL = 0x0A000000 # 10.0.0.0/8, one /22 per router, split into /26s
+SEGMENT_POOL = 0x64400000 # 100.64.0.0/10, one /24 per multi-access segment
+LOOPBACK_POOL = 0xC6120000 # 198.18.0.0/15, one /32 per router
+
+LAN_BLOCK_SIZE = 1024 # /22 per router
+LAN_SIZE = 64 # /26 per LAN or SVI
+MAX_ROUTERS = 16384 # What the /22-per-router plan fits in 10.0.0.0/8
+
+
+class SyntheticNetwork:
+    """
+    The address plan and link layout of one synthetic network. configs() renders the router
+    configs; write() lays them out as <root>/<hostname>/config.dump.
+
+    routers: number of routers (R1..RN).
+    lans / svis: stub /26 LANs (GigabitEthernet1/k) and VLAN SVIs (interface Vlan<id>) per router.
+    subinterfaces: average dot1Q subinterface links per router, to random other routers.
+    segment_size: routers per multi-access segment (3+ members, or 0 for none).
+    static_routes: static routes per router (the first one is the default route).
+    ospf_areas: areas the LANs are spread over; 0 leaves OSPF out altogether.
+    """
+
+    def __init__(self, routers, lans=2, svis=1, subinterfaces=1, segment_size=0, static_routes=2, ospf_areas=1, seed=0):
+        if not 1 <= routers <= MAX_ROUTERS:
+            raise ValueError(f"routers must be between 1 and {MAX_ROUTERS}")
+        if lans + svis > LAN_BLOCK_SIZE // LAN_SIZE:
+            raise ValueError(f"At most {LAN_BLOCK_SIZE // LAN_SIZE} LANs and SVIs per router")
+        if segment_size and not 3 <= segment_size <= 254:
+            raise ValueError("segment_size must be between 3 and 254 (or 0 for no segments)")
+        self.routers = routers
+        self.lans = lans
+        self.svis = svis
+        self.segment_size = segment_size
+        self.static_routes = static_routes
+        self.ospf_areas = ospf_areas
+        self.seed = seed
+
+        rng = random.Random(seed)
+        # Chain links first: link k joins router k + 1 and router k + 2 (1-based)
+        self.links = [(r, r + 1) for r in range(1, routers)]
+        pairs = set(self.links)
+        # Then the subinterface links between random pairs that aren't linked yet
+        self._subinterface_links = {r: [] for r in range(1, routers + 1)} # router -> [(link index, neighbor)]
+        wanted = routers * subinterfaces // 2 if routers > 2 else 0
+        attempts = 0
+        while wanted and attempts < wanted * 20:
+            attempts += 1
+            a, b = sorted(rng.sample(range(1, routers + 1), 2))
+            if (a, b) in pairs:
+                continue
+            pairs.add((a, b))
+            self._subinterface_links[a].append((len(self.links), b))
+            self._subinterface_links[b].append((len(self.links), a))
+            self.links.append((a, b))
+            wanted -= 1
+        # Static route destinations: other routers' LAN blocks
+        self._route_targets = {}
+        for r in range(1, routers + 1):
+            targets = [rng.randrange(1, routers) for _ in range(max(0, static_routes - 1))] if routers > 1 else []
+            self._route_targets[r] = [target + (target >= r) for target in targets]
+
+    @staticmethod
+    def hostname(router):
+        return f"R{router}"
+
+    def _link_address(self, link, side):
+        # side 0 is the lower-numbered router (.1), side 1 the other (.2)
+        return int_to_quad(P2P_POOL + 4 * link + 1 + side)
+
+    def _lan_block(self, router):
+        return LAN_POOL + (router - 1) * LAN_BLOCK_SIZE
+
+    def _segment(self, router):
+        """(segment index, position in it) for routers in a full segment, else None."""
+        if not self.segment_size:
+            return None
+        segment, position = divmod(router - 1, self.segment_size)
+        if (segment + 1) * self.segment_size > self.routers:
+            return None
+        return segment, position
+
+    def segments(self):
+        return self.routers // self.segment_size if self.segment_size else 0
+
+    def adjacent_pairs(self):
+        """Every pair of routers that share at least one subnet, as (lower, higher) router numbers."""
+        pairs = set(self.links)
+        for segment in range(self.segments()):
+            members = range(segment * self.segment_size + 1, (segment + 1) * self.segment_size + 1)
+            pairs.update((a, b) for a in members for b in members if a < b)
+        return pairs
+
+    def _next_hop(self, router):
+        # Towards R1 along the chain; R1 itself points at R2
+        if router > 1:
+            return self._link_address(router - 2, 0)
+        if self.routers > 1:
+            return self._link_address(0, 1)
+        return None
+
+    def config(self, router):
+        """The running-config of one router, as text."""
+        hostname = self.hostname(router)
+        lan_block = self._lan_block(router)
+        svi_vlans = [10 + k for k in range(self.svis)]
+        lines = ["!", "version 15.1", "service timestamps debug datetime msec", "no ip domain lookup", "!",
+                 f"hostname {hostname}", "!"]
+        for vlan in svi_vlans:
+            lines += [f"vlan {vlan}", f" name USERS_{vlan}", "!"]
+
+        loopback = int_to_quad(LOOPBACK_POOL + router)
+        lines += ["interface Loopback0", f" ip address {loopback} 255.255.255.255", "!"]
+        if router > 1:
+            lines += ["interface GigabitEthernet0/0", f" description Uplink to {self.hostname(router - 1)}",
+                      f" ip address {self._link_address(router - 2, 1)} 255.255.255.252", " duplex auto", " speed auto", "!"]
+        if router < self.routers:
+            lines += ["interface GigabitEthernet0/1", f" description Downlink to {self.hostname(router + 1)}",
+                      f" ip address {self._link_address(router - 1, 0)} 255.255.255.252", " duplex auto", " speed auto", "!"]
+        if self._subinterface_links[router]:
+            lines += ["interface GigabitEthernet0/2", " description Trunk", " no ip address", "!"]
+            for k, (link, neighbor) in enumerate(self._subinterface_links[router]):
+                side = 0 if router < neighbor else 1
+                lines += [f"interface GigabitEthernet0/2.{101 + k}", f" description Transit to {self.hostname(neighbor)}",
+                          f" encapsulation dot1Q {2 + link % 4000}",
+                          f" ip address {self._link_address(link, side)} 255.255.255.252", "!"]
+        segment = self._segment(router)
+        if segment is not None:
+            index, position = segment
+            lines += ["interface GigabitEthernet0/3", f" description Segment {index}",
+                      f" ip address {int_to_quad(SEGMENT_POOL + 256 * index + position + 1)} 255.255.255.0", "!"]
+        for k in range(self.lans):
+            lines += [f"interface GigabitEthernet1/{k}", f" description Access LAN {k}",
+                      f" ip address {int_to_quad(lan_block + LAN_SIZE * k + 1)} 255.255.255.192", " duplex auto", " speed auto", "!"]
+        for k, vlan in enumerate(svi_vlans):
+            lines += [f"interface Vlan{vlan}", f" description Users VLAN {vlan}",
+                      f" ip address {int_to_quad(lan_block + LAN_SIZE * (self.lans + k) + 1)} 255.255.255.192", "!"]
+
+        if self.ospf_areas:
+            lines += ["router ospf 1", f" router-id {loopback}", " network 172.16.0.0 0.15.255.255 area 0",
+                      " network 100.64.0.0 0.63.255.255 area 0", f" network {loopback} 0.0.0.0 area 0",
+                      f" network {int_to_quad(lan_block)} 0.0.3.255 area {router % self.ospf_areas}", "!"]
+
+        next_hop = self._next_hop(router)
+        if next_hop is not None and self.static_routes:
+            lines.append(f"ip route 0.0.0.0 0.0.0.0 {next_hop}")
+            for target in self._route_targets[router]:
+                lines.append(f"ip route {int_to_quad(self._lan_block(target))} 255.255.252.0 {next_hop}")
+        lines += ["!", "line vty 0 4", " login", "!", "end"]
+        return "\n".join(lines) + "\n"
+
+    def configs(self):
+        """Yields (hostname, config text) for every router, in router order."""
+        for router in range(1, self.routers + 1):
+            yield self.hostname(router), self.config(router)
+
+    def write(self, root):
+        """
+        Writes <root>/<hostname>/config.dump for every router and returns a summary of what was
+        generated (routers, links, segments, adjacent router pairs, config lines and bytes).
+        """
+        lines = size = 0
+        for hostname, text in self.configs():
+            os.makedirs(os.path.join(root, hostname), exist_ok=True)
+            with open(os.path.join(root, hostname, 'config.dump'), 'w') as f:
+                f.write(text)
+            lines += text.count('\n')
+            size += len(text)
+        return {'routers': self.routers, 'links': len(self.links), 'segments': self.segments(),
+                'adjacent_pairs': len(self.adjacent_pairs()), 'config_lines': lines, 'config_bytes': size}
+
+
+def write_conf_tree(root, routers, **options):
+    """Generates a synthetic network (see SyntheticNetwork for the options) into root; returns its summary."""
+    return SyntheticNetwork(routers, **options).write(root)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Write a synthetic Conf/<host>/config.dump tree")
+    arg_parser.add_argument('root', help="output directory")
+    arg_parser.add_argument('--routers', type=int, default=100)
+    arg_parser.add_argument('--lans', type=int, default=2, help="stub LANs per router")
+    arg_parser.add_argument('--svis', type=int, default=1, help="VLAN SVIs per router")
+    arg_parser.add_argument('--subinterfaces', type=int, default=1, help="average dot1Q subinterface links per router")
+    arg_parser.add_argument('--segment-size', type=int, default=0, help="routers per multi-access segment (0 for none)")
+    arg_parser.add_argument('--static-routes', type=int, default=2, help="static routes per router")
+    arg_parser.add_argument('--ospf-areas', type=int, default=1, help="OSPF areas for the LANs (0 for no OSPF)")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    summary = write_conf_tree(args.root, args.routers, lans=args.lans, svis=args.svis, subinterfaces=args.subinterfaces,
+                              segment_size=args.segment_size, static_routes=args.static_routes,
+                              ospf_areas=args.ospf_areas, seed=args.seed)
+    print(", ".join(f"{count} {name.replace('_', ' ')}" for name, count in summary.items()))
+
+if __name__ == "__main__":
+    main()
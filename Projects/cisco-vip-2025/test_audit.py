@@ -0,0 +1,87 @@
+import json
+import random
+from ipaddress import IPv4Network
+
+from audit import audit_devices, collect, find_duplicates, find_overlaps
+from config_parser import CiscoConfigParser
+from topology_builder import NetworkTopologyBuilder
+
+def _devices(config_texts, compact=False):
+    devices = {}
+    for config_text in config_texts:
+        device_parser = CiscoConfigParser(config_text, compact=compact)
+        device_parser.parse()
+        devices[device_parser.hostname] = device_parser
+    return devices
+
+CONFIGS = [
+    """hostname A
+interface Gi0/0
+ ip address 10.1.1.1 255.255.255.252
+interface Gi0/1
+ ip address 10.2.0.1 255.255.255.0
+interface Gi0/2
+ ip address 10.3.3.1 255.255.255.0
+ shutdown
+!
+ip route 10.50.0.0 255.255.0.0 10.1.1.2
+ip route 10.60.0.0 255.255.0.0 10.3.3.1
+ip route 10.70.0.0 255.255.0.0 10.9.9.9
+""",
+    """hostname B
+interface Gi0/0
+ ip address 10.1.1.2 255.255.255.252
+interface Gi0/1
+ ip address 10.2.0.1 255.255.255.0
+interface Gi0/2
+ ip address 10.2.0.9 255.255.255.248
+!
+""",
+]
+
+def test_audit_finds_each_kind_of_problem():
+    for compact in (False, True):
+        report = audit_devices(_devices(CONFIGS, compact=compact))
+        assert report['duplicate_addresses'] == [{'ip': '10.2.0.1', 'owners': [
+            {'device': 'A', 'interface': 'Gi0/1', 'shutdown': False},
+            {'device': 'B', 'interface': 'Gi0/1', 'shutdown': False}]}]
+        [overlap] = report['overlapping_prefixes']
+        assert (overlap['prefix'], overlap['inside']) == ('10.2.0.0/24', '10.2.0.8/29')
+        assert overlap['inside_owners'] == [{'device': 'B', 'interface': 'Gi0/2', 'shutdown': False}]
+        assert len(overlap['prefix_owners']) == 2
+        assert [(item['route']['network'], item['reason']) for item in report['unreachable_next_hops']] == [
+            ('10.60.0.0', 'owner_shutdown'), ('10.70.0.0', 'unowned')]
+        assert report['shutdown_with_ip'] == [{'device': 'A', 'interface': 'Gi0/2', 'ip': '10.3.3.1'}]
+        assert report['summary']['addresses'] == 6
+        json.dumps(report)
+
+def test_sample_configs_are_clean_and_builder_counts_findings():
+    topology = NetworkTopologyBuilder()
+    topology.build_topology_from_configs('Conf')
+    report = topology.audit()
+    assert report['summary']['duplicate_addresses'] == 0
+    assert report['summary']['overlapping_prefixes'] == 0
+    assert topology.stats.counters['audit_duplicate_addresses'] == 0
+    assert 'audit' in topology.stats.stages
+
+def test_sorted_checks_match_pairwise_comparison():
+    rng = random.Random(5)
+    lines = ["hostname R"]
+    for i in range(400):
+        length = rng.choice([16, 22, 24, 30])
+        lines += [f"interface Gi0/{i}", f" ip address 10.{rng.randint(0, 3)}.{rng.randint(0, 7)}.{rng.randint(1, 254)} {IPv4Network(f'0.0.0.0/{length}').netmask}", "!"]
+    collected = collect(_devices(["\n".join(lines) + "\n"]))
+    networks = {IPv4Network(f"{ip >> 24}.{ip >> 16 & 255}.{ip >> 8 & 255}.{ip & 255}/{length}", strict=False)
+                for ip, length in zip(collected['ips'].tolist(), collected['lengths'].tolist())}
+
+    expected = {str(inner) for inner in networks for outer in networks if inner != outer and inner.subnet_of(outer)}
+    assert {overlap['inside'] for overlap in find_overlaps(collected)} == expected
+    for overlap in find_overlaps(collected):
+        outer = IPv4Network(overlap['prefix'])
+        assert IPv4Network(overlap['inside']).subnet_of(outer)
+        # Reported against the widest container
+        assert not any(outer != other and outer.subnet_of(other) for other in networks)
+
+    ips = collected['ips'].tolist()
+    assert {item['ip'] for item in find_duplicates(collected)} == {
+        f"{ip >> 24}.{ip >> 16 & 255}.{ip >> 8 & 255}.{ip & 255}" for ip in ips if ips.count(ip) > 1}
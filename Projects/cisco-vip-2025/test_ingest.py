@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from ingest import ConfigSource, DirectorySource, FakeDeviceSource, ingest
+from topology_builder import NetworkTopologyBuilder
+
+def _edges(topology):
+    return sorted((a, b, sorted(attr.items())) for a, b, attr in topology.graph.edges(data=True))
+
+def _fake_configs(count):
+    # A chain: device i shares a /30 with device i + 1
+    configs = {}
+    for i in range(count):
+        configs[f"D{i}"] = (f"hostname D{i}\n"
+                            f"interface Gi0/0\n ip address 10.0.{i}.1 255.255.255.252\n!\n"
+                            f"interface Gi0/1\n ip address 10.0.{i - 1 if i else 255}.2 255.255.255.252\n!\n")
+    return configs
+
+def test_directory_source_builds_the_same_topology():
+    from_files = NetworkTopologyBuilder()
+    from_files.build_topology_from_configs('Conf')
+    streamed = NetworkTopologyBuilder()
+    streamed.build_topology_from_source(DirectorySource('Conf', chunk_size=50), concurrency=2)
+    assert sorted(streamed.devices) == ['R1', 'R2', 'R3']
+    assert _edges(streamed) == _edges(from_files)
+    assert streamed.stats.counters['files_read'] == 3
+
+def test_fake_source_concurrency_backpressure_and_failures():
+    configs = _fake_configs(40)
+    topology = NetworkTopologyBuilder()
+    source = FakeDeviceSource(configs, chunk_size=16, delay=0.001, failing={'D7'})
+    started = []
+    in_flight = []
+    real_fetch = source.fetch
+    def watched_fetch(device):
+        # How many devices have been started but not yet added to the builder, this one included
+        started.append(device)
+        in_flight.append(len(started) - len(topology.devices))
+        return real_fetch(device)
+    source.fetch = watched_fetch
+    added = asyncio.run(ingest(topology, source, concurrency=4, max_pending=2))
+
+    assert added == 39 and 'D7' not in topology.devices
+    assert topology.stats.counters['fetch_errors'] == 1
+    assert source.max_active <= 4
+    # Workers plus the parsed queue, plus the failed fetch that never gets added
+    assert max(in_flight) <= 4 + 2 + 1
+
+    # Same graph as a serial build of everything that didn't fail
+    expected = NetworkTopologyBuilder()
+    expected.build_topology_from_source(FakeDeviceSource({k: v for k, v in configs.items() if k != 'D7'}), concurrency=1)
+    assert _edges(topology) == _edges(expected)
+
+def test_directory_source_falls_back_to_the_file_based_hostname(tmp_path):
+    # Configs without a hostname line are named like build_topology_from_configs names them
+    (tmp_path / 'R8').mkdir()
+    (tmp_path / 'R8' / 'config.dump').write_text("interface Gi0/0\n ip address 10.8.9.1 255.255.255.252\n")
+    (tmp_path / 'R9.cfg').write_text("interface Gi0/0\n ip address 10.8.9.2 255.255.255.252\n")
+    from_files = NetworkTopologyBuilder()
+    from_files.build_topology_from_configs(str(tmp_path))
+    streamed = NetworkTopologyBuilder()
+    streamed.build_topology_from_source(DirectorySource(str(tmp_path)))
+    assert sorted(streamed.devices) == sorted(from_files.devices) == ['R8', 'R9']
+    assert streamed.graph.has_edge('R8', 'R9')
+
+def test_incomplete_source_fails_when_created():
+    class DevicesOnly(ConfigSource):
+        async def devices(self):
+            yield 'R1'
+    with pytest.raises(TypeError):
+        DevicesOnly()
+
+def test_bytes_parsed_counts_encoded_bytes():
+    config_text = "hostname R1\ninterface Gi0/0\n description Zürich – Genève uplink\n ip address 10.0.0.1 255.255.255.252\n!\n"
+    topology = NetworkTopologyBuilder()
+    topology.build_topology_from_source(FakeDeviceSource({'R1': config_text}, chunk_size=7))
+    assert topology.stats.counters['bytes_parsed'] == len(config_text.encode('utf-8')) > len(config_text)
@@ -0,0 +1,40 @@
+import json
+import logging
+
+from config_parser import CiscoConfigParser
+from instrumentation import BuildStats
+from topology_builder import NetworkTopologyBuilder
+
+def test_build_report_has_counters_and_stage_timings():
+    topology = NetworkTopologyBuilder()
+    topology.build_topology_from_configs('Conf')
+    report = json.loads(topology.stats.to_json())
+    counters = report['counters']
+    assert counters['files_read'] == counters['devices_added'] == 3
+    assert counters['bytes_parsed'] > 0
+    assert counters['interfaces'] == 6
+    assert counters['subnets'] == 2
+    assert counters['edges_created'] == counters['graph_edges'] == 4
+    assert {'build_total', 'find_configs', 'parse', 'discover_links'} <= set(report['stages'])
+    # Parser methods are only timed when asked for
+    assert not any(name.startswith('parser.') for name in report['stages'])
+
+def test_profiled_parallel_build_merges_worker_reports():
+    serial = NetworkTopologyBuilder()
+    serial.build_topology_from_configs('Conf', profile_parser=True)
+    parallel = NetworkTopologyBuilder()
+    parallel.build_topology_from_configs('Conf', workers=2, chunksize=1, profile_parser=True)
+    assert parallel.stats.counters == serial.stats.counters
+    stages = parallel.stats.to_dict()['stages']
+    assert stages['parser._parse_interface_line']['calls'] == serial.stats.stages['parser._parse_interface_line'][1]
+
+    stats = BuildStats(profile_parser=True)
+    device_parser = CiscoConfigParser("hostname X\ninterface Gi0/0\n ip address 10.0.0.1 255.255.255.0\n", stats=stats)
+    device_parser.parse_regex()
+    assert stats.stages['parser._parse_interfaces'][1] == 1
+
+def test_build_is_quiet_by_default_and_logs_links_at_debug(capsys, caplog):
+    with caplog.at_level(logging.DEBUG, logger='topology_builder'):
+        NetworkTopologyBuilder().build_topology_from_configs('Conf')
+    assert capsys.readouterr().out == ''
+    assert sum(message.startswith('Created link:') for message in caplog.messages) == 2
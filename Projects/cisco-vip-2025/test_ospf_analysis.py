@@ -0,0 +1,90 @@
+import random
+
+from config_parser import CiscoConfigParser
+from ospf_analysis import match_interfaces, match_interfaces_naive
+from topology_builder import NetworkTopologyBuilder
+
+def _topology(config_texts, **options):
+    topology = NetworkTopologyBuilder(**options)
+    for config_text in config_texts:
+        device_parser = CiscoConfigParser(config_text)
+        device_parser.parse()
+        topology.add_device(device_parser)
+    topology._discover_links()
+    return topology
+
+CONFIGS = [
+    """hostname R1
+interface Gi0/0
+ ip address 10.1.1.1 255.255.255.252
+interface Gi0/1
+ ip address 10.1.1.5 255.255.255.252
+interface Gi0/2
+ ip address 192.168.1.1 255.255.255.0
+ shutdown
+!
+router ospf 1
+ network 10.0.0.0 0.255.255.255 area 0
+ network 10.1.1.4 0.0.0.3 area 1
+ network 192.168.1.0 0.0.0.255 area 0
+!
+""",
+    """hostname R2
+interface Gi0/0
+ ip address 10.1.1.2 255.255.255.252
+!
+router ospf 1
+ network 10.1.1.0 0.0.0.255 area 0.0.0.0
+!
+""",
+    """hostname R3
+interface Gi0/0
+ ip address 10.1.1.6 255.255.255.252
+interface Gi0/1
+ ip address 172.16.0.1 255.255.0.0
+!
+router ospf 7
+ network 10.1.1.6 0.0.0.0 area 2
+ network 172.16.0.0 0.0.255.255 area 2
+!
+""",
+]
+
+def test_most_specific_statement_wins_and_shutdown_interfaces_are_skipped():
+    topology = _topology(CONFIGS)
+    matches = match_interfaces(topology.devices)
+    assert matches[('R1', 'Gi0/0')] == ('1', '0')
+    assert matches[('R1', 'Gi0/1')] == ('1', '1') # /30 statement beats the /8 one
+    assert ('R1', 'Gi0/2') not in matches
+    assert matches[('R2', 'Gi0/0')] == ('1', '0') # dotted area 0.0.0.0 is the backbone
+    assert matches[('R3', 'Gi0/0')] == ('7', '2')
+
+def test_analyze_ospf_tags_edges_and_roles():
+    topology = _topology(CONFIGS)
+    summary = topology.analyze_ospf()
+    assert topology.graph['R1']['R2']['ospf_area'] == '0'
+    assert topology.graph['R1']['R2']['ospf_adjacency'] is True
+    assert topology.graph['R1']['R3']['ospf_area_mismatch'] is True
+    assert topology.graph.nodes['R1']['ospf_role'] == 'ABR'
+    assert topology.graph.nodes['R2']['ospf_role'] == 'backbone'
+    assert topology.graph.nodes['R3']['ospf_role'] == 'internal'
+    assert summary['abrs'] == ['R1']
+    assert summary['adjacencies'] == [{'devices': ['R1', 'R2'], 'subnet': '10.1.1.0/30', 'area': '0'}]
+    assert summary['area_mismatches'][0]['areas'] == ['1', '2']
+
+def test_vectorized_matching_agrees_with_naive_loops():
+    rng = random.Random(5)
+    config_texts = []
+    for device in range(30):
+        lines = [f"hostname D{device}"]
+        for i in range(20):
+            lines += [f"interface Gi0/{i}", f" ip address 10.{rng.randint(0, 3)}.{rng.randint(0, 255)}.{rng.randint(1, 254)} 255.255.255.0", "!"]
+        lines.append("router ospf 1")
+        for _ in range(rng.randint(0, 6)):
+            bits = rng.choice([0, 2, 8, 16, 24])
+            wildcard = (1 << bits) - 1
+            lines.append(f" network 10.{rng.randint(0, 3)}.{rng.randint(0, 255)}.0 "
+                         f"{wildcard >> 24 & 255}.{wildcard >> 16 & 255}.{wildcard >> 8 & 255}.{wildcard & 255} area {rng.randint(0, 3)}")
+        config_texts.append("\n".join(lines) + "\n!\n")
+    topology = _topology(config_texts)
+    assert match_interfaces(topology.devices) == match_interfaces_naive(topology.devices)
@@ -1,3 +1,5 @@
+from config_parser import CiscoConfigParser, load_config_from_file
+
 def test_interface_parsing():
     # Test R1 config
     with open('Conf/R1/config.dump', 'r') as f:
@@ -28,5 +30,91 @@ def test_interface_parsing():
     interface_lines = [line for line in r3_config.split('\n') if 'interface' in line.lower()]
     print("Interface lines found in R3:", interface_lines)
 
+def test_streaming_parser_matches_regex_parser():
+    for device in ('R1', 'R2', 'R3'):
+        with open(f'Conf/{device}/config.dump', 'r') as f:
+            config_text = f.read()
+        streaming = CiscoConfigParser(config_text)
+        streaming.parse()
+        legacy = CiscoConfigParser(config_text)
+        legacy.parse_regex()
+        assert streaming.hostname == legacy.hostname == device
+        assert streaming.interfaces == legacy.interfaces
+        assert streaming.static_routes == legacy.static_routes
+
+def test_streaming_parser_reads_file_handle():
+    parser = load_config_from_file('Conf/R2/config.dump')
+    assert parser.hostname == 'R2'
+    assert [intf['network'] for intf in parser.interfaces] == ['10.1.1.0/30', '10.1.1.4/30']
+
+def test_streaming_parser_routes_ospf_and_vlans():
+    config_lines = iter([
+        "hostname SW1",
+        "vlan 40",
+        " name SERVERS",
+        "interface Vlan40",
+        " description Server farm",
+        " ip address 192.168.40.1 255.255.255.0",
+        "interface GigabitEthernet0/1.10",
+        " encapsulation dot1Q 10",
+        " ip address 192.168.10.1 255.255.255.0",
+        " shutdown",
+        "!",
+        "ip route 0.0.0.0 0.0.0.0 10.0.0.1",
+        "router ospf 1",
+        " network 10.0.0.0 0.0.0.3 area 0",
+        "!",
+    ])
+    parser = CiscoConfigParser()
+    parser.parse(config_lines)
+    assert parser.hostname == 'SW1'
+    assert parser.vlan_info == [{'vlan_id': '40', 'name': 'SERVERS'}]
+    svi, subif = parser.interfaces
+    assert (svi['vlan'], svi['description'], svi['network']) == ('40', 'Server farm', '192.168.40.0/24')
+    assert (subif['vlan'], subif['shutdown']) == ('10', True)
+    assert parser.static_routes == [{'network': '0.0.0.0', 'mask': '0.0.0.0', 'next_hop': '10.0.0.1'}]
+    assert parser.routing_protocols['ospf'] == [
+        {'process_id': '1', 'networks': [{'network': '10.0.0.0', 'wildcard': '0.0.0.3', 'area': '0'}]}]
+
+def test_compact_records_match_dict_records():
+    config_text = """hostname R9
+interface Vlan40
+ description Servers
+ ip address 192.168.40.1 255.255.255.0
+interface GigabitEthernet0/1.010
+ encapsulation dot1Q 010
+ ip address 10.0.0.300 255.255.255.0
+interface GigabitEthernet0/2
+ no ip address
+ shutdown
+!
+ip route 10.2.0.0 255.255.0.0 192.168.40.254
+"""
+    as_dicts = CiscoConfigParser(config_text)
+    as_dicts.parse()
+    compact = CiscoConfigParser(config_text, compact=True)
+    compact.parse()
+    assert compact.interfaces == as_dicts.interfaces
+    assert [dict(intf) for intf in compact.interfaces] == as_dicts.interfaces
+    assert compact.static_routes == as_dicts.static_routes
+    svi = compact.interfaces[0]
+    assert svi['network'] == '192.168.40.0/24' and svi.get('network_object').prefixlen == 24
+    assert 'network' not in compact.interfaces[2] and compact.interfaces[2].get('network', 'N/A') == 'N/A'
+    assert CiscoConfigParser.from_record(compact.to_record(), compact=True).interfaces == as_dicts.interfaces
+
+def test_feed_in_chunks_matches_single_pass():
+    with open('Conf/R2/config.dump', 'r') as f:
+        config_text = f.read() + "\nrouter ospf 1\n network 10.1.1.0 0.0.0.3 area 0" # Last line unterminated
+    whole = CiscoConfigParser(config_text)
+    whole.parse()
+    for chunk_size in (1, 7, 64, len(config_text)):
+        chunked = CiscoConfigParser()
+        for start in range(0, len(config_text), chunk_size):
+            chunked.feed(config_text[start:start + chunk_size])
+        chunked.close()
+        assert chunked.hostname == whole.hostname
+        assert chunked.interfaces == whole.interfaces
+        assert chunked.routing_protocols == whole.routing_protocols == {'ospf': [{'process_id': '1', 'networks': [{'network': '10.1.1.0', 'wildcard': '0.0.0.3', 'area': '0'}]}]}
+
 if __name__ == "__main__":
-    test_interface_parsing()
\ No newline at end of file
+    test_interface_parsing()
@@ -0,0 +1,79 @@
+from config_parser import CiscoConfigParser
+from topology_builder import NetworkTopologyBuilder
+
+CONFIGS = [
+    """hostname R1
+interface Gi0/0
+ ip address 10.1.1.1 255.255.255.252
+interface Gi0/1
+ ip address 192.168.1.1 255.255.255.0
+!
+ip route 192.168.3.0 255.255.255.0 10.1.1.2
+ip route 172.16.0.0 255.255.0.0 10.1.1.2
+ip route 10.99.0.0 255.255.0.0 10.1.1.3
+""",
+    """hostname R2
+interface Gi0/0
+ ip address 10.1.1.2 255.255.255.252
+interface Gi0/1
+ ip address 10.1.1.5 255.255.255.252
+!
+ip route 192.168.1.0 255.255.255.0 10.1.1.1
+ip route 192.168.3.0 255.255.255.0 10.1.1.6
+ip route 172.16.0.0 255.255.0.0 10.1.1.1
+""",
+    """hostname R3
+interface Gi0/0
+ ip address 10.1.1.6 255.255.255.252
+interface Gi0/1
+ ip address 192.168.3.1 255.255.255.0
+!
+ip route 0.0.0.0 0.0.0.0 10.1.1.5
+""",
+]
+
+def _topology():
+    topology = NetworkTopologyBuilder()
+    for config_text in CONFIGS:
+        device_parser = CiscoConfigParser(config_text)
+        device_parser.parse()
+        topology.add_device(device_parser)
+    topology._discover_links()
+    return topology
+
+def test_static_routes_resolve_to_neighbors():
+    topology = _topology()
+    resolved = {(entry['device'], entry['route']['network']): entry for entry in topology.path_engine.resolve_static_routes()}
+    assert resolved[('R1', '192.168.3.0')]['neighbor'] == 'R2'
+    assert resolved[('R1', '192.168.3.0')]['egress_interface'] == 'Gi0/0'
+    assert resolved[('R2', '192.168.3.0')]['neighbor_interface'] == 'Gi0/0'
+    assert resolved[('R1', '10.99.0.0')]['neighbor'] is None # Nobody owns 10.1.1.3
+
+def test_trace_path_follows_static_routes_hop_by_hop():
+    topology = _topology()
+    result = topology.trace_path('R1', '192.168.3.1')
+    assert result['status'] == 'delivered'
+    assert result['owner'] == {'device': 'R3', 'interface': 'Gi0/1'}
+    assert [(hop['device'], hop['via']) for hop in result['hops']] == [('R1', 'static'), ('R2', 'static'), ('R3', 'connected')]
+
+    assert topology.trace_path('R1', '192.168.3.77')['status'] == 'connected'
+    assert topology.trace_path('R3', '192.168.1.1')['owner']['device'] == 'R1'
+    assert topology.trace_path('R1', '172.16.5.5')['status'] == 'loop'
+    assert topology.trace_path('R1', '10.99.1.1')['status'] == 'unresolved_next_hop'
+    assert topology.trace_path('R2', '8.8.8.8')['status'] == 'no_route'
+
+def test_trace_cache_is_reused_per_prefix_and_reset_on_topology_change():
+    topology = _topology()
+    engine = topology.path_engine
+    topology.trace_path('R1', '192.168.3.10')
+    topology.trace_path('R1', '192.168.3.20')
+    assert (engine.hits, engine.misses) == (1, 1)
+
+    # R4 takes over 192.168.3.20 behind R3; the cached walk must not be reused
+    device_parser = CiscoConfigParser("hostname R4\ninterface Gi0/0\n ip address 192.168.3.20 255.255.255.0\n!\n")
+    device_parser.parse()
+    topology.add_device(device_parser)
+    topology._discover_links()
+    result = topology.trace_path('R1', '192.168.3.20')
+    assert engine.misses == 2
+    assert result['owner']['device'] == 'R4'
@@ -0,0 +1,208 @@
+import shutil
+import subprocess
+import sys
+
+import platforms
+from ingest import FakeDeviceSource
+from topology_builder import NetworkTopologyBuilder
+
+NXOS_CONFIG = """!Command: show running-config
+!Time: Tue Mar  3 10:00:00 2026
+
+version 9.3(8) Bios:version
+switchname N1
+feature ospf
+feature interface-vlan
+
+vlan 1,20-21
+vlan 30
+  name SERVERS
+
+vrf context management
+  ip route 0.0.0.0/0 192.168.0.1
+
+interface Vlan30
+  no shutdown
+  ip address 172.16.30.1/24
+
+interface Ethernet1/1
+  description to R2
+  no switchport
+  ip address 10.1.1.6/30
+  ip router ospf UNDERLAY area 0.0.0.0
+  no shutdown
+
+interface Ethernet1/2
+  no switchport
+  ip address 10.1.2.1 255.255.255.252
+  shutdown
+
+ip route 10.100.0.0/16 10.1.1.5
+ip route 10.101.0.0/16 Ethernet1/1 10.1.1.5 name VIA_R2
+router ospf UNDERLAY
+  router-id 10.0.0.6
+"""
+
+IOSXR_CONFIG = """RP/0/RSP0/CPU0:X1#show running-config
+Building configuration...
+!! IOS XR Configuration 7.3.2
+!! Last configuration change at Tue Mar  3 10:00:00 2026
+!
+hostname X1
+interface Loopback0
+ ipv4 address 10.0.0.9 255.255.255.255
+!
+interface GigabitEthernet0/0/0/0
+ description to R1
+ ipv4 address 10.1.1.1 255.255.255.252
+!
+interface GigabitEthernet0/0/0/1.100
+ ipv4 address 10.1.100.1/24
+ encapsulation dot1q 100
+!
+interface preconfigure GigabitEthernet0/0/0/9
+ ipv4 address 10.9.9.9 255.255.255.0
+!
+router static
+ address-family ipv4 unicast
+  0.0.0.0/0 10.1.1.2
+  10.20.0.0/16 GigabitEthernet0/0/0/0 10.1.1.2
+  10.30.0.0/16 Null0
+ !
+ vrf CUSTOMER
+  address-family ipv4 unicast
+   10.40.0.0/16 10.1.100.2
+  !
+ !
+!
+router ospf 1
+ router-id 10.0.0.9
+ area 0
+  interface Loopback0
+   passive enable
+  !
+  interface GigabitEthernet0/0/0/0
+  !
+ !
+ area 10
+  interface GigabitEthernet0/0/0/1.100
+  !
+ !
+!
+end
+"""
+
+def _parse(config_text):
+    device_parser = platforms.parser_class(platforms.detect_platform(config_text))(config_text)
+    device_parser.parse()
+    return device_parser
+
+def test_detect_platform():
+    assert platforms.detect_platform(NXOS_CONFIG) == 'nxos'
+    assert platforms.detect_platform(IOSXR_CONFIG) == 'iosxr'
+    with open('Conf/R1/config.dump') as f:
+        assert platforms.detect_platform(f) == 'ios'
+    # Lab / IOL routers: IOS with Ethernet0/0-style interface names
+    iol_config = ("!\nversion 15.2\nservice timestamps debug datetime msec\nhostname R1\n!\n"
+                  "interface Ethernet0/0\n ip address 10.1.1.1 255.255.255.252\n!\n"
+                  "interface Ethernet0/1\n ip address 10.1.1.5 255.255.255.252\n!\n")
+    assert platforms.detect_platform(iol_config) == 'ios'
+    # A single stray marker isn't enough to leave the default
+    assert platforms.detect_platform("hostname R1\nfeature ospf\n") == 'ios'
+
+def test_nxos_parser_normalizes_interfaces_routes_and_ospf():
+    device_parser = _parse(NXOS_CONFIG)
+    assert device_parser.platform == 'nxos'
+    assert device_parser.hostname == 'N1'
+    by_name = {intf['name']: intf for intf in device_parser.interfaces}
+    assert by_name['Ethernet1/1']['network'] == '10.1.1.4/30'
+    assert by_name['Ethernet1/1']['subnet_mask'] == '255.255.255.252'
+    assert by_name['Ethernet1/1']['description'] == 'to R2'
+    assert by_name['Ethernet1/2']['shutdown'] is True
+    assert by_name['Vlan30']['vlan'] == '30'
+    # The management VRF's default route is not part of the global table
+    assert device_parser.static_routes == [{'network': '10.100.0.0', 'mask': '255.255.0.0', 'next_hop': '10.1.1.5'},
+                                           {'network': '10.101.0.0', 'mask': '255.255.0.0', 'next_hop': '10.1.1.5'}]
+    assert device_parser.routing_protocols['ospf'] == [
+        {'process_id': 'UNDERLAY', 'networks': [{'network': '10.1.1.6', 'wildcard': '0.0.0.0', 'area': '0.0.0.0'}]}]
+    assert [vlan['vlan_id'] for vlan in device_parser.vlan_info] == ['1', '20', '21', '30']
+    assert device_parser.vlan_info[-1]['name'] == 'SERVERS'
+
+def test_iosxr_parser_normalizes_interfaces_routes_and_ospf():
+    device_parser = _parse(IOSXR_CONFIG)
+    assert device_parser.platform == 'iosxr'
+    assert device_parser.hostname == 'X1'
+    by_name = {intf['name']: intf for intf in device_parser.interfaces}
+    assert set(by_name) == {'Loopback0', 'GigabitEthernet0/0/0/0', 'GigabitEthernet0/0/0/1.100'}
+    assert by_name['GigabitEthernet0/0/0/1.100']['vlan'] == '100'
+    assert by_name['GigabitEthernet0/0/0/1.100']['network'] == '10.1.100.0/24'
+    assert [(route['network'], route['next_hop']) for route in device_parser.static_routes] == [
+        ('0.0.0.0', '10.1.1.2'), ('10.20.0.0', '10.1.1.2')]
+    networks = device_parser.routing_protocols['ospf'][0]['networks']
+    assert [(statement['network'], statement['area']) for statement in networks] == [
+        ('10.0.0.9', '0'), ('10.1.1.1', '0'), ('10.1.100.1', '10')]
+
+def _mixed_conf(tmp_path):
+    conf = tmp_path / 'Conf'
+    shutil.copytree('Conf', conf)
+    # Replace R1's IOS config by an IOS-XR one on the same link, and add an NX-OS device as a single file
+    shutil.rmtree(conf / 'R1')
+    (conf / 'X1').mkdir()
+    (conf / 'X1' / 'running-config').write_text(IOSXR_CONFIG)
+    (conf / 'N1.cfg').write_text(NXOS_CONFIG)
+    return conf
+
+def _platforms(topology):
+    return {hostname: device_parser.platform for hostname, device_parser in topology.devices.items()}
+
+def test_mixed_platform_directory_builds_one_topology(tmp_path):
+    conf = _mixed_conf(tmp_path)
+    topology = NetworkTopologyBuilder(compact_records=True)
+    topology.build_topology_from_configs(str(conf), profile_parser=True)
+    assert sorted(topology.devices) == ['N1', 'R2', 'R3', 'X1']
+    assert topology.graph['X1']['R2']['subnet'] == '10.1.1.0/30'
+    # N1 takes over R3's address range on the R2 link
+    assert topology.graph['R2']['N1']['subnet'] == '10.1.1.4/30'
+    assert topology.stats.counters['platform_ios'] == 2
+    assert topology.stats.counters['platform_nxos'] == 1
+    assert topology.stats.counters['platform_iosxr'] == 1
+    # NX-OS's dotted area 0.0.0.0 and IOS-XR's area blocks both come out as area '0'
+    ospf = topology.analyze_ospf()
+    assert sorted((entry['device'], entry['interface'], entry['area']) for entry in ospf['interfaces']) == [
+        ('N1', 'Ethernet1/1', '0'), ('X1', 'GigabitEthernet0/0/0/0', '0'), ('X1', 'GigabitEthernet0/0/0/1.100', '10'),
+        ('X1', 'Loopback0', '0')]
+    assert ospf['abrs'] == ['X1']
+    assert ospf['area_mismatches'] == []
+
+def test_platform_survives_worker_cache_and_snapshot_records(tmp_path):
+    conf = _mixed_conf(tmp_path)
+    expected = {'N1': 'nxos', 'X1': 'iosxr', 'R2': 'ios', 'R3': 'ios'}
+    parallel = NetworkTopologyBuilder()
+    parallel.build_topology_from_configs(str(conf), workers=2)
+    assert _platforms(parallel) == expected
+    assert parallel.stats.counters['platform_nxos'] == 1 and parallel.stats.counters['platform_iosxr'] == 1
+
+    NetworkTopologyBuilder().build_topology_from_configs(str(conf), use_cache=True)
+    cached = NetworkTopologyBuilder()
+    cached.build_topology_from_configs(str(conf), use_cache=True)
+    assert cached.stats.counters['cache_hits'] == 4
+    assert _platforms(cached) == expected
+    assert cached.stats.counters['platform_ios'] == 2 and cached.stats.counters['platform_iosxr'] == 1
+
+    cached.save_snapshot(str(tmp_path / 'topology.snap'))
+    assert _platforms(NetworkTopologyBuilder.load_snapshot(str(tmp_path / 'topology.snap'))) == expected
+
+def test_streamed_configs_are_detected_too():
+    topology = NetworkTopologyBuilder()
+    with open('Conf/R2/config.dump') as f:
+        configs = {'N1': NXOS_CONFIG, 'X1': IOSXR_CONFIG, 'R2': f.read()}
+    topology.build_topology_from_source(FakeDeviceSource(configs, chunk_size=64), concurrency=2)
+    assert _platforms(topology) == {'N1': 'nxos', 'X1': 'iosxr', 'R2': 'ios'}
+    assert topology.graph.has_edge('X1', 'R2') and topology.graph.has_edge('N1', 'R2')
+
+def test_ios_only_build_does_not_load_other_grammars():
+    code = ("import sys; from topology_builder import NetworkTopologyBuilder; "
+            "NetworkTopologyBuilder().build_topology_from_configs('Conf'); "
+            "print(sorted(name for name in ('nxos_parser', 'iosxr_parser') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,32 @@
+from prefix_index import PrefixTrie, format_prefix, parse_prefix
+
+def _trie(*prefixes):
+    trie = PrefixTrie()
+    for prefix in prefixes:
+        trie.insert(*parse_prefix(prefix), prefix)
+    return trie
+
+def test_longest_match_picks_most_specific_prefix():
+    trie = _trie('0.0.0.0/0', '10.0.0.0/8', '10.1.1.0/24', '10.1.1.4/30')
+    assert trie.longest_match(parse_prefix('10.1.1.6/32')[0])[2] == ['10.1.1.4/30']
+    assert trie.longest_match(parse_prefix('10.1.1.9/32')[0])[2] == ['10.1.1.0/24']
+    assert trie.longest_match(parse_prefix('192.168.0.1/32')[0])[2] == ['0.0.0.0/0']
+    assert trie.longest_match(parse_prefix('10.1.1.6/32')[0], lambda item: item.endswith('/8'))[2] == ['10.0.0.0/8']
+
+def test_covering_contained_and_overlapping():
+    trie = _trie('10.0.0.0/8', '10.1.1.0/29', '10.1.1.4/30', '10.2.0.0/16', '192.168.1.0/24')
+    inside = [format_prefix(network, length) for network, length, _ in trie.contained(*parse_prefix('10.1.0.0/16'))]
+    assert inside == ['10.1.1.0/29', '10.1.1.4/30']
+    covering = [format_prefix(network, length) for network, length, _ in trie.covering(*parse_prefix('10.1.1.4/30'))]
+    assert covering == ['10.0.0.0/8', '10.1.1.0/29', '10.1.1.4/30']
+    overlapping = [format_prefix(network, length) for network, length, _ in trie.overlapping(*parse_prefix('10.1.1.0/29'))]
+    assert overlapping == ['10.0.0.0/8', '10.1.1.0/29', '10.1.1.4/30']
+
+def test_remove_items_and_prune_empty_prefixes():
+    trie = _trie('10.1.1.0/30', '10.1.1.4/30')
+    trie.insert(*parse_prefix('10.1.1.0/30'), 'second')
+    assert trie.remove(*parse_prefix('10.1.1.0/30'), lambda item: item == 'second') == 1
+    assert trie.get(*parse_prefix('10.1.1.0/30')) == ['10.1.1.0/30']
+    assert trie.remove(*parse_prefix('10.1.1.0/30'), lambda item: True) == 1
+    assert len(trie) == 1
+    assert [format_prefix(network, length) for network, length, _ in trie.items()] == ['10.1.1.4/30']
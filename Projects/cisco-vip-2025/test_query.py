@@ -0,0 +1,114 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from config_parser import CiscoConfigParser
+from query import TopologyQuery
+from topology_builder import NetworkTopologyBuilder
+
+CONFIGS = [
+    """hostname R1
+vlan 40
+ name USERS
+interface GigabitEthernet0/0
+ description Core link to R2
+ ip address 10.1.1.1 255.255.255.252
+interface GigabitEthernet0/1.40
+ description Users VLAN
+ encapsulation dot1Q 40
+ ip address 192.168.40.1 255.255.255.0
+interface GigabitEthernet0/2
+ ip address 10.9.9.1 255.255.255.0
+""",
+    """hostname R2
+interface GigabitEthernet0/0
+ description core LINK to R1
+ ip address 10.1.1.2 255.255.255.252
+interface GigabitEthernet0/2
+ ip address 10.9.9.2 255.255.255.0
+interface Vlan40
+ ip address 172.16.40.1 255.255.255.0
+""",
+    """hostname R3
+interface GigabitEthernet0/2
+ ip address 10.9.9.3 255.255.255.0
+interface Loopback0
+ ip address 10.255.0.3 255.255.255.255
+""",
+]
+
+def _topology(multi_access_mode='mesh'):
+    topology = NetworkTopologyBuilder(multi_access_mode=multi_access_mode)
+    for config_text in CONFIGS:
+        device_parser = CiscoConfigParser(config_text)
+        device_parser.parse()
+        topology.add_device(device_parser)
+    topology._discover_links()
+    return topology
+
+@pytest.mark.parametrize('multi_access_mode', ['mesh', 'segment'])
+def test_neighbors_in_both_modes(multi_access_mode):
+    topology = _topology(multi_access_mode)
+    assert topology.query('neighbors', 'R1') == (
+        ('R2', '10.1.1.0/30', 'GigabitEthernet0/0', 'GigabitEthernet0/0'),
+        ('R2', '10.9.9.0/24', 'GigabitEthernet0/2', 'GigabitEthernet0/2'),
+        ('R3', '10.9.9.0/24', 'GigabitEthernet0/2', 'GigabitEthernet0/2'))
+    with pytest.raises(KeyError):
+        topology.query('neighbors', 'R9')
+
+def test_index_lookups():
+    topology = _topology()
+    assert topology.query('subnet', '10.9.9.77/24') == (('R1', 'GigabitEthernet0/2'), ('R2', 'GigabitEthernet0/2'),
+                                                      ('R3', 'GigabitEthernet0/2'))
+    assert topology.query('vlan', '40') == ('R1', 'R2')
+    assert topology.query('vlan-interfaces', 40) == (('R1', 'GigabitEthernet0/1.40'), ('R2', 'Vlan40'))
+    assert topology.query('interface', 'loopback0') == (('R3', 'Loopback0'),)
+    assert topology.query('ip', '10.1.1.2') == ('R2', 'GigabitEthernet0/0')
+    assert topology.query('ip', '10.1.1.3') is None
+    for bad in ('abc', '10.1.1', '10.1.1.256', 2 ** 32):
+        with pytest.raises(ValueError, match=f"Invalid IPv4 address: {bad}$"):
+            topology.query('ip', bad)
+    assert topology.query('description', 'core link') == (('R1', 'GigabitEthernet0/0'), ('R2', 'GigabitEthernet0/0'))
+    assert topology.query('description', 'users core') == ()
+    assert topology.query('stubs') == (('10.255.0.3/32', 'R3', 'Loopback0'), ('172.16.40.0/24', 'R2', 'Vlan40'),
+                                       ('192.168.40.0/24', 'R1', 'GigabitEthernet0/1.40'))
+    with pytest.raises(ValueError):
+        topology.query('vlan')
+    with pytest.raises(ValueError):
+        topology.query('hostname', 'R1')
+
+def test_cache_hits_and_invalidation():
+    topology = _topology()
+    queries = topology.queries
+    first = topology.query('neighbors', 'R3')
+    assert topology.query('neighbors', 'R3') is first
+    assert (queries.hits, queries.misses) == (1, 1)
+
+    # A new device on the shared LAN: results are recomputed after links are rediscovered
+    device_parser = CiscoConfigParser("hostname R4\ninterface Gi0/0\n ip address 10.9.9.4 255.255.255.0\n")
+    device_parser.parse()
+    topology.add_device(device_parser)
+    topology._discover_links({'R4': None})
+    assert [neighbor for neighbor, *_ in topology.query('neighbors', 'R3')] == ['R1', 'R2', 'R4']
+    assert topology.query('ip', '10.9.9.4') == ('R4', 'Gi0/0')
+    assert queries.misses == 3
+
+def test_lru_eviction():
+    queries = TopologyQuery(_topology(), maxsize=2)
+    queries.ip_owner('10.1.1.1')
+    queries.ip_owner('10.1.1.2')
+    queries.ip_owner('10.1.1.1') # Now the most recently used
+    queries.ip_owner('10.9.9.3') # Evicts 10.1.1.2
+    assert list(queries._cache) == [('ip_owner', '10.1.1.1'), ('ip_owner', '10.9.9.3')]
+
+def test_cli_serves_queries_from_stdin():
+    result = subprocess.run([sys.executable, 'main.py', 'Conf', '-q', 'ip', '10.1.1.2', '--shell'],
+                            input="neighbors R2\nbogus\nquit\nneighbors R1\n", capture_output=True, text=True, check=True)
+    # Every line on stdout is a JSON answer (the startup banner goes to stderr)
+    answers = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(answers) == 3
+    assert answers[0]['result'] == ['R2', 'GigabitEthernet0/0']
+    assert [neighbor[0] for neighbor in answers[1]['result']] == ['R1', 'R3']
+    assert answers[2]['error'].startswith('Unknown query: bogus')
@@ -0,0 +1,52 @@
+import networkx as nx
+
+from config_parser import CiscoConfigParser
+from render import LayoutCache, hierarchical_layout
+from topology_builder import NetworkTopologyBuilder
+
+def _ring(count):
+    graph = nx.DiGraph()
+    for i in range(count):
+        graph.add_node(f"R{i}", type='router')
+    for i in range(count):
+        graph.add_edge(f"R{i}", f"R{(i + 1) % count}", label="Gi0/0 -> Gi0/1")
+        graph.add_edge(f"R{(i + 1) % count}", f"R{i}", label="Gi0/1 -> Gi0/0")
+    return graph
+
+def test_headless_render_writes_image_and_reuses_layout(tmp_path):
+    topology = NetworkTopologyBuilder()
+    topology.build_topology_from_configs('Conf')
+    image = tmp_path / 'topology.png'
+    cache_file = tmp_path / 'layout.json'
+    stats = topology.visualize_topology(str(image), headless=True, layout_cache_path=str(cache_file))
+    assert image.stat().st_size > 0
+    assert stats['nodes'] == topology.graph.number_of_nodes()
+    assert stats['layout'] == 'spring'
+    before = dict(topology.layout_cache.positions)
+
+    # A new device (and its stub network): known nodes stay put, only the new ones get placed
+    device_parser = CiscoConfigParser("hostname R4\ninterface Gi0/0\n ip address 192.168.1.2 255.255.255.0\n!\n")
+    device_parser.parse()
+    topology.add_device(device_parser)
+    topology._discover_links()
+    reloaded = NetworkTopologyBuilder()
+    reloaded.graph = topology.graph
+    reloaded.visualize_topology(str(image), headless=True, layout_cache_path=str(cache_file))
+    after = reloaded.layout_cache.positions
+    assert 'R4' in after
+    assert all(after[node] == before[node] for node in before if node in topology.graph)
+
+def test_hierarchical_layout_places_every_node_once():
+    graph = _ring(500)
+    graph.add_node('LONE', type='router')
+    positions = hierarchical_layout(graph)
+    assert set(positions) == set(graph)
+    assert len(set(positions.values())) == len(positions)
+
+    cache = LayoutCache()
+    assert cache.update(graph)['R0'] == positions['R0']
+    graph.add_node('R500', type='router')
+    graph.add_edge('R500', 'R7')
+    updated = cache.update(graph)
+    assert all(updated[node] == positions[node] for node in positions)
+    assert 'R500' in updated
@@ -0,0 +1,82 @@
+import pytest
+
+from config_parser import CiscoConfigParser
+from snapshot import TopologySnapshot, load_topology
+from topology_builder import NetworkTopologyBuilder
+
+def _graph_snapshot(topology):
+    nodes = {node: {k: v for k, v in attr.items() if k != 'parser'} for node, attr in topology.graph.nodes(data=True)}
+    edges = sorted((a, b, sorted(attr.items())) for a, b, attr in topology.graph.edges(data=True))
+    return nodes, edges
+
+def _add_config(topology, config_text):
+    device_parser = CiscoConfigParser(config_text)
+    device_parser.parse()
+    topology.add_device(device_parser)
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_snapshot_round_trip_rebuilds_the_same_topology(tmp_path, compact):
+    topology = NetworkTopologyBuilder(compact_records=compact)
+    topology.build_topology_from_configs('Conf')
+    topology.analyze_ospf()
+    path = tmp_path / 'topology.snap'
+    topology.save_snapshot(path)
+
+    loaded = load_topology(path)
+    assert _graph_snapshot(loaded) == _graph_snapshot(topology)
+    assert list(loaded.devices) == list(topology.devices)
+    for hostname, device_parser in topology.devices.items():
+        assert [dict(intf) for intf in loaded.devices[hostname].interfaces] == [dict(intf) for intf in device_parser.interfaces]
+        assert [dict(route) for route in loaded.devices[hostname].static_routes] == [dict(route) for route in device_parser.static_routes]
+        assert loaded.devices[hostname].routing_protocols == device_parser.routing_protocols
+    # Indexes are rebuilt too
+    assert loaded.find_ip_owner('10.1.1.2') == topology.find_ip_owner('10.1.1.2')
+    assert loaded.subnet_map.keys() == topology.subnet_map.keys()
+
+def test_snapshot_round_trip_keeps_segment_member_counts(tmp_path):
+    # S1 has two interfaces on the segment: four members, but only three devices hanging off the hub
+    topology = NetworkTopologyBuilder(multi_access_mode='segment')
+    _add_config(topology, "hostname S1\ninterface Vlan10\n ip address 10.5.0.1 255.255.255.0\n!\n"
+                          "interface Gi0/1\n ip address 10.5.0.11 255.255.255.0\n!\n")
+    for i in range(2, 4):
+        _add_config(topology, f"hostname S{i}\ninterface Vlan10\n ip address 10.5.0.{i} 255.255.255.0\n!\n")
+    topology._discover_links()
+    assert topology.graph.nodes['SEGMENT_10.5.0.0_24']['members'] == 4
+    path = tmp_path / 'topology.snap'
+    topology.save_snapshot(path)
+    assert _graph_snapshot(load_topology(path)) == _graph_snapshot(topology)
+
+def test_snapshot_reader_queries_without_loading(tmp_path):
+    topology = NetworkTopologyBuilder(multi_access_mode='segment')
+    for i in range(1, 4):
+        _add_config(topology, f"hostname S{i}\ninterface Vlan10\n description users\n ip address 10.5.0.{i} 255.255.255.0\n!\n")
+    _add_config(topology, "hostname S4\ninterface Gi0/0\n ip address 10.5.0.4 255.255.255.248\n shutdown\n!\n"
+                          "ip route 0.0.0.0 0.0.0.0 10.5.0.1\n")
+    topology._discover_links()
+    path = tmp_path / 'topology.snap'
+    topology.save_snapshot(path)
+
+    with TopologySnapshot(path) as snapshot:
+        assert snapshot.node_count == topology.graph.number_of_nodes()
+        assert snapshot.edge_count == topology.graph.number_of_edges()
+        assert snapshot.devices() == ['S1', 'S2', 'S3', 'S4']
+        assert snapshot.node_type('SEGMENT_10.5.0.0_24') == 'segment'
+        assert snapshot.node_id('nope') is None
+        neighbors = dict(snapshot.neighbors('S1'))
+        assert neighbors['SEGMENT_10.5.0.0_24'] == {'subnet': '10.5.0.0/24', 'interface_a': 'Vlan10'}
+        # S4's /29 holds the other members' addresses (a peer of the /24), so it joins the same segment
+        assert [name for name, _ in snapshot.neighbors('SEGMENT_10.5.0.0_24')] == ['S1', 'S2', 'S3', 'S4']
+        interfaces = snapshot.interfaces('S1')
+        assert interfaces[0]['description'] == 'users' and interfaces[0]['network'] == '10.5.0.0/24'
+        assert snapshot.interfaces('S4')[0]['shutdown'] is True
+        assert snapshot.static_routes('S4') == [{'network': '0.0.0.0', 'mask': '0.0.0.0', 'next_hop': '10.5.0.1'}]
+        assert snapshot.subnet_members('10.5.0.0/24') == [('S1', 'Vlan10'), ('S2', 'Vlan10'), ('S3', 'Vlan10')]
+        assert snapshot.subnets() == ['10.5.0.0/24', '10.5.0.0/29']
+        with pytest.raises(KeyError):
+            snapshot.interfaces('nope')
+
+def test_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_a_snapshot'
+    path.write_bytes(b'hostname R1\n' * 10)
+    with pytest.raises(ValueError):
+        TopologySnapshot(path)
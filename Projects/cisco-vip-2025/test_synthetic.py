@@ -0,0 +1,69 @@
+import pytest
+
+from benchmarks.regression_bench import compare, measure
+from synthetic import SyntheticNetwork, write_conf_tree
+from topology_builder import NetworkTopologyBuilder
+
+def test_generator_is_deterministic():
+    first = dict(SyntheticNetwork(50, subinterfaces=2, seed=7).configs())
+    assert first == dict(SyntheticNetwork(50, subinterfaces=2, seed=7).configs())
+    assert first != dict(SyntheticNetwork(50, subinterfaces=2, seed=8).configs())
+    with pytest.raises(ValueError):
+        SyntheticNetwork(10, lans=16, svis=1)
+
+def test_generated_tree_builds_the_planned_topology(tmp_path):
+    network = SyntheticNetwork(30, lans=2, svis=2, subinterfaces=2, segment_size=4, static_routes=3, ospf_areas=3, seed=1)
+    summary = network.write(str(tmp_path / 'Conf'))
+    assert summary['routers'] == 30 and summary['segments'] == 7
+
+    topology = NetworkTopologyBuilder(multi_access_mode='segment')
+    topology.build_topology_from_configs(str(tmp_path / 'Conf'))
+    assert len(topology.devices) == 30
+    assert topology.stats.counters['lines_parsed'] == summary['config_lines']
+    # Every planned point-to-point link is discovered, and every segment gets its hub node
+    for a, b in network.links:
+        assert topology.graph.has_edge(f"R{a}", f"R{b}")
+    segments = [node for node, data in topology.graph.nodes(data=True) if data.get('type') == 'segment']
+    assert len(segments) == 7
+
+    device = topology.devices['R5']
+    by_name = {intf['name']: intf for intf in device.interfaces}
+    assert by_name['Vlan11']['network'] == '10.0.16.192/26'
+    subinterfaces = [intf for intf in device.interfaces if intf['name'].startswith('GigabitEthernet0/2.')]
+    assert subinterfaces and all(intf['vlan'] for intf in subinterfaces)
+    assert [vlan['vlan_id'] for vlan in device.vlan_info] == ['10', '11']
+    assert len(device.static_routes) == 3 and device.static_routes[0]['network'] == '0.0.0.0'
+    # LANs of every third router sit in area 0, the others make their router an ABR
+    ospf = topology.analyze_ospf()
+    assert ospf['area_mismatches'] == []
+    assert sorted(ospf['abrs']) == sorted(f"R{router}" for router in range(1, 31) if router % 3)
+
+def test_write_conf_tree_single_router(tmp_path):
+    summary = write_conf_tree(str(tmp_path), 1, subinterfaces=3)
+    assert summary['links'] == 0 and summary['adjacent_pairs'] == 0
+    assert (tmp_path / 'R1' / 'config.dump').read_text().startswith("!\nversion 15.1\n")
+
+def test_measure_and_compare_against_baseline():
+    row = measure(10, repeat=1)
+    assert row['routers'] == 10 and row['graph_nodes'] > 10 and row['router_links'] >= 9
+    assert compare({10: row}, {10: dict(row)}) == []
+
+    slower = dict(row, build_s=1.0, discover_links_s=0.5, peak_memory_mb=row['peak_memory_mb'] * 2)
+    baseline = dict(row, build_s=0.5, discover_links_s=0.4)
+    regressions = {regression['metric'] for regression in compare({10: slower}, {10: baseline})}
+    assert regressions == {'build_s', 'peak_memory_mb'}
+    # A looser tolerance lets the same numbers pass, but a graph size change always counts
+    assert {regression['metric'] for regression in compare({10: slower}, {10: baseline}, tolerance_scale=10)} == set()
+    changed = dict(row, graph_edges=row['graph_edges'] + 2)
+    assert [regression['metric'] for regression in compare({10: changed}, {10: row})] == ['graph_edges']
+    # Sizes missing from the baseline are not compared
+    assert compare({1000: slower}, {10: row}) == []
+
+def test_measure_fails_when_links_are_missing(monkeypatch):
+    real_write = SyntheticNetwork.write
+    def write_with_extra_pair(network, root):
+        summary = real_write(network, root)
+        return dict(summary, adjacent_pairs=summary['adjacent_pairs'] + 1)
+    monkeypatch.setattr(SyntheticNetwork, 'write', write_with_extra_pair)
+    with pytest.raises(RuntimeError, match='router links'):
+        measure(10, repeat=1)
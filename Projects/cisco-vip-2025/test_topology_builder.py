@@ -0,0 +1,239 @@
+import json
+import os
+
+import parse_cache
+import topology_builder
+from config_parser import CiscoConfigParser
+from topology_builder import NetworkTopologyBuilder
+
+def _graph_snapshot(topology):
+    nodes = {node: {k: v for k, v in attr.items() if k != 'parser'} for node, attr in topology.graph.nodes(data=True)}
+    edges = sorted((a, b, sorted(attr.items())) for a, b, attr in topology.graph.edges(data=True))
+    return nodes, edges
+
+def test_build_topology_from_sample_configs():
+    topology = NetworkTopologyBuilder()
+    topology.build_topology_from_configs('Conf')
+    assert sorted(topology.devices) == ['R1', 'R2', 'R3']
+    assert topology.graph['R1']['R2']['subnet'] == '10.1.1.0/30'
+    assert topology.graph['R3']['R2']['subnet'] == '10.1.1.4/30'
+
+def test_parallel_build_matches_serial_build():
+    serial = NetworkTopologyBuilder()
+    serial.build_topology_from_configs('Conf')
+    parallel = NetworkTopologyBuilder()
+    parallel.build_topology_from_configs('Conf', workers=2, chunksize=1)
+
+    assert list(parallel.devices) == list(serial.devices)
+    for hostname, device_parser in serial.devices.items():
+        assert parallel.devices[hostname].interfaces == device_parser.interfaces
+        assert parallel.devices[hostname].static_routes == device_parser.static_routes
+    assert _graph_snapshot(parallel) == _graph_snapshot(serial)
+
+def test_compact_records_build_the_same_graph():
+    regular = NetworkTopologyBuilder()
+    regular.build_topology_from_configs('Conf')
+    compact = NetworkTopologyBuilder(compact_records=True)
+    compact.build_topology_from_configs('Conf')
+    assert _graph_snapshot(compact) == _graph_snapshot(regular)
+    compact.print_topology_summary()
+
+def _add_config(topology, config_text):
+    device_parser = CiscoConfigParser(config_text)
+    device_parser.parse()
+    topology.add_device(device_parser)
+
+def test_mismatched_masks_still_link_and_ips_can_be_looked_up():
+    topology = NetworkTopologyBuilder()
+    _add_config(topology, "hostname A\ninterface Gi0/0\n ip address 10.1.1.5 255.255.255.252\n!\nip route 10.9.0.0 255.255.0.0 10.1.1.6\n")
+    _add_config(topology, "hostname B\ninterface Gi0/0\n ip address 10.1.1.6 255.255.255.248\n!\ninterface Gi0/1\n ip address 10.9.1.1 255.255.255.0\n!\n")
+    topology._discover_links()
+
+    assert topology.graph['A']['B']['subnet'] == '10.1.1.0/29'
+    assert topology.graph['A']['B']['mask_mismatch'] is True
+    assert topology.find_ip_owner('10.1.1.6')[0] == 'B'
+    assert topology.find_ip_owner('10.1.1.7') is None
+    assert topology.longest_match('10.9.1.200')[0] == '10.9.1.0/24'
+    assert topology.longest_match('10.9.7.1', kind='route')[1][0][0] == 'A'
+
+def test_wide_interface_does_not_swallow_the_links_it_covers():
+    topology = NetworkTopologyBuilder()
+    _add_config(topology, "hostname R1\ninterface Gi0/0\n ip address 10.1.1.1 255.255.255.252\n!\n")
+    _add_config(topology, "hostname R2\ninterface Gi0/0\n ip address 10.1.1.2 255.255.255.252\n!\n")
+    _add_config(topology, "hostname R3\ninterface Gi0/0\n ip address 10.1.1.5 255.255.255.252\n!\n")
+    _add_config(topology, "hostname R4\ninterface Gi0/0\n ip address 10.1.1.6 255.255.255.252\n!\n")
+    _add_config(topology, "hostname R5\ninterface Gi0/0\n ip address 10.1.200.1 255.255.0.0\n!\n")
+    topology._discover_links()
+
+    assert sorted(topology.subnet_map) == ['10.1.0.0/16', '10.1.1.0/30', '10.1.1.4/30']
+    router_edges = {frozenset((a, b)) for a, b in topology.graph.edges() if a in topology.devices and b in topology.devices}
+    assert router_edges == {frozenset(('R1', 'R2')), frozenset(('R3', 'R4'))}
+    assert topology.graph['R1']['R2']['subnet'] == '10.1.1.0/30'
+    assert topology.graph['R3']['R4']['subnet'] == '10.1.1.4/30'
+    assert topology.graph.has_edge('R5', 'STUB_10.1.0.0_16')
+
+    # Incrementally, a /16 address inside one of the /30s makes R5 a peer of that link only
+    expected = _add_config_incrementally(topology, "hostname R5\ninterface Gi0/0\n ip address 10.1.1.3 255.255.0.0\n!\n")
+    assert sorted(topology.subnet_map) == ['10.1.0.0/16', '10.1.1.4/30']
+    assert sorted(member for member, _ in topology.subnet_map['10.1.0.0/16']) == ['R1', 'R2', 'R5']
+    assert topology.graph['R3']['R4']['subnet'] == '10.1.1.4/30'
+    assert _graph_snapshot(topology) == _graph_snapshot(expected)
+
+def _add_config_incrementally(topology, config_text):
+    """Replaces/adds one device and re-links incrementally; returns a from-scratch build of the same devices."""
+    device_parser = CiscoConfigParser(config_text)
+    device_parser.parse()
+    previous = topology.devices.get(device_parser.hostname)
+    topology.add_device(device_parser)
+    topology._discover_links({device_parser.hostname: previous})
+    expected = NetworkTopologyBuilder()
+    for existing in topology.devices.values():
+        expected.add_device(existing)
+    expected._discover_links()
+    return expected
+
+def test_segment_mode_uses_one_hub_node_per_multi_access_subnet():
+    topology = NetworkTopologyBuilder(multi_access_mode='segment')
+    for i in range(1, 6):
+        _add_config(topology, f"hostname SW{i}\ninterface Vlan40\n ip address 192.168.40.{i} 255.255.255.0\n!\n")
+    _add_config(topology, "hostname SW6\ninterface Gi0/0\n ip address 10.0.0.1 255.255.255.252\n!\n")
+    _add_config(topology, "hostname SW7\ninterface Gi0/0\n ip address 10.0.0.2 255.255.255.252\n!\n")
+    topology._discover_links()
+
+    segment = 'SEGMENT_192.168.40.0_24'
+    assert topology.graph.nodes[segment]['type'] == 'segment'
+    assert topology.graph.nodes[segment]['members'] == 5
+    assert topology.graph.number_of_edges() == 2 * 5 + 2 # Hub edges plus the point-to-point pair
+    assert topology.graph['SW3'][segment]['interface_a'] == 'Vlan40'
+    assert topology.graph['SW6']['SW7']['subnet'] == '10.0.0.0/30'
+
+    topology.set_multi_access_mode('mesh')
+    assert segment not in topology.graph
+    assert topology.graph.number_of_edges() == 5 * 4 + 2
+
+def _copy_sample_confs(tmp_path):
+    conf_dir = tmp_path / 'Conf'
+    for device in ('R1', 'R2', 'R3'):
+        (conf_dir / device).mkdir(parents=True)
+        (conf_dir / device / 'config.dump').write_text(open(f'Conf/{device}/config.dump').read())
+    return conf_dir
+
+def test_cached_build_matches_full_build_after_changes(tmp_path):
+    conf_dir = _copy_sample_confs(tmp_path)
+    cached = NetworkTopologyBuilder()
+    cached.build_topology_from_configs(str(conf_dir), use_cache=True)
+    assert (tmp_path / '.Conf_parse_cache.json').exists()
+
+    # Move R3 onto its own subnet (R2's Gi0/1 becomes a stub) and add a new R4 on R1's other port
+    r3_config = (conf_dir / 'R3' / 'config.dump').read_text()
+    (conf_dir / 'R3' / 'config.dump').write_text(r3_config.replace('10.1.1.6 255.255.255.252', '10.9.9.1 255.255.255.0'))
+    (conf_dir / 'R4').mkdir()
+    (conf_dir / 'R4' / 'config.dump').write_text("hostname R4\ninterface Gi0/0\n ip address 10.1.1.9 255.255.255.252\n!\n")
+    cached.build_topology_from_configs(str(conf_dir), use_cache=True)
+
+    full = NetworkTopologyBuilder()
+    full.build_topology_from_configs(str(conf_dir))
+    assert sorted(cached.devices) == sorted(full.devices) == ['R1', 'R2', 'R3', 'R4']
+    assert _graph_snapshot(cached) == _graph_snapshot(full)
+
+    # R4 moves into the R1/R2 /30 with a /28 mask: a peer, so the three share one 10.1.1.0/28 segment
+    (conf_dir / 'R4' / 'config.dump').write_text("hostname R4\ninterface Gi0/0\n ip address 10.1.1.3 255.255.255.240\n!\n")
+    cached.build_topology_from_configs(str(conf_dir), use_cache=True)
+    full = NetworkTopologyBuilder()
+    full.build_topology_from_configs(str(conf_dir))
+    assert cached.graph['R4']['R1']['subnet'] == '10.1.1.0/28'
+    assert _graph_snapshot(cached) == _graph_snapshot(full)
+
+    # Removing a device takes its links with it
+    (conf_dir / 'R1' / 'config.dump').unlink()
+    cached.build_topology_from_configs(str(conf_dir), use_cache=True)
+    full = NetworkTopologyBuilder()
+    full.build_topology_from_configs(str(conf_dir))
+    assert _graph_snapshot(cached) == _graph_snapshot(full)
+
+def test_incremental_update_picks_the_same_link_for_devices_sharing_two_subnets():
+    # A and B end up sharing two /30s; their one edge pair goes to the lower subnet either way
+    topology = NetworkTopologyBuilder()
+    for config_text in ("hostname A\ninterface Gi0/0\n ip address 10.2.0.1 255.255.255.252\n!\n"
+                        "interface Gi0/1\n ip address 10.1.0.1 255.255.255.252\n!\n",
+                        "hostname B\ninterface Gi0/0\n ip address 10.2.0.2 255.255.255.252\n!\n"):
+        device_parser = CiscoConfigParser(config_text)
+        device_parser.parse()
+        topology.add_device(device_parser)
+    topology._discover_links()
+    assert topology.graph['A']['B']['subnet'] == '10.2.0.0/30'
+
+    expected = _add_config_incrementally(topology, "hostname B\ninterface Gi0/0\n ip address 10.2.0.2 255.255.255.252\n!\n"
+                                                   "interface Gi0/1\n ip address 10.1.0.2 255.255.255.252\n!\n")
+    assert topology.graph['A']['B']['subnet'] == expected.graph['A']['B']['subnet'] == '10.1.0.0/30'
+    assert topology.graph['B']['A']['interface_a'] == 'Gi0/1'
+    assert _graph_snapshot(topology) == _graph_snapshot(expected)
+
+    # And back: the edge falls back to the subnet the two still share
+    expected = _add_config_incrementally(topology, "hostname B\ninterface Gi0/0\n ip address 10.2.0.2 255.255.255.252\n!\n")
+    assert topology.graph['A']['B']['subnet'] == '10.2.0.0/30'
+    assert _graph_snapshot(topology) == _graph_snapshot(expected)
+
+def test_segment_hub_edge_uses_the_same_interface_on_both_paths():
+    # A has two interfaces on the /29 segment (one with a narrower, peer /30 mask)
+    topology = NetworkTopologyBuilder(multi_access_mode='segment')
+    for config_text in ("hostname A\ninterface Gi0/0\n ip address 10.0.0.6 255.255.255.252\n!\n"
+                        "interface Gi0/1\n ip address 10.0.0.5 255.255.255.248\n!\n",
+                        "hostname C\ninterface Gi0/0\n ip address 10.0.0.4 255.255.255.248\n!\n"):
+        device_parser = CiscoConfigParser(config_text)
+        device_parser.parse()
+        topology.add_device(device_parser)
+    topology._discover_links()
+    device_parser = CiscoConfigParser("hostname D\ninterface Gi0/0\n ip address 10.0.0.3 255.255.255.248\n!\n")
+    device_parser.parse()
+    topology.add_device(device_parser)
+    topology._discover_links({'D': None})
+
+    expected = NetworkTopologyBuilder(multi_access_mode='segment')
+    for existing in topology.devices.values():
+        expected.add_device(existing)
+    expected._discover_links()
+    assert topology.graph['A']['SEGMENT_10.0.0.0_29']['interface_a'] == 'Gi0/0'
+    assert _graph_snapshot(topology) == _graph_snapshot(expected)
+
+def test_parse_cache_skips_unchanged_and_discards_corrupt_entries(tmp_path, monkeypatch):
+    conf_dir = _copy_sample_confs(tmp_path)
+    NetworkTopologyBuilder().build_topology_from_configs(str(conf_dir), use_cache=True)
+
+    parsed = []
+    real_parse = topology_builder.parse_config_record
+    def counting_parse(config_path):
+        parsed.append(config_path)
+        return real_parse(config_path)
+    monkeypatch.setattr(topology_builder, 'parse_config_record', counting_parse)
+
+    warm = NetworkTopologyBuilder()
+    warm.build_topology_from_configs(str(conf_dir), use_cache=True)
+    assert parsed == []
+    assert warm.graph['R1']['R2']['subnet'] == '10.1.1.0/30'
+
+    cache_file = tmp_path / '.Conf_parse_cache.json'
+    data = json.loads(cache_file.read_text())
+    data['entries'][os.path.join('R2', 'config.dump')]['record'][1] = [['broken']]
+    cache_file.write_text(json.dumps(data))
+    repaired = NetworkTopologyBuilder()
+    repaired.build_topology_from_configs(str(conf_dir), use_cache=True)
+    assert [path.endswith(os.path.join('R2', 'config.dump')) for path in parsed] == [True]
+    assert repaired.graph['R3']['R2']['subnet'] == '10.1.1.4/30'
+
+    cache_file.write_text('{not json')
+    rebuilt = NetworkTopologyBuilder()
+    rebuilt.build_topology_from_configs(str(conf_dir), use_cache=True)
+    assert len(rebuilt.devices) == 3
+
+def test_unwritable_parse_cache_does_not_fail_the_build(tmp_path, monkeypatch, caplog):
+    conf_dir = _copy_sample_confs(tmp_path)
+    def dump_until_disk_full(data, f):
+        f.write('{"version": ')
+        raise OSError(28, 'No space left on device')
+    monkeypatch.setattr(parse_cache.json, 'dump', dump_until_disk_full)
+    topology = NetworkTopologyBuilder()
+    topology.build_topology_from_configs(str(conf_dir), use_cache=True)
+    assert topology.graph['R1']['R2']['subnet'] == '10.1.1.0/30'
+    assert "Couldn't write the parse cache" in caplog.text
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['Conf']
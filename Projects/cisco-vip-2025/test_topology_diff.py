@@ -0,0 +1,82 @@
+import json
+import shutil
+import subprocess
+import sys
+
+from topology_builder import NetworkTopologyBuilder
+from topology_diff import diff_config_directories, diff_topologies
+
+def _copy_conf(tmp_path, name):
+    directory = tmp_path / name
+    shutil.copytree('Conf', directory)
+    return directory
+
+def _build(directory):
+    topology = NetworkTopologyBuilder()
+    topology.build_topology_from_configs(str(directory), use_cache=True)
+    return topology
+
+def test_identical_directories_have_an_empty_diff(tmp_path):
+    old = _build(_copy_conf(tmp_path, 'old'))
+    new = _build(_copy_conf(tmp_path, 'new'))
+    diff = diff_topologies(old, new)
+    assert diff['devices'] == {'added': [], 'removed': [], 'changed': []}
+    assert diff['links'] == {'added': [], 'removed': [], 'changed': []}
+    # Same file hashes: nothing even gets fingerprinted
+    assert diff['stats']['devices_fingerprinted'] == 0
+    assert diff['stats']['subnets_compared'] == 0
+
+def test_diff_reports_device_interface_route_and_link_changes(tmp_path):
+    old_dir = _copy_conf(tmp_path, 'old')
+    new_dir = _copy_conf(tmp_path, 'new')
+    # R3 loses its link to R2 (new address on another subnet) and gains a static route and OSPF
+    r3 = new_dir / 'R3' / 'config.dump'
+    r3.write_text(r3.read_text().replace('10.1.1.6', '10.9.9.1')
+                  + "\nip route 10.50.0.0 255.255.0.0 10.9.9.2\nrouter ospf 1\n network 10.9.9.0 0.0.0.255 area 0\n!\n")
+    # R1's config only changes cosmetically: same parse result, so it is not reported
+    r1 = new_dir / 'R1' / 'config.dump'
+    r1.write_text("! backed up again\n" + r1.read_text())
+    # R4 is new
+    (new_dir / 'R4').mkdir()
+    (new_dir / 'R4' / 'config.dump').write_text("hostname R4\ninterface Gi0/0\n ip address 10.9.9.2 255.255.255.0\n!\n")
+
+    diff = diff_config_directories(str(old_dir), str(new_dir))
+    assert diff['devices'] == {'added': ['R4'], 'removed': [], 'changed': ['R3']}
+    assert diff['stats']['devices_fingerprinted'] == 2 # R1 and R3 have new file hashes
+    changes = next(iter(diff['interfaces']['R3']['changed'].values()))
+    assert changes['ip_address'] == ['10.1.1.6', '10.9.9.1']
+    assert diff['static_routes']['R3'] == {'added': [{'network': '10.50.0.0', 'mask': '255.255.0.0', 'next_hop': '10.9.9.2'}], 'removed': []}
+    assert diff['ospf']['R3']['added'] == [{'process_id': '1', 'network': '10.9.9.0', 'wildcard': '0.0.0.255', 'area': '0'}]
+    assert '10.9.9.0/24' in diff['subnets']['added']
+    removed = {(link['source'], link['target']) for link in diff['links']['removed']}
+    added = {(link['source'], link['target']) for link in diff['links']['added']}
+    assert {('R2', 'R3'), ('R3', 'R2')} <= removed
+    assert {('R3', 'R4'), ('R4', 'R3')} <= added
+    # R1-R2 sits on an untouched subnet and is never looked at
+    assert all('R1' not in (link['source'], link['target']) for link in diff['links']['removed'] + diff['links']['added'])
+    json.dumps(diff)
+
+def test_diff_from_on_in_memory_builders():
+    old = NetworkTopologyBuilder()
+    old.build_topology_from_configs('Conf')
+    new = NetworkTopologyBuilder()
+    new.build_topology_from_configs('Conf')
+    del new.devices['R1']
+    new.graph.remove_node('R1')
+    new._discover_links({'R1': old.devices['R1']})
+    diff = new.diff_from(old)
+    assert diff['devices']['removed'] == ['R1']
+    assert diff['interfaces']['R1']['removed'] == ['GigabitEthernet0/0', 'GigabitEthernet0/1']
+    # R2's side of the old R1 link becomes a stub network
+    assert diff['stub_networks']['added'] == ['STUB_10.1.1.0_30']
+    assert diff['subnets']['changed']['10.1.1.0/30']['members'][1] == ['R2:GigabitEthernet0/0']
+
+def test_cli_diff_leaves_the_directories_alone(tmp_path):
+    old_dir = _copy_conf(tmp_path, 'old')
+    new_dir = _copy_conf(tmp_path, 'new')
+    (new_dir / 'R3' / 'config.dump').write_text("hostname R3\n")
+    result = subprocess.run([sys.executable, 'main.py', str(new_dir), '--diff', str(old_dir)], capture_output=True, text=True, check=True)
+    # stdout is the diff and nothing else, so it can be redirected to a .json file
+    assert json.loads(result.stdout)['devices']['changed'] == ['R3']
+    # No parse cache next to the (possibly archived, read-only) directories without --cache
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['new', 'old']
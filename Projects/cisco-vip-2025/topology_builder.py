@@ -1,220 +1,710 @@
 import networkx as nx
 import matplotlib.pyplot as plt
-from config_parser import load_config_from_file
+from config_parser import find_config_file, load_config_from_file, parse_config_record, parser_from_record
+from ingest import ingest
+from instrumentation import BuildStats
+from parse_cache import ParseCache
+from prefix_index import PrefixTrie, format_prefix, interface_address, interface_prefix, parse_prefix, route_prefix
+from path_engine import PathEngine
+from query import TopologyQuery
+from render import LayoutCache, render_topology
+from records import int_to_quad, quad_to_int
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import asyncio
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+def _link_key(subnet, interface_a, interface_b):
+    """Sort key deciding which of several links between the same two devices gets their edge."""
+    return parse_prefix(subnet), interface_a, interface_b
+
 class NetworkTopologyBuilder:
     """
     Builds a hierarchical network topology graph from parsed router configurations.
     Uses subnet matching to automatically discover links between devices.
     """
 
-    def __init__(self):
+    def __init__(self, compact_records=False, multi_access_mode='mesh'):
+        # compact_records: store parsed interfaces/static routes as slotted InterfaceRecord /
+        # StaticRouteRecord objects (see records.py) instead of dicts. Cuts memory a lot on big
+        # estates; dict-style access (intf['name'], intf.get('network')) keeps working.
+        self.compact_records = compact_records
+        # multi_access_mode: how subnets with 3+ devices are drawn.
+        #   'mesh'    - an edge pair between every two members (k*(k-1) directed edges)
+        #   'segment' - one hub node per subnet, each member attached to it (2*k directed edges)
+        if multi_access_mode not in ('mesh', 'segment'):
+            raise ValueError(f"Unknown multi_access_mode: {multi_access_mode}")
+        self.multi_access_mode = multi_access_mode
         # Directed graph: Useful for representing traffic flow (e.g., access -> distribution -> core)
         # Can be converted to undirected for certain analyses.
         self.graph = nx.DiGraph()
         self.devices = {} # Key: hostname, Value: CiscoConfigParser object
+        self.subnet_map = {} # Key: subnet string, Value: list of (hostname, interface dict) tuples
+        # Every interface network and static route, for longest-prefix match and overlap queries.
+        # Items are ('interface', hostname, intf) or ('route', hostname, route).
+        self.prefix_index = PrefixTrie()
+        # How many interface items each indexed prefix holds, so segment lookups don't have to scan
+        # past the route items (e.g. a default route on every device) sharing the same prefix
+        self._interface_prefixes = {}
+        # Interface prefix -> the root prefix of the segment it's grouped into (the subnet_map key)
+        self._segment_of = {}
+        self._device_sources = {} # Key: config path, Value: (hostname, content hash) it was built from
+        # Bumped on every change to devices or links, so caches built on top of the topology know to reset
+        self.topology_version = 0
+        # Static-route resolution and hop-by-hop path tracing (see path_engine.py)
+        self.path_engine = PathEngine(self)
+        # Indexed, LRU-cached lookups: neighbors, subnet/IP owners, VLANs, interface names (see query.py)
+        self.queries = TopologyQuery(self)
+        # Node positions reused by headless renders (see render.py)
+        self.layout_cache = LayoutCache()
+        # Counters and stage timings; build_topology_from_configs starts a fresh one per build
+        self.stats = BuildStats()
 
     def add_device_from_file(self, file_path):
         """Loads and parses a device config from a file and adds it to the graph."""
-        device_parser = load_config_from_file(file_path)
+        device_parser = load_config_from_file(file_path, compact=self.compact_records, stats=self.stats)
         if device_parser is None:
             return False
+        self.add_device(device_parser)
+        return True
 
+    def add_device(self, device_parser):
+        """Adds an already-parsed device to the device map and the graph."""
         self.devices[device_parser.hostname] = device_parser
+        self.topology_version += 1
         # Add the device itself as a node in the graph, with its parser object as an attribute
         self.graph.add_node(device_parser.hostname, type='router', parser=device_parser)
-        print(f"Added device: {device_parser.hostname}")
-        return True
-
-    def build_topology_from_configs(self, conf_directory):
-        """Reads all config files from a directory and builds the topology."""
-        print(f"Loading configurations from {conf_directory}...")
-        print(f"DEBUG: Items in Conf directory: {os.listdir(conf_directory)}")  # DEBUG LINE
-        for device_dir in os.listdir(conf_directory):
-            print(f"DEBUG: Processing item: {device_dir}")  # DEBUG LINE
-            config_path = os.path.join(conf_directory, device_dir, 'config.dump')
-            print(f"DEBUG: Config path: {config_path}")  # DEBUG LINE
-            if os.path.isfile(config_path):
-                self.add_device_from_file(config_path)
+        self.stats.count('devices_added')
+        self.stats.count('interfaces', len(device_parser.interfaces))
+        logger.debug("Added device: %s", device_parser.hostname)
+
+    def build_topology_from_configs(self, conf_directory, workers=1, chunksize=None, use_cache=False, profile_parser=False):
+        """
+        Reads all config files from a directory and builds the topology.
+
+        workers: number of parser processes. 1 (the default) parses serially in this process,
+                 None uses one process per CPU.
+        chunksize: config files handed to a worker at a time; defaults to an even split
+                   of roughly four chunks per worker.
+        use_cache: keep parse results in an on-disk cache next to the directory (see ParseCache)
+                   and rebuild incrementally: unchanged configs aren't re-parsed, and calling this
+                   again on the same builder only re-links the subnets of devices that changed.
+        profile_parser: also time each CiscoConfigParser._parse_* method (adds a timer call per line).
+
+        Counters and per-stage timings of the build end up in self.stats; self.stats.to_json()
+        (or write_json(path)) gives the machine-readable report.
+        """
+        self.stats = BuildStats(profile_parser=profile_parser)
+        with self.stats.stage('build_total'):
+            self._build(conf_directory, workers, chunksize, use_cache)
+        self.stats.count('graph_nodes', self.graph.number_of_nodes())
+        self.stats.count('graph_edges', self.graph.number_of_edges())
+        logger.info("Topology build complete: %d devices, %d nodes, %d edges in %.3fs", len(self.devices),
+                    self.graph.number_of_nodes(), self.graph.number_of_edges(), self.stats.stages['build_total'][0])
+
+    def _build(self, conf_directory, workers, chunksize, use_cache):
+        logger.info("Loading configurations from %s...", conf_directory)
+        with self.stats.stage('find_configs'):
+            config_paths = self._find_config_paths(conf_directory)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if use_cache:
+            self._build_incremental(conf_directory, config_paths, workers, chunksize)
+            return
+
+        with self.stats.stage('parse'):
+            if workers > 1 and len(config_paths) > 1:
+                for record in self._parse_config_records(config_paths, workers, chunksize):
+                    if record is not None:
+                        self.add_device(parser_from_record(record, compact=self.compact_records))
             else:
-                print(f"Skipping {device_dir}, config.dump not found.")
+                for config_path in config_paths:
+                    self.add_device_from_file(config_path)
 
-        print("\nDiscovering links based on shared subnets...")
+        logger.info("Discovering links based on shared subnets...")
         self._discover_links()
-        print("Topology build complete.")
 
-    def _discover_links(self):
-        """The core logic: finds interfaces on the same subnet and creates graph edges."""
-        # A dictionary to map a subnet (network string) to a list of (device, interface) tuples
-        subnet_map = {}
+    def build_topology_from_source(self, source, concurrency=8, max_pending=None):
+        """
+        Builds the topology from a ConfigSource (see ingest.py) with the asyncio pipeline: configs
+        are parsed chunk by chunk while they download, and each device is added and linked as
+        soon as it's done. concurrency bounds the fetches in flight; max_pending bounds parsed
+        devices waiting to be added. From inside a running event loop, await ingest.ingest() instead.
+        """
+        self.stats = BuildStats()
+        with self.stats.stage('build_total'):
+            asyncio.run(ingest(self, source, concurrency, max_pending))
+        self.stats.count('graph_nodes', self.graph.number_of_nodes())
+        self.stats.count('graph_edges', self.graph.number_of_edges())
+        logger.info("Topology build complete: %d devices, %d nodes, %d edges in %.3fs", len(self.devices),
+                    self.graph.number_of_nodes(), self.graph.number_of_edges(), self.stats.stages['build_total'][0])
+
+    def _find_config_paths(self, conf_directory):
+        """
+        Returns the config file of every device, in directory-listing order: <device>/config.dump
+        (or another name from CONFIG_FILE_NAMES) per device directory, or single files like R1.cfg.
+        """
+        config_paths = []
+        for entry in os.listdir(conf_directory):
+            config_path = find_config_file(conf_directory, entry)
+            if config_path is not None:
+                config_paths.append(config_path)
+            else:
+                logger.info("Skipping %s, no config file found.", entry)
+                self.stats.count('configs_skipped')
+        return config_paths
+
+    def _parse_config_records(self, config_paths, workers, chunksize=None):
+        """
+        Parses config files, in a process pool when workers > 1. Workers send back compact parse
+        records (see CiscoConfigParser.to_record) rather than whole parser objects. Records are
+        yielded in input order, so devices get added exactly as a serial run would add them.
+        """
+        profile = self.stats.profile_parser
+        parse = partial(parse_config_record, profile=True) if profile else parse_config_record
+        if workers <= 1 or len(config_paths) <= 1:
+            yield from self._count_parsed(config_paths, map(parse, config_paths), profile)
+            return
+        if chunksize is None:
+            chunksize = max(1, len(config_paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from self._count_parsed(config_paths, executor.map(parse, config_paths, chunksize=chunksize), profile)
+
+    def _count_parsed(self, config_paths, results, profile):
+        # Profiled parses bring their own counters and timings; otherwise count files and bytes here
+        for config_path, result in zip(config_paths, results):
+            if profile:
+                result, report = result
+                self.stats.merge(report)
+            else:
+                self.stats.count('files_read')
+                self.stats.count('bytes_parsed', os.path.getsize(config_path))
+                if result is not None:
+                    self.stats.count(f'platform_{result[5]}')
+            yield result
+
+    def _build_incremental(self, conf_directory, config_paths, workers, chunksize):
+        cache = ParseCache(conf_directory)
+        with self.stats.stage('cache_load'):
+            cache.load()
+        changed_devices = {} # hostname -> parser before this build (None if the device is new)
+        to_parse = []
+
+        for config_path in config_paths:
+            record, stat_key, digest = cache.lookup(config_path)
+            previous = self._device_sources.get(config_path)
+            if previous is not None and previous[1] == digest:
+                continue # Same content as the last build on this builder, nothing to do
+            device_parser = None
+            if record is not None:
+                try:
+                    device_parser = parser_from_record(record, compact=self.compact_records)
+                except (TypeError, ValueError, KeyError, IndexError):
+                    logger.warning("Discarding corrupt cache entry for %s", config_path)
+                    cache.discard(config_path)
+            if device_parser is None:
+                to_parse.append((config_path, stat_key, digest))
+            else:
+                self.stats.count(f'platform_{device_parser.platform}')
+                self._replace_device(config_path, device_parser, digest, changed_devices)
+
+        logger.info("Parse cache: %d unchanged, %d to parse", cache.hits, len(to_parse))
+        self.stats.count('cache_hits', cache.hits)
+        self.stats.count('cache_misses', len(to_parse))
+        paths = [config_path for config_path, _, _ in to_parse]
+        with self.stats.stage('parse'):
+            records = self._parse_config_records(paths, workers, chunksize)
+            for (config_path, stat_key, digest), record in zip(to_parse, records):
+                if record is None:
+                    continue
+                cache.store(config_path, stat_key, digest, record)
+                self._replace_device(config_path, parser_from_record(record, compact=self.compact_records), digest, changed_devices)
+
+        # Devices whose config has disappeared
+        live_paths = set(config_paths)
+        for config_path in list(self._device_sources):
+            if config_path not in live_paths:
+                hostname = self._device_sources.pop(config_path)[0]
+                changed_devices.setdefault(hostname, self.devices.get(hostname))
+                self._remove_device(hostname)
+
+        cache.prune(config_paths)
+        with self.stats.stage('cache_save'):
+            cache.save()
+
+        logger.info("Discovering links based on shared subnets (%d changed devices)...", len(changed_devices))
+        self._discover_links(changed_devices)
+
+    def _replace_device(self, config_path, device_parser, digest, changed_devices):
+        previous = self._device_sources.get(config_path)
+        if previous is not None:
+            old_hostname = previous[0]
+            changed_devices.setdefault(old_hostname, self.devices.get(old_hostname))
+            if old_hostname != device_parser.hostname:
+                self._remove_device(old_hostname)
+        changed_devices.setdefault(device_parser.hostname, self.devices.get(device_parser.hostname))
+        self.add_device(device_parser)
+        self._device_sources[config_path] = (device_parser.hostname, digest)
+
+    def _remove_device(self, hostname):
+        self.devices.pop(hostname, None)
+        self.topology_version += 1
+        if self.graph.has_node(hostname):
+            self.graph.remove_node(hostname)
+        self.stats.count('devices_removed')
+        logger.debug("Removed device: %s", hostname)
+
+    def _discover_links(self, changed_devices=None):
+        """
+        The core logic: finds interfaces on the same subnet and creates graph edges.
+
+        Interfaces are grouped with the prefix index, so a /30 facing a misconfigured /29 still
+        ends up on the same link, grouped under the wider of the two networks. Networks with
+        different masks are only merged when they are peers (see _segment_component); a wide
+        network covering unrelated links doesn't pull them into one segment.
+
+        changed_devices: optional dict of hostname -> the device's previous parser (None if the
+        device is new). When given, only subnets touched by those devices are re-linked and the
+        rest of the graph is left alone.
+        """
+        self.topology_version += 1
+        with self.stats.stage('discover_links'):
+            if changed_devices is not None:
+                self._update_links(changed_devices)
+            else:
+                self._discover_all_links()
 
-        # Step 1: Populate the subnet map
-        for hostname, device_parser in self.devices.items():
-            for intf in device_parser.interfaces:
-                if intf.get('network'): # Only consider interfaces with a valid IP/subnet
-                    subnet = intf['network']
-                    device_intf_tuple = (hostname, intf)
-                    if subnet not in subnet_map:
-                        subnet_map[subnet] = []
-                    subnet_map[subnet].append(device_intf_tuple)
+    def _discover_all_links(self):
+        self._rebuild_indexes()
 
         # Step 2: For each subnet, create edges between devices found on it
-        for subnet, device_intf_list in subnet_map.items():
-            # A subnet with 2+ devices is a shared network (a link)
-            if len(device_intf_list) >= 2:
-                print(f"  Found shared subnet: {subnet}")
-                # Create edges between every pair of devices on this subnet
-                # This handles point-to-point links (2 devices) and multi-access networks (>2 devices)
-                for i in range(len(device_intf_list)):
-                    for j in range(i+1, len(device_intf_list)):
-                        device_a, intf_a = device_intf_list[i]
-                        device_b, intf_b = device_intf_list[j]
-
-                        # **UNIQUE TWIST: Use description if available, else use interface names for the link label**
-                        link_name_a_to_b = f"{intf_a['name']} -> {intf_b['name']}"
-                        link_name_b_to_a = f"{intf_b['name']} -> {intf_a['name']}"
-
-                        # Add edges in both directions for an undirected relationship,
-                        # but store interface-specific data on each directed edge.
-                        self.graph.add_edge(device_a, device_b,
-                                            label=link_name_a_to_b,
-                                            subnet=subnet,
-                                            interface_a=intf_a['name'],
-                                            interface_b=intf_b['name'])
-                        self.graph.add_edge(device_b, device_a,
-                                            label=link_name_b_to_a,
-                                            subnet=subnet,
-                                            interface_a=intf_b['name'],
-                                            interface_b=intf_a['name'])
-                        print(f"    Created link: {device_a} <-> {device_b}")
-
-            # **UNIQUE TWIST: Handle "stub" networks (only one device on a subnet)**
-            # These are often user VLANs or WAN links to an unseen provider.
-            # We can represent them as special nodes for a more complete picture.
-            elif len(device_intf_list) == 1:
-                device, intf = device_intf_list[0]
-                stub_network_name = f"STUB_{subnet.replace('/', '_')}"
-                # Add a node for the stub network
-                self.graph.add_node(stub_network_name, type='network', subnet=subnet)
-                # Add a link from the device to the stub network
-                link_name = f"{intf['name']} -> {stub_network_name}"
-                self.graph.add_edge(device, stub_network_name,
-                                    label=link_name,
-                                    subnet=subnet,
-                                    interface_a=intf['name'])
-                print(f"  Found stub network: {subnet} attached to {device}")
-
-import networkx as nx
-# import matplotlib.pyplot as plt  # COMMENTED OUT
-from config_parser import load_config_from_file
-import os
-
-class NetworkTopologyBuilder:
-    """
-    Builds a hierarchical network topology graph from parsed router configurations.
-    Uses subnet matching to automatically discover links between devices.
-    """
-
-    def __init__(self):
-        # Directed graph: Useful for representing traffic flow (e.g., access -> distribution -> core)
-        # Can be converted to undirected for certain analyses.
-        self.graph = nx.DiGraph()
-        self.devices = {} # Key: hostname, Value: CiscoConfigParser object
-
-    def add_device_from_file(self, file_path):
-        """Loads and parses a device config from a file and adds it to the graph."""
-        device_parser = load_config_from_file(file_path)
-        if device_parser is None:
-            return False
-
-        self.devices[device_parser.hostname] = device_parser
-        # Add the device itself as a node in the graph, with its parser object as an attribute
-        self.graph.add_node(device_parser.hostname, type='router', parser=device_parser)
-        print(f"Added device: {device_parser.hostname}")
-        return True
-
-    def build_topology_from_configs(self, conf_directory):
-        """Reads all config files from a directory and builds the topology."""
-        print(f"Loading configurations from {conf_directory}...")
-        print(f"DEBUG: Items in Conf directory: {os.listdir(conf_directory)}")  # DEBUG LINE
-        for device_dir in os.listdir(conf_directory):
-            print(f"DEBUG: Processing item: {device_dir}")  # DEBUG LINE
-            config_path = os.path.join(conf_directory, device_dir, 'config.dump')
-            print(f"DEBUG: Config path: {config_path}")  # DEBUG LINE
-            if os.path.isfile(config_path):
-                self.add_device_from_file(config_path)
-            else:
-                print(f"Skipping {device_dir}, config.dump not found.")
-
-        print("\nDiscovering links based on shared subnets...")
-        self._discover_links()
-        print("Topology build complete.")
+        self.stats.count('subnets', len(self.subnet_map))
+        for subnet, device_intf_list in self.subnet_map.items():
+            self._link_subnet(subnet, device_intf_list)
+
+    def _rebuild_indexes(self):
+        """Rebuilds the prefix index and subnet map from self.devices, without touching the graph."""
+        # Index every interface network and static route
+        self.prefix_index = PrefixTrie()
+        self._interface_prefixes = {}
+        for hostname, device_parser in self.devices.items():
+            self._index_device(hostname, device_parser)
 
-    def _discover_links(self):
-        """The core logic: finds interfaces on the same subnet and creates graph edges."""
         # A dictionary to map a subnet (network string) to a list of (device, interface) tuples
         subnet_map = {}
+        self._group_segments()
 
         # Step 1: Populate the subnet map
         for hostname, device_parser in self.devices.items():
             for intf in device_parser.interfaces:
-                if intf.get('network'): # Only consider interfaces with a valid IP/subnet
-                    subnet = intf['network']
+                prefix = interface_prefix(intf)
+                if prefix: # Only consider interfaces with a valid IP/subnet
+                    subnet = format_prefix(*self._segment_of[prefix])
                     device_intf_tuple = (hostname, intf)
                     if subnet not in subnet_map:
                         subnet_map[subnet] = []
                     subnet_map[subnet].append(device_intf_tuple)
-
-        # Step 2: For each subnet, create edges between devices found on it
-        for subnet, device_intf_list in subnet_map.items():
-            # A subnet with 2+ devices is a shared network (a link)
-            if len(device_intf_list) >= 2:
-                print(f"  Found shared subnet: {subnet}")
-                # Create edges between every pair of devices on this subnet
-                # This handles point-to-point links (2 devices) and multi-access networks (>2 devices)
-                for i in range(len(device_intf_list)):
-                    for j in range(i+1, len(device_intf_list)):
-                        device_a, intf_a = device_intf_list[i]
-                        device_b, intf_b = device_intf_list[j]
-
-                        # **UNIQUE TWIST: Use description if available, else use interface names for the link label**
-                        link_name_a_to_b = f"{intf_a['name']} -> {intf_b['name']}"
-                        link_name_b_to_a = f"{intf_b['name']} -> {intf_a['name']}"
-
-                        # Add edges in both directions for an undirected relationship,
-                        # but store interface-specific data on each directed edge.
-                        self.graph.add_edge(device_a, device_b,
-                                            label=link_name_a_to_b,
-                                            subnet=subnet,
-                                            interface_a=intf_a['name'],
-                                            interface_b=intf_b['name'])
-                        self.graph.add_edge(device_b, device_a,
-                                            label=link_name_b_to_a,
-                                            subnet=subnet,
-                                            interface_a=intf_b['name'],
-                                            interface_b=intf_a['name'])
-                        print(f"    Created link: {device_a} <-> {device_b}")
-
-            # **UNIQUE TWIST: Handle "stub" networks (only one device on a subnet)**
-            # These are often user VLANs or WAN links to an unseen provider.
-            # We can represent them as special nodes for a more complete picture.
-            elif len(device_intf_list) == 1:
-                device, intf = device_intf_list[0]
-                stub_network_name = f"STUB_{subnet.replace('/', '_')}"
-                # Add a node for the stub network
-                self.graph.add_node(stub_network_name, type='network', subnet=subnet)
-                # Add a link from the device to the stub network
-                link_name = f"{intf['name']} -> {stub_network_name}"
-                self.graph.add_edge(device, stub_network_name,
-                                    label=link_name,
+        self.subnet_map = subnet_map
+
+    def _index_device(self, hostname, device_parser):
+        for intf in device_parser.interfaces:
+            prefix = interface_prefix(intf)
+            if prefix:
+                self.prefix_index.insert(prefix[0], prefix[1], ('interface', hostname, intf))
+                self._interface_prefixes[prefix] = self._interface_prefixes.get(prefix, 0) + 1
+        for route in device_parser.static_routes:
+            prefix = route_prefix(route)
+            if prefix:
+                self.prefix_index.insert(prefix[0], prefix[1], ('route', hostname, route))
+
+    def _unindex_device(self, hostname, device_parser):
+        prefixes = {interface_prefix(intf) for intf in device_parser.interfaces}
+        prefixes.update(route_prefix(route) for route in device_parser.static_routes)
+        prefixes.discard(None)
+        for intf in device_parser.interfaces:
+            prefix = interface_prefix(intf)
+            if prefix:
+                self._interface_prefixes[prefix] -= 1
+                if not self._interface_prefixes[prefix]:
+                    del self._interface_prefixes[prefix]
+        for network, length in prefixes:
+            self.prefix_index.remove(network, length, lambda entry: entry[1] == hostname)
+
+    def analyze_ospf(self):
+        """
+        Works out which interfaces the OSPF network statements enable and tags the graph with
+        areas, adjacencies and ABR roles (see ospf_analysis.py). Returns a summary dict.
+        """
+        # Imported here so NumPy is only needed when this stage is used
+        from ospf_analysis import analyze_ospf
+        return analyze_ospf(self)
+
+    def query(self, kind, value=None):
+        """
+        Answers a lookup from the cached query layer, e.g. query('neighbors', 'R1'),
+        query('subnet', '10.1.1.0/30'), query('vlan', '40') or query('stubs'). See TopologyQuery.KINDS.
+        """
+        return self.queries.query(kind, value)
+
+    def trace_path(self, source, destination):
+        """Forwarding path from device `source` to IP `destination` using connected networks and static routes."""
+        return self.path_engine.trace(source, destination)
+
+    def save_snapshot(self, path):
+        """Writes the built topology to a binary snapshot (see snapshot.py) that loads without re-parsing."""
+        from snapshot import save_snapshot
+        with self.stats.stage('snapshot_save'):
+            save_snapshot(self, path)
+
+    def audit(self):
+        """
+        Duplicate IPs, overlapping subnets, unreachable static-route next hops and shut interfaces
+        that still have addresses, as a JSON-serializable report (see audit.py).
+        """
+        # Imported here so NumPy is only needed when this stage is used
+        from audit import audit_topology
+        with self.stats.stage('audit'):
+            report = audit_topology(self)
+        for name in ('duplicate_addresses', 'overlapping_prefixes', 'unreachable_next_hops', 'shutdown_with_ip'):
+            self.stats.count(f'audit_{name}', report['summary'][name])
+        return report
+
+    def diff_from(self, older):
+        """What changed from `older` (another builder, e.g. yesterday's build) to this one; see topology_diff.py."""
+        from topology_diff import diff_topologies
+        with self.stats.stage('diff'):
+            return diff_topologies(older, self)
+
+    @classmethod
+    def load_snapshot(cls, path):
+        """Rebuilds a topology from a file written by save_snapshot(). For read-only queries, snapshot.TopologySnapshot is cheaper."""
+        from snapshot import load_topology
+        return load_topology(path)
+
+    def _segment_root(self, prefix):
+        """The root prefix (subnet_map key) of the segment `prefix` was grouped into; the prefix itself if it wasn't."""
+        return self._segment_of.get(prefix, prefix)
+
+    def _segment_component(self, prefix):
+        """
+        The interface prefixes that share a segment with `prefix`.
+
+        Networks with different masks are merged only when they are peers: an interface on the
+        wider network has its address inside the narrower one (e.g. a /30 facing a misconfigured
+        /29). A wide network that merely covers other, unrelated links is a segment of its own.
+        """
+        component = {prefix}
+        stack = [prefix]
+        while stack:
+            for peer in self._peer_prefixes(*stack.pop()):
+                if peer not in component:
+                    component.add(peer)
+                    stack.append(peer)
+        return component
+
+    def _peer_prefixes(self, network, length):
+        return self._wider_peers(network, length) + self._narrower_peers(network, length)
+
+    def _wider_peers(self, network, length):
+        """Wider interface networks with one of their interface addresses inside this one."""
+        peers = []
+        mask = (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+        for wide_network, wide_length, entries in self.prefix_index.covering(network, length):
+            if wide_length < length and (wide_network, wide_length) in self._interface_prefixes:
+                for entry in entries:
+                    address = interface_address(entry[2]) if entry[0] == 'interface' else None
+                    if address is not None and address & mask == network:
+                        peers.append((wide_network, wide_length))
+                        break
+        return peers
+
+    def _narrower_peers(self, network, length):
+        """Narrower interface networks holding one of this network's interface addresses."""
+        peers = []
+        for entry in self.prefix_index.get(network, length):
+            address = interface_address(entry[2]) if entry[0] == 'interface' else None
+            if address is None:
+                continue
+            for narrow_network, narrow_length, _ in self.prefix_index.covering(address, 32):
+                if narrow_length > length and (narrow_network, narrow_length) in self._interface_prefixes:
+                    peers.append((narrow_network, narrow_length))
+        return peers
+
+    def _group_segments(self):
+        """Sets self._segment_of for every indexed interface prefix at once."""
+        # Every peer pair is seen from its narrower side, so looking up from each prefix is enough
+        # here; union-find joins the pairs into segments
+        parent = {}
+        def find(prefix):
+            while parent.get(prefix, prefix) != prefix:
+                prefix = parent[prefix]
+            return prefix
+        for prefix in self._interface_prefixes:
+            for wide in self._wider_peers(*prefix):
+                a, b = find(prefix), find(wide)
+                if a != b:
+                    parent[a] = b
+        components = {}
+        for prefix in self._interface_prefixes:
+            components.setdefault(find(prefix), set()).add(prefix)
+        self._segment_of = {}
+        for component in components.values():
+            self._assign_segment(component)
+
+    def _assign_segment(self, component):
+        """Records every prefix of a segment under its root, the widest of them, and returns the root."""
+        # Peers are nested, so a segment always has exactly one widest prefix
+        root = min(component, key=lambda prefix: prefix[1])
+        for prefix in component:
+            self._segment_of[prefix] = root
+        return root
+
+    def _segment_members(self, component):
+        """All (hostname, interface) pairs on the segment's interface prefixes, in address order."""
+        members = []
+        for network, length in sorted(component):
+            members.extend((entry[1], entry[2]) for entry in self.prefix_index.get(network, length) if entry[0] == 'interface')
+        return members
+
+    def longest_match(self, ip, kind='interface'):
+        """
+        Longest-prefix match for an IP address (string or int) against the prefix index.
+        kind is 'interface' (connected networks), 'route' (static routes) or None for both.
+        Returns (subnet string, [(hostname, interface or route), ...]) or None.
+        """
+        address = quad_to_int(ip) if isinstance(ip, str) else ip
+        predicate = None if kind is None else (lambda entry: entry[0] == kind)
+        match = self.prefix_index.longest_match(address, predicate)
+        if match is None:
+            return None
+        network, length, entries = match
+        return format_prefix(network, length), [(entry[1], entry[2]) for entry in entries]
+
+    def find_ip_owner(self, ip):
+        """Which device and interface has this IP configured? Returns (hostname, interface) or None."""
+        address = quad_to_int(ip) if isinstance(ip, str) else ip
+        ip = int_to_quad(address)
+        # Usually the longest match, but with mismatched masks the owner can sit on a shorter prefix
+        for _, _, entries in reversed(self.prefix_index.covering(address, 32)):
+            for entry in entries:
+                if entry[0] == 'interface' and entry[2]['ip_address'] == ip:
+                    return entry[1], entry[2]
+        return None
+
+    def _link_subnet(self, subnet, device_intf_list):
+        """Creates the graph edges (or stub network node) for one subnet."""
+        # A multi-access subnet in segment mode gets a hub node instead of a full mesh
+        if len(device_intf_list) > 2 and self.multi_access_mode == 'segment':
+            segment_name = self._segment_node_name(subnet)
+            self.graph.add_node(segment_name, type='segment', subnet=subnet, members=len(device_intf_list))
+            # One edge pair per device; with two interfaces on the segment the first by name is used,
+            # whatever order the members were collected in
+            attached = {}
+            for device, intf in device_intf_list:
+                if device not in attached or intf['name'] < attached[device]['name']:
+                    attached[device] = intf
+            for device, intf in attached.items():
+                self.graph.add_edge(device, segment_name,
+                                    label=f"{intf['name']} -> {segment_name}",
                                     subnet=subnet,
                                     interface_a=intf['name'])
-                print(f"  Found stub network: {subnet} attached to {device}")
+                self.graph.add_edge(segment_name, device,
+                                    label=f"{segment_name} -> {intf['name']}",
+                                    subnet=subnet,
+                                    interface_b=intf['name'])
+            self.stats.count('segments')
+            self.stats.count('edges_created', 2 * len(attached))
+            logger.debug("Found multi-access segment: %s with %d members", subnet, len(device_intf_list))
+
+        # A subnet with 2+ devices is a shared network (a link)
+        elif len(device_intf_list) >= 2:
+            logger.debug("Found shared subnet: %s", subnet)
+            # Create edges between every pair of devices on this subnet
+            # This handles point-to-point links (2 devices) and multi-access networks (>2 devices)
+            for i in range(len(device_intf_list)):
+                for j in range(i+1, len(device_intf_list)):
+                    device_a, intf_a = device_intf_list[i]
+                    device_b, intf_b = device_intf_list[j]
+                    self._add_link(subnet, device_a, intf_a, device_b, intf_b)
+                    logger.debug("Created link: %s <-> %s", device_a, device_b)
+
+        # **UNIQUE TWIST: Handle "stub" networks (only one device on a subnet)**
+        # These are often user VLANs or WAN links to an unseen provider.
+        # We can represent them as special nodes for a more complete picture.
+        elif len(device_intf_list) == 1:
+            device, intf = device_intf_list[0]
+            stub_network_name = self._stub_node_name(subnet)
+            # Add a node for the stub network
+            self.graph.add_node(stub_network_name, type='network', subnet=subnet)
+            # Add a link from the device to the stub network
+            link_name = f"{intf['name']} -> {stub_network_name}"
+            self.graph.add_edge(device, stub_network_name,
+                                label=link_name,
+                                subnet=subnet,
+                                interface_a=intf['name'])
+            self.stats.count('stub_networks')
+            self.stats.count('edges_created')
+            logger.debug("Found stub network: %s attached to %s", subnet, device)
+
+    def _add_link(self, subnet, device_a, intf_a, device_b, intf_b):
+        # Two devices get one edge pair even if they share several subnets. Whichever link sorts
+        # first by (subnet prefix, interface names) keeps it, so the result doesn't depend on the
+        # order subnets are linked in (a full pass and an incremental update agree)
+        # (a device with two interfaces on the subnet gets a self-loop, which is oriented by name)
+        if device_a == device_b and intf_a['name'] > intf_b['name']:
+            intf_a, intf_b = intf_b, intf_a
+        if self.graph.has_edge(device_a, device_b):
+            existing = self.graph[device_a][device_b]
+            names = (existing.get('interface_a') or '', existing.get('interface_b') or '')
+            current = _link_key(existing['subnet'], *(sorted(names) if device_a == device_b else names)) \
+                if existing.get('subnet') in self.subnet_map else None
+            if current is not None and current <= _link_key(subnet, intf_a['name'], intf_b['name']):
+                return
+            # Replaced rather than updated, so a mask_mismatch flag doesn't stick around
+            self.graph.remove_edge(device_a, device_b)
+            if self.graph.has_edge(device_b, device_a):
+                self.graph.remove_edge(device_b, device_a)
+
+        # **UNIQUE TWIST: Use description if available, else use interface names for the link label**
+        link_name_a_to_b = f"{intf_a['name']} -> {intf_b['name']}"
+        link_name_b_to_a = f"{intf_b['name']} -> {intf_a['name']}"
+
+        # The two ends were grouped by the prefix index but disagree on the mask (e.g. /30 vs /29)
+        extra = {'mask_mismatch': True} if intf_a.get('network') != intf_b.get('network') else {}
+
+        self.stats.count('edges_created', 2)
+        # Add edges in both directions for an undirected relationship,
+        # but store interface-specific data on each directed edge.
+        self.graph.add_edge(device_a, device_b,
+                            label=link_name_a_to_b,
+                            subnet=subnet,
+                            interface_a=intf_a['name'],
+                            interface_b=intf_b['name'],
+                            **extra)
+        self.graph.add_edge(device_b, device_a,
+                            label=link_name_b_to_a,
+                            subnet=subnet,
+                            interface_a=intf_b['name'],
+                            interface_b=intf_a['name'],
+                            **extra)
+
+    def _stub_node_name(self, subnet):
+        return f"STUB_{subnet.replace('/', '_')}"
+
+    def _segment_node_name(self, subnet):
+        return f"SEGMENT_{subnet.replace('/', '_')}"
+
+    def set_multi_access_mode(self, multi_access_mode):
+        """Switches between 'mesh' and 'segment' representations and re-links the whole graph."""
+        if multi_access_mode not in ('mesh', 'segment'):
+            raise ValueError(f"Unknown multi_access_mode: {multi_access_mode}")
+        self.multi_access_mode = multi_access_mode
+        # Keep the device nodes, drop every link and stub/segment node, then rediscover
+        self.graph.remove_edges_from(list(self.graph.edges()))
+        self.graph.remove_nodes_from([node for node, attr in self.graph.nodes(data=True) if attr.get('type') != 'router'])
+        self._discover_links()
+
+    def _update_links(self, changed_devices):
+        """Incremental version of _discover_links: only re-links subnets the changed devices were or are on."""
+        # Step 1: The prefixes the changed devices had or have, and the subnets (segments) they were in before
+        touched = set()
+        for hostname, old_parser in changed_devices.items():
+            for device_parser in (old_parser, self.devices.get(hostname)):
+                if device_parser is not None:
+                    touched.update(interface_prefix(intf) for intf in device_parser.interfaces)
+        touched.discard(None)
+        old_roots = {self._segment_of[prefix] for prefix in touched if prefix in self._segment_of}
+
+        # Step 2: Update the prefix index
+        for hostname, old_parser in changed_devices.items():
+            if old_parser is not None:
+                self._unindex_device(hostname, old_parser)
+        for hostname in changed_devices:
+            if hostname in self.devices:
+                self._index_device(hostname, self.devices[hostname])
+
+        # Step 3: Work out the segments now. A touched prefix can become a peer of networks in other
+        # segments (which then get regrouped too), and a segment that lost a prefix can fall apart
+        for prefix in touched:
+            if prefix in self._interface_prefixes:
+                old_roots.update(self._segment_of[peer] for peer in self._segment_component(prefix) if peer in self._segment_of)
+        old_members = {root: self.subnet_map[format_prefix(*root)] for root in old_roots}
+        affected = set(touched)
+        for members in old_members.values():
+            affected.update(interface_prefix(intf) for _, intf in members)
+        affected.discard(None)
+        for members in old_members.values():
+            for _, intf in members:
+                self._segment_of.pop(interface_prefix(intf), None)
+        for prefix in touched:
+            self._segment_of.pop(prefix, None)
+        new_segments = {} # root -> component
+        for prefix in affected:
+            if prefix in self._interface_prefixes and prefix not in self._segment_of:
+                component = self._segment_component(prefix)
+                new_segments[self._assign_segment(component)] = component
+
+        # Step 4: Drop the edges and stub/segment nodes the old segments created
+        removed_pairs = set()
+        for root, members in old_members.items():
+            subnet = format_prefix(*root)
+            del self.subnet_map[subnet]
+            if len(members) == 1:
+                stub_network_name = self._stub_node_name(subnet)
+                if self.graph.has_node(stub_network_name):
+                    self.graph.remove_node(stub_network_name)
+            segment_name = self._segment_node_name(subnet)
+            if self.graph.has_node(segment_name):
+                self.graph.remove_node(segment_name)
+            hostnames = {member[0] for member in members}
+            for device_a in hostnames:
+                for device_b in hostnames:
+                    # (device_a == device_b covers a device with two interfaces on the subnet)
+                    if self.graph.has_edge(device_a, device_b) and self.graph[device_a][device_b].get('subnet') == subnet:
+                        self.graph.remove_edge(device_a, device_b)
+                        removed_pairs.add((device_a, device_b))
+
+        # Step 5: Re-link the current segments
+        self.stats.count('subnets', len(new_segments))
+        for root in sorted(new_segments):
+            subnet = format_prefix(*root)
+            self.subnet_map[subnet] = self._segment_members(new_segments[root])
+            self._link_subnet(subnet, self.subnet_map[subnet])
+
+        # Step 6: A removed edge may still be justified by another, untouched subnet the two devices
+        # share; every such link is offered to _add_link, which keeps the same one a full pass would
+        for device_a, device_b in removed_pairs:
+            if self.graph.has_edge(device_a, device_b) or device_a not in self.devices or device_b not in self.devices:
+                continue
+            for intf_a in self.devices[device_a].interfaces:
+                prefix = interface_prefix(intf_a)
+                if prefix is None:
+                    continue
+                subnet = format_prefix(*self._segment_root(prefix))
+                members = self.subnet_map.get(subnet, [])
+                if len(members) > 2 and self.multi_access_mode == 'segment':
+                    continue # Those devices meet at the segment node, not over a direct edge
+                for host, intf_b in members:
+                    if host == device_b and intf_b is not intf_a:
+                        self._add_link(subnet, device_a, intf_a, device_b, intf_b)
+
+    def visualize_topology(self, output_path="generated_topology.png", headless=False, layout='auto', layout_cache_path=None):
+        """
+        Generates a simple visual plot of the topology graph.
+
+        headless: render straight to output_path without a display (see render.py). Uses a
+                  scalable layout on big graphs, draws in bulk and keeps node positions in
+                  self.layout_cache, so re-rendering after an update only places the new nodes.
+                  Returns the render timing stats.
+        layout_cache_path: JSON file to persist those positions in between runs (headless only).
+        """
+        if headless:
+            return self._render_headless(output_path, layout, layout_cache_path)
 
-    
-    def visualize_topology(self):
-        """Generates a simple visual plot of the topology graph."""
         plt.figure(figsize=(12, 8))
 
         # Define a layout for the nodes (positions in the plot)
@@ -223,10 +713,13 @@ class NetworkTopologyBuilder:
         # Separate node types for coloring
         router_nodes = [node for node, attr in self.graph.nodes(data=True) if attr.get('type') == 'router']
         network_nodes = [node for node, attr in self.graph.nodes(data=True) if attr.get('type') == 'network']
+        segment_nodes = [node for node, attr in self.graph.nodes(data=True) if attr.get('type') == 'segment']
 
         # Draw nodes
         nx.draw_networkx_nodes(self.graph, pos, nodelist=router_nodes, node_color='lightblue', node_size=1000, label='Routers')
         nx.draw_networkx_nodes(self.graph, pos, nodelist=network_nodes, node_color='lightgreen', node_size=800, label='Stub Networks')
+        if segment_nodes:
+            nx.draw_networkx_nodes(self.graph, pos, nodelist=segment_nodes, node_color='orange', node_size=900, label='Multi-access Segments')
 
         # Draw edges with labels
         edge_labels = nx.get_edge_attributes(self.graph, 'label')
@@ -240,10 +733,19 @@ class NetworkTopologyBuilder:
         plt.legend()
         plt.axis('off')  # Turn off the axis
         plt.tight_layout()
-        plt.savefig("generated_topology.png") # Save the figure
-        print("Topology visualization saved as 'generated_topology.png'")
+        plt.savefig(output_path) # Save the figure
+        logger.info("Topology visualization saved as '%s'", output_path)
         plt.show()
-   
+
+    def _render_headless(self, output_path, layout, layout_cache_path):
+        if layout_cache_path is not None and layout_cache_path != self.layout_cache.path:
+            self.layout_cache = LayoutCache(layout_cache_path)
+            self.layout_cache.load()
+        stats = render_topology(self.graph, output_path, self.layout_cache, layout)
+        self.layout_cache.save()
+        logger.info("Topology visualization saved as '%s' (%d nodes, %d links, %s layout, %.2fs)",
+                    output_path, stats['nodes'], stats['edges'], stats['layout'], stats['total_s'])
+        return stats
 
     def print_topology_summary(self):
         """Prints a text-based summary of the topology."""
@@ -253,10 +755,13 @@ class NetworkTopologyBuilder:
         print(f"Number of devices: {len(self.devices)}")
         print(f"Number of nodes in graph: {self.graph.number_of_nodes()}")
         print(f"Number of links in graph: {self.graph.number_of_edges() // 2}") # Divide by 2 for undirected count
+        segments = sum(1 for _, attr in self.graph.nodes(data=True) if attr.get('type') == 'segment')
+        if segments:
+            print(f"Number of multi-access segments: {segments}")
 
         print("\nDevices and their interfaces:")
         for hostname, device_parser in self.devices.items():
             print(f"  {hostname}:")
             for intf in device_parser.interfaces:
                 if intf.get('ip_address'):
-                    print(f"  - {intf['name']}: {intf['ip_address']} ({intf.get('network', 'N/A')})")
\ No newline at end of file
+                    print(f"  - {intf['name']}: {intf['ip_address']} ({intf.get('network', 'N/A')})")
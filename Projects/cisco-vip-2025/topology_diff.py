@@ -0,0 +1,271 @@
+import hashlib
+import json
+import weakref
+from collections import Counter
+
+from prefix_index import format_prefix, interface_prefix
+
+# Topology diff: what changed between two builds (e.g. yesterday's Conf/ and today's).
+#
+# Every device gets a fingerprint of its parsed content, built from one fingerprint per interface
+# block plus its routes, routing protocols and VLANs. Devices whose fingerprints match are skipped
+# outright; only the rest are compared field by field. The graph is only compared inside the
+# subnets those devices touch (in either build), so the work grows with the size of the change,
+# not the size of the network. When both builders were built with use_cache=True, devices whose
+# config file hashes match are skipped without even being fingerprinted.
+
+_INTERFACE_FIELDS = ('name', 'ip_address', 'subnet_mask', 'description', 'shutdown', 'vlan', 'network')
+
+# Parsers are never modified after parsing, so fingerprints are computed once per parser object
+_fingerprints = weakref.WeakKeyDictionary()
+
+
+def _digest(value):
+    return hashlib.blake2b(json.dumps(value, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _interface_tuple(intf):
+    return tuple(intf.get(field) for field in _INTERFACE_FIELDS)
+
+
+def fingerprint(device_parser):
+    """
+    (device fingerprint, {interface name: interface fingerprint}) for a parsed device.
+    Dict and compact records with the same content give the same fingerprints.
+    """
+    cached = _fingerprints.get(device_parser)
+    if cached is None:
+        interfaces = {intf['name']: _digest(_interface_tuple(intf)) for intf in device_parser.interfaces}
+        device = _digest([device_parser.hostname, list(interfaces.items()),
+                          [_route_tuple(route) for route in device_parser.static_routes],
+                          device_parser.routing_protocols, device_parser.vlan_info])
+        cached = _fingerprints[device_parser] = (device, interfaces)
+    return cached
+
+
+def _route_tuple(route):
+    return (route['network'], route['mask'], route['next_hop'])
+
+
+def _ospf_statements(device_parser):
+    return [(process['process_id'], statement['network'], statement['wildcard'], statement['area'])
+            for process in device_parser.routing_protocols.get('ospf', [])
+            for statement in process['networks']]
+
+
+def _source_digests(topology):
+    """hostname -> config file hash, for builders built with use_cache=True (empty otherwise)."""
+    return {hostname: digest for hostname, digest in topology._device_sources.values()}
+
+
+def diff_topologies(old, new):
+    """
+    Structured, JSON-serializable diff between two NetworkTopologyBuilders:
+
+      devices        added / removed / changed hostnames
+      interfaces     per device: added / removed interface names, changed fields as {field: [old, new]}
+      static_routes  per device: added / removed routes
+      ospf           per device: added / removed network statements
+      subnets        added / removed, and changed members ("host:interface" lists)
+      stub_networks  added / removed stub network nodes
+      links          added / removed / changed directed graph edges
+      nodes          changed graph attributes of changed devices (e.g. OSPF roles)
+      stats          how much work the diff did
+    """
+    old_sources, new_sources = _source_digests(old), _source_digests(new)
+    result = {'devices': {'added': [], 'removed': [], 'changed': []},
+              'interfaces': {}, 'static_routes': {}, 'ospf': {},
+              'subnets': {'added': [], 'removed': [], 'changed': {}},
+              'stub_networks': {'added': [], 'removed': []},
+              'links': {'added': [], 'removed': [], 'changed': []},
+              'nodes': {'changed': {}},
+              'stats': {'devices_compared': 0, 'devices_fingerprinted': 0, 'subnets_compared': 0, 'edges_compared': 0}}
+    stats = result['stats']
+
+    changed = [] # hostnames present in at least one build whose content differs
+    for hostname, old_parser in old.devices.items():
+        stats['devices_compared'] += 1
+        new_parser = new.devices.get(hostname)
+        if new_parser is None:
+            result['devices']['removed'].append(hostname)
+            changed.append(hostname)
+            continue
+        # Identical config files can't differ after parsing
+        source_digest = old_sources.get(hostname)
+        if source_digest is not None and source_digest == new_sources.get(hostname):
+            continue
+        stats['devices_fingerprinted'] += 1
+        old_fingerprint, old_interfaces = fingerprint(old_parser)
+        new_fingerprint, new_interfaces = fingerprint(new_parser)
+        if old_fingerprint != new_fingerprint:
+            result['devices']['changed'].append(hostname)
+            changed.append(hostname)
+            _diff_device(result, hostname, old_parser, new_parser, old_interfaces, new_interfaces)
+    for hostname, new_parser in new.devices.items():
+        if hostname not in old.devices:
+            stats['devices_compared'] += 1
+            result['devices']['added'].append(hostname)
+            changed.append(hostname)
+            _diff_device(result, hostname, None, new_parser, {}, fingerprint(new_parser)[1])
+    for hostname in result['devices']['removed']:
+        old_parser = old.devices[hostname]
+        _diff_device(result, hostname, old_parser, None, fingerprint(old_parser)[1], {})
+
+    subnets = _affected_subnets(old, new, changed)
+    stats['subnets_compared'] = len(subnets)
+    _diff_subnets(result, old, new, subnets)
+    _diff_edges(result, old, new, subnets)
+    for hostname in result['devices']['changed']:
+        changes = _attribute_changes(_node_attr(old, hostname), _node_attr(new, hostname))
+        if changes:
+            result['nodes']['changed'][hostname] = changes
+    for section in ('devices', 'subnets', 'stub_networks'):
+        for key in ('added', 'removed'):
+            result[section][key].sort()
+    result['devices']['changed'].sort()
+    return result
+
+
+def _diff_device(result, hostname, old_parser, new_parser, old_interfaces, new_interfaces):
+    old_by_name = {intf['name']: intf for intf in old_parser.interfaces} if old_parser else {}
+    new_by_name = {intf['name']: intf for intf in new_parser.interfaces} if new_parser else {}
+    interfaces = {'added': [name for name in new_by_name if name not in old_by_name],
+                  'removed': [name for name in old_by_name if name not in new_by_name],
+                  'changed': {}}
+    for name, old_digest in old_interfaces.items():
+        if name in new_interfaces and new_interfaces[name] != old_digest:
+            interfaces['changed'][name] = _attribute_changes(dict(zip(_INTERFACE_FIELDS, _interface_tuple(old_by_name[name]))),
+                                                             dict(zip(_INTERFACE_FIELDS, _interface_tuple(new_by_name[name]))))
+    if interfaces['added'] or interfaces['removed'] or interfaces['changed']:
+        result['interfaces'][hostname] = interfaces
+
+    old_routes = Counter(_route_tuple(route) for route in old_parser.static_routes) if old_parser else Counter()
+    new_routes = Counter(_route_tuple(route) for route in new_parser.static_routes) if new_parser else Counter()
+    routes = _added_removed(old_routes, new_routes, ('network', 'mask', 'next_hop'))
+    if routes['added'] or routes['removed']:
+        result['static_routes'][hostname] = routes
+
+    old_ospf = Counter(_ospf_statements(old_parser)) if old_parser else Counter()
+    new_ospf = Counter(_ospf_statements(new_parser)) if new_parser else Counter()
+    ospf = _added_removed(old_ospf, new_ospf, ('process_id', 'network', 'wildcard', 'area'))
+    if ospf['added'] or ospf['removed']:
+        result['ospf'][hostname] = ospf
+
+
+def _added_removed(old_counts, new_counts, keys):
+    return {'added': [dict(zip(keys, item)) for item in sorted((new_counts - old_counts).elements())],
+            'removed': [dict(zip(keys, item)) for item in sorted((old_counts - new_counts).elements())]}
+
+
+def _attribute_changes(old_attr, new_attr):
+    return {key: [old_attr.get(key), new_attr.get(key)]
+            for key in sorted(set(old_attr) | set(new_attr)) if old_attr.get(key) != new_attr.get(key)}
+
+
+def _node_attr(topology, node):
+    if not topology.graph.has_node(node):
+        return {}
+    return {key: value for key, value in topology.graph.nodes[node].items() if key != 'parser'}
+
+
+def _affected_subnets(old, new, hostnames):
+    """
+    Subnet strings (segment roots, as used in subnet_map and on edges) that any of these devices
+    is on in either build. A network gaining or losing a peer regroups the segments on both sides,
+    so every segment sharing an interface prefix with one already found is included too.
+    """
+    prefixes = set()
+    for hostname in hostnames:
+        for topology in (old, new):
+            device_parser = topology.devices.get(hostname)
+            if device_parser is not None:
+                prefixes.update(interface_prefix(intf) for intf in device_parser.interfaces)
+    prefixes.discard(None)
+    roots = set()
+    seen = set() # (which build, root) pairs already expanded
+    pending = list(prefixes)
+    while pending:
+        prefix = pending.pop()
+        for side, topology in enumerate((old, new)):
+            root = topology._segment_root(prefix)
+            roots.add(root)
+            if (side, root) in seen:
+                continue
+            seen.add((side, root))
+            for _, intf in topology.subnet_map.get(format_prefix(*root), ()):
+                member_prefix = interface_prefix(intf)
+                if member_prefix not in prefixes:
+                    prefixes.add(member_prefix)
+                    pending.append(member_prefix)
+    return {format_prefix(*root) for root in roots}
+
+
+def _member_labels(topology, subnet):
+    return sorted(f"{hostname}:{intf['name']}" for hostname, intf in topology.subnet_map.get(subnet, []))
+
+
+def _diff_subnets(result, old, new, subnets):
+    for subnet in subnets:
+        in_old, in_new = subnet in old.subnet_map, subnet in new.subnet_map
+        if in_old and not in_new:
+            result['subnets']['removed'].append(subnet)
+        elif in_new and not in_old:
+            result['subnets']['added'].append(subnet)
+        elif in_old:
+            old_members, new_members = _member_labels(old, subnet), _member_labels(new, subnet)
+            if old_members != new_members:
+                result['subnets']['changed'][subnet] = {'members': [old_members, new_members]}
+        stub = old._stub_node_name(subnet)
+        if old.graph.has_node(stub) and not new.graph.has_node(stub):
+            result['stub_networks']['removed'].append(stub)
+        elif new.graph.has_node(stub) and not old.graph.has_node(stub):
+            result['stub_networks']['added'].append(stub)
+
+
+def _subnet_edges(topology, subnets):
+    """{(source, target): attributes} for every edge carrying one of these subnets."""
+    edges = {}
+    graph = topology.graph
+    for subnet in subnets:
+        for hostname, _ in topology.subnet_map.get(subnet, []):
+            if not graph.has_node(hostname):
+                continue
+            for neighbor, attr in graph.succ[hostname].items():
+                if attr.get('subnet') == subnet:
+                    edges[(hostname, neighbor)] = attr
+            for neighbor, attr in graph.pred[hostname].items():
+                if attr.get('subnet') == subnet:
+                    edges[(neighbor, hostname)] = attr
+    return edges
+
+
+def _diff_edges(result, old, new, subnets):
+    old_edges, new_edges = _subnet_edges(old, subnets), _subnet_edges(new, subnets)
+    result['stats']['edges_compared'] = len(old_edges.keys() | new_edges.keys())
+    links = result['links']
+    for edge, attr in old_edges.items():
+        if edge not in new_edges:
+            links['removed'].append({'source': edge[0], 'target': edge[1], **attr})
+        else:
+            changes = _attribute_changes(attr, new_edges[edge])
+            if changes:
+                links['changed'].append({'source': edge[0], 'target': edge[1], 'changes': changes})
+    for edge, attr in new_edges.items():
+        if edge not in old_edges:
+            links['added'].append({'source': edge[0], 'target': edge[1], **attr})
+    for key in ('added', 'removed', 'changed'):
+        links[key].sort(key=lambda link: (link['source'], link['target']))
+
+
+def diff_config_directories(old_directory, new_directory, **builder_options):
+    """
+    Builds both directories (with the parse cache, so repeated runs only parse what changed)
+    and diffs them. builder_options go to NetworkTopologyBuilder, e.g. multi_access_mode.
+    """
+    from topology_builder import NetworkTopologyBuilder
+    topologies = []
+    for directory in (old_directory, new_directory):
+        topology = NetworkTopologyBuilder(**builder_options)
+        topology.build_topology_from_configs(directory, use_cache=True)
+        topologies.append(topology)
+    return diff_topologies(*topologies)